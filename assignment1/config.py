@@ -3,11 +3,13 @@ import os
 GROQ_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 
-CHUNK_SIZE = 800
-CHUNK_OVERLAP = 100
+CHUNK_TOKENS = 200  # ~800 chars of English text
 TOP_K_RETRIEVAL = 10
 TOP_K_RERANK = 5
 
+# Token budget for the retrieved context in the judge and answer prompts
+MAX_CONTEXT_TOKENS = 3000  # counted with the encoding tasks/shared/tokens.py maps GROQ_MODEL to
+
 FAISS_INDEX_DIR = "data/faiss_index"
 
 REQUEST_HEADERS = {
@@ -1,15 +1,22 @@
 import json
 import logging
 import os
+import sys
+from functools import partial
+from pathlib import Path
 
 import faiss
 import numpy as np
 import requests
 from bs4 import BeautifulSoup
 
-from config import CHUNK_OVERLAP, CHUNK_SIZE, FAISS_INDEX_DIR, REQUEST_HEADERS, TRAVEL_URLS
+from config import CHUNK_TOKENS, FAISS_INDEX_DIR, GROQ_MODEL, REQUEST_HEADERS, TRAVEL_URLS
 from embedder import embed_texts
-from chonkie import RecursiveChunker
+
+# The streaming chunker and token counting are shared with the tasks scripts
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tasks"))
+from shared import tokens  # noqa: E402
+from shared.chunking import split_spans  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
@@ -40,11 +47,10 @@ def clean_html(html: str) -> str:
     return "\n\n".join(parts)
 
 def chunk_text(text: str) -> list[str]:
-    """Split text into overlapping chunks, preferring paragraph boundaries."""
-    chunker = RecursiveChunker()
-    chunks = chunker(text)
-    return [chunk.text for chunk in chunks]
-    
+    """Split text into chunks of at most CHUNK_TOKENS, preferring paragraph, then line, then word boundaries."""
+    count = partial(tokens.count, model=GROQ_MODEL)
+    return [text[start:end] for start, end in split_spans(text, max_tokens=CHUNK_TOKENS, count=count)]
+
 
 
 def build_index(
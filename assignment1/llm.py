@@ -1,10 +1,16 @@
 import json
 import logging
 import os
+import sys
+from pathlib import Path
 
 from groq import Groq
 
-from config import GROQ_MODEL
+from config import GROQ_MODEL, MAX_CONTEXT_TOKENS
+
+# Token accounting is shared with the tasks scripts
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tasks"))
+from shared import tokens  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +24,19 @@ def get_client() -> Groq:
     return _client
 
 
+def fit_context(parts: list[str], max_tokens: int = MAX_CONTEXT_TOKENS, separator: str = "\n\n") -> str:
+    """
+    Join the leading context parts (best-ranked first) that fit within max_tokens.
+    The first part is truncated if it alone is too long, so the context is never empty.
+    """
+    kept = tokens.fit(parts, max_tokens, GROQ_MODEL, separator)
+    if parts and not kept:
+        kept = [tokens.truncate(parts[0], max_tokens, GROQ_MODEL)]
+    if len(kept) < len(parts):
+        logger.info(f"  Context budget: kept {len(kept)}/{len(parts)} chunks within {max_tokens} tokens")
+    return separator.join(kept)
+
+
 def extract_preferences(query: str, client: Groq | None = None) -> dict:
     """
     Extract structured preferences from a natural-language travel query.
@@ -75,7 +94,7 @@ def judge_context(query: str, chunks: list[str], client: Groq | None = None) ->
     Returns "context_good" or "context_insufficient".
     """
     client = client or get_client()
-    context_preview = "\n---\n".join(chunks[:5])
+    context_preview = fit_context(chunks[:5], separator="\n---\n")
 
     system_prompt = (
         "You are a context quality judge for a travel recommendation system.\n"
@@ -124,7 +143,7 @@ def generate_answer(
             f"[Source {i}: {chunk['url']} | {chunk['city']} | {chunk['category']} | {chunk['price_level']}]\n"
             f"{chunk['text']}"
         )
-    context_str = "\n\n".join(context_parts)
+    context_str = fit_context(context_parts)
 
     pref_summary = (
         f"City: {preferences.get('city') or 'not specified'}, "
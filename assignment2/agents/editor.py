@@ -1,35 +1,36 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from config import GOOGLE_API_KEY, GEMINI_MODEL
+from functools import cache
+import providers
+from ratelimit import limiter
+from research import estimate_tokens
+from telemetry import provider_call
 
-_llm = ChatGoogleGenerativeAI(
-    model=GEMINI_MODEL,
-    google_api_key=GOOGLE_API_KEY,
-    temperature=0.3,
-)
 
-_prompt = ChatPromptTemplate.from_messages([
-    ("system", (
-        "You are a senior LinkedIn content editor. "
-        "Polish the following draft post for maximum engagement.\n\n"
-        "Check and improve:\n"
-        "- Clarity: every sentence should be immediately understandable\n"
-        "- Tone: professional but approachable, not salesy\n"
-        "- Structure: short paragraphs, good flow, strong hook\n"
-        "- LinkedIn best practices: appropriate length, clear CTA, relevant hashtags\n"
-        "- Remove any jargon that doesn't add value\n\n"
-        "Return ONLY the final polished post, no explanations or meta-commentary."
-    )),
-    ("human", "{draft}"),
-])
+@cache
+def _prompt():
+    from langchain_core.prompts import ChatPromptTemplate
 
-_chain = _prompt | _llm
+    return ChatPromptTemplate.from_messages([
+        ("system", (
+            "You are a senior LinkedIn content editor. "
+            "Polish the following draft post for maximum engagement.\n\n"
+            "Check and improve:\n"
+            "- Clarity: every sentence should be immediately understandable\n"
+            "- Tone: professional but approachable, not salesy\n"
+            "- Structure: short paragraphs, good flow, strong hook\n"
+            "- LinkedIn best practices: appropriate length, clear CTA, relevant hashtags\n"
+            "- Remove any jargon that doesn't add value\n\n"
+            "Return ONLY the final polished post, no explanations or meta-commentary."
+        )),
+        ("human", "{draft}"),
+    ])
 
 
 def edit_post(draft: str) -> str:
     """Polish and refine a draft LinkedIn post."""
-    try:
-        response = _chain.invoke({"draft": draft})
-        return response.content
-    except Exception as e:
-        return f"Editing error: {e}"
+    chain = _prompt() | providers.chat_model(0.3)
+    with provider_call("gemini", "edit_post") as call:
+        response = limiter("gemini").call(
+            lambda: chain.invoke({"draft": draft}), estimated_tokens=2 * estimate_tokens(draft)
+        )
+        call.record_usage(response)
+    return response.content
@@ -1,14 +1,9 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from config import GOOGLE_API_KEY, GEMINI_MODEL
+import providers
+from plan_validator import optimize_plan, repair_plan
 from schemas import ExecutionPlan
-
-_llm = ChatGoogleGenerativeAI(
-    model=GEMINI_MODEL,
-    google_api_key=GOOGLE_API_KEY,
-    temperature=0.2,
-)
-
-_structured_llm = _llm.with_structured_output(ExecutionPlan)
+from ratelimit import limiter, usage_tokens
+from research import estimate_tokens
+from telemetry import current_span, provider_call
 
 PLANNER_SYSTEM_PROMPT = """\
 You are a planning agent for a LinkedIn content creation system.
@@ -37,13 +32,29 @@ Produce a plan that maximizes parallelism where possible.
 
 
 def create_plan(topic: str) -> ExecutionPlan:
-    """Use the planner LLM to generate a dynamic execution plan for the given topic."""
-    response = _structured_llm.invoke(
-        [
-            {"role": "system", "content": PLANNER_SYSTEM_PROMPT},
-            {"role": "human", "content": f"Create a plan for a LinkedIn post about: {topic}"},
-        ]
-    )
+    """Use the planner LLM to generate a dynamic execution plan for the given topic.
+
+    The LLM output is repaired and optimised locally (plan_validator.py) rather than re-planned.
+    """
+    messages = [
+        {"role": "system", "content": PLANNER_SYSTEM_PROMPT},
+        {"role": "human", "content": f"Create a plan for a LinkedIn post about: {topic}"},
+    ]
+    # include_raw keeps the AIMessage so token usage can be recorded
+    structured_llm = providers.chat_model(0.2).with_structured_output(ExecutionPlan, include_raw=True)
+    with provider_call("gemini", "create_plan") as call:
+        response = limiter("gemini").call(
+            lambda: structured_llm.invoke(messages),
+            estimated_tokens=estimate_tokens(PLANNER_SYSTEM_PROMPT + topic),
+            usage=lambda r: usage_tokens(r["raw"]),
+        )
+        call.record_usage(response["raw"])
+    if response["parsed"] is None:
+        raise response["parsing_error"] or ValueError("Planner returned no plan")
+    plan = response["parsed"]
     # Ensure the topic is set correctly
-    response.topic = topic
-    return response
+    plan.topic = topic
+    plan, repairs = repair_plan(plan)
+    if repairs and current_span() is not None:
+        current_span().set(plan_repairs=[str(issue) for issue in repairs])
+    return optimize_plan(plan)
@@ -1,12 +1,56 @@
+import asyncio
+import json
+import threading
 import traceback
+from contextlib import asynccontextmanager
+from typing import Literal
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from schemas import ExecutionPlan, ExecutionResult
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from batch import run_batch
+from checkpoints import CheckpointStore, downstream_closure
+import providers
+from config import BATCH_MAX_TOPICS, WARM_UP_PROVIDERS, CHECKPOINT_DB_PATH, CHECKPOINT_TTL_S, JOB_DB_PATH, JOB_QUEUE_SIZE, JOB_TIMEOUT_S, JOB_WORKERS
+from schemas import ExecutionPlan, ExecutionResult, JobInfo
 from agents.planner import create_plan
 from executor import execute_plan
+from images import MEDIA_TYPES, ImageNotFoundError
+from jobs import JobManager, JobNotFoundError, MemoryJobStore, QueueFullError, SQLiteJobStore, StepCallback
+from telemetry import metrics, span
+from tools.image_generator import image_store
 
-app = FastAPI(title="LinkedIn Content Curation Agent")
+
+checkpoints = CheckpointStore(CHECKPOINT_DB_PATH, ttl_s=CHECKPOINT_TTL_S) if CHECKPOINT_DB_PATH else None
+
+
+async def run_topic(topic: str, cancel_event: threading.Event, on_step: StepCallback) -> ExecutionResult:
+    """Job runner: plan the topic, then execute the plan."""
+    with span("request", endpoint="jobs", topic=topic):
+        plan = await asyncio.to_thread(create_plan, topic)
+        return await execute_plan(plan, cancel_event=cancel_event, on_step=on_step, checkpoints=checkpoints)
+
+
+jobs = JobManager(
+    runner=run_topic,
+    store=SQLiteJobStore(JOB_DB_PATH) if JOB_DB_PATH else MemoryJobStore(),
+    workers=JOB_WORKERS,
+    max_queue=JOB_QUEUE_SIZE,
+    timeout_s=JOB_TIMEOUT_S,
+)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if WARM_UP_PROVIDERS:
+        # Build the provider clients before the first request instead of during it
+        await asyncio.to_thread(providers.warm_up)
+    await jobs.start()
+    yield
+    await jobs.stop()
+
+
+app = FastAPI(title="LinkedIn Content Curation Agent", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -20,6 +64,15 @@ class TopicRequest(BaseModel):
     topic: str
 
 
+class BatchRequest(BaseModel):
+    topics: list[str] = Field(min_length=1, max_length=BATCH_MAX_TOPICS)
+
+
+class ResumeRequest(BaseModel):
+    plan_hash: str
+    invalidate: list[int] = Field(default_factory=list, description="Steps to re-run even if checkpointed")
+
+
 @app.post("/plan", response_model=ExecutionPlan)
 async def plan_endpoint(req: TopicRequest):
     """Generate an execution plan for a LinkedIn post on the given topic."""
@@ -35,9 +88,104 @@ async def plan_endpoint(req: TopicRequest):
 async def execute_endpoint(req: TopicRequest):
     """Generate a plan, execute it, and return the full result."""
     try:
-        plan = create_plan(req.topic)
-        result = await execute_plan(plan)
+        with span("request", endpoint="execute", topic=req.topic):
+            plan = await asyncio.to_thread(create_plan, req.topic)
+            result = await execute_plan(plan, checkpoints=checkpoints)
         return result
     except Exception as e:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/resume", response_model=ExecutionResult)
+async def resume_endpoint(req: ResumeRequest):
+    """Re-execute a previous plan, re-running only failed or invalidated steps and their dependents."""
+    if checkpoints is None:
+        raise HTTPException(status_code=400, detail="Checkpointing is disabled (CHECKPOINT_DB_PATH is empty)")
+    plan = checkpoints.load_plan(req.plan_hash)
+    if plan is None:
+        raise HTTPException(status_code=404, detail=f"Unknown plan: {req.plan_hash}")
+    try:
+        force = downstream_closure(plan, set(req.invalidate))
+        return await execute_plan(plan, checkpoints=checkpoints, force=force, resume=True)
+    except Exception as e:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/batch")
+async def batch_endpoint(req: BatchRequest):
+    """Plan and execute many topics in one shared DAG, streaming one NDJSON line per finished topic."""
+
+    async def ndjson():
+        async for event in run_batch(req.topics, checkpoints=checkpoints):
+            yield json.dumps(event) + "\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", response_model=JobInfo, status_code=202)
+async def submit_job(req: TopicRequest):
+    """Queue a topic for background planning + execution and return its job id."""
+    try:
+        return jobs.submit(req.topic)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
+@app.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str):
+    """Return the job's status, and its result once it has finished."""
+    try:
+        return jobs.get(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job(job_id: str):
+    """Stream status changes and step results as server-sent events until the job finishes."""
+    try:
+        jobs.get(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+
+    async def event_stream():
+        async for event in jobs.events(job_id):
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.delete("/jobs/{job_id}", response_model=JobInfo)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    try:
+        return jobs.cancel(job_id)
+    except JobNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+
+
+@app.get("/images/{image_id}")
+async def get_image(
+    image_id: str,
+    format: Literal["webp", "jpeg", "png"] = "webp",
+    size: Literal["full", "thumb"] = "full",
+):
+    """Stream a generated image, re-encoded (and optionally downscaled) on first request."""
+    try:
+        path = await asyncio.to_thread(image_store.variant, image_id, format, size)
+    except ImageNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Unknown image: {image_id}")
+    # Content-addressed, so every variant URL is immutable
+    return FileResponse(
+        path,
+        media_type=MEDIA_TYPES[format],
+        headers={"Cache-Control": "public, max-age=31536000, immutable", "ETag": f'"{image_id}-{size}-{format}"'},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus scrape endpoint: step/queue latency summaries, in-flight gauges, provider usage."""
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
@@ -1,7 +1,7 @@
 import streamlit as st
 import requests
 import json
-import base64
+import time
 
 API_BASE = "http://localhost:8000"
 
@@ -37,9 +37,24 @@ if plan_only and topic:
 if generate and topic:
     with st.spinner("Generating plan and executing... this may take a minute."):
         try:
-            resp = requests.post(f"{API_BASE}/execute", json={"topic": topic}, timeout=300)
+            resp = requests.post(f"{API_BASE}/jobs", json={"topic": topic}, timeout=30)
             resp.raise_for_status()
-            data = resp.json()
+            job = resp.json()
+
+            # Poll the job instead of holding one HTTP request open for the whole run
+            status_line = st.empty()
+            deadline = time.time() + 900
+            while job["status"] in ("queued", "running") and time.time() < deadline:
+                status_line.caption(f"Job `{job['job_id']}` is {job['status']}...")
+                time.sleep(2)
+                resp = requests.get(f"{API_BASE}/jobs/{job['job_id']}", timeout=30)
+                resp.raise_for_status()
+                job = resp.json()
+            status_line.empty()
+
+            if job["status"] != "succeeded":
+                raise RuntimeError(f"Job {job['status']}: {job.get('error') or 'no result'}")
+            data = job["result"]
 
             # Main content area
             st.subheader("Generated LinkedIn Post")
@@ -48,13 +63,12 @@ if generate and topic:
             else:
                 st.warning("No post was generated. Check the debug panel below for details.")
 
-            if data.get("image_base64"):
+            if data.get("image_url"):
                 st.subheader("Generated Image")
-                try:
-                    image_bytes = base64.b64decode(data["image_base64"])
-                    st.image(image_bytes, use_container_width=True)
-                except Exception:
-                    st.warning("Failed to decode image.")
+                # The browser fetches the image straight from the API; the job result only carries its URL
+                image_url = f"{API_BASE}{data['image_url']}"
+                st.image(f"{image_url}?format=webp", use_container_width=True)
+                st.markdown(f"[Download PNG]({image_url}?format=png)")
             else:
                 st.info("No image was generated (image generation may have failed or was not in the plan).")
 
@@ -73,8 +87,16 @@ if generate and topic:
 
             with st.expander("Debug: Step Results"):
                 for result in data.get("results", []):
-                    status_icon = "✅" if result["status"] == "success" else "❌"
-                    st.markdown(f"{status_icon} **Step {result['step']}** — `{result['tool']}` — {result['duration_ms']}ms")
+                    status_icon = {"success": "✅", "skipped": "⏭️"}.get(result["status"], "❌")
+                    score = f" — score {result['score']:.2f}" if result.get("score") is not None else ""
+                    st.markdown(f"{status_icon} **Step {result['step']}** — `{result['tool']}` — {result['duration_ms']}ms{score}")
+                    metrics = result.get("metrics") or {}
+                    if "research_tokens_before" in metrics:
+                        st.caption(
+                            f"Research condensed: ~{int(metrics['research_tokens_before'])} → "
+                            f"~{int(metrics['research_tokens_after'])} tokens, "
+                            f"{int(metrics['duplicates_removed'])} duplicate results removed"
+                        )
                     if result.get("error"):
                         st.error(result["error"])
                     elif result["tool"] != "image_generator":
@@ -0,0 +1,200 @@
+"""Batch execution: many topics scheduled as one global DAG with shared searches.
+
+Each topic is planned as soon as a planner slot is free, and its steps join a single
+dependency graph as soon as its plan arrives; there are no per-topic waves and no
+barrier between planning and execution. search_web steps with the same normalised
+query are one node in that graph, so overlapping research is fetched once and
+shared by every topic that asked for it. Every node starts the moment its
+dependencies finish, limited only by a per-provider concurrency cap, so the batch
+runs at the providers' throughput rather than at N x the single-topic latency.
+Results are yielded per topic, in completion order.
+
+Steps run through the executor's ``run_step_with_retries``, so they get the same
+transient-error retries and metrics as /execute. With a CheckpointStore, each
+topic's plan and successful steps are saved once the topic finishes, and its
+result carries a ``plan_hash`` for /resume. Like /execute, a batch never reads
+stored results back.
+"""
+
+import asyncio
+import re
+import time
+from typing import AsyncIterator
+
+from agents.planner import create_plan
+from checkpoints import CheckpointStore, step_input_hash
+from config import PLANNER_CONCURRENCY, PROVIDER_CONCURRENCY
+from executor import build_result, run_step_with_retries
+from schemas import ExecutionPlan, PlanStep, StepResult
+from telemetry import metrics, span
+
+TOOL_PROVIDERS = {
+    "search_web": "tavily",
+    "summarizer": "gemini",
+    "content_generator": "gemini",
+    "content_editor": "gemini",
+    "image_generator": "huggingface",
+}
+
+
+def search_key(step: PlanStep, topic: str) -> str:
+    """Shared-node key for a search: the query, case- and whitespace-insensitive."""
+    query = step.description or topic
+    return "search:" + re.sub(r"\s+", " ", query).strip().lower()
+
+
+def plan_levels(plan: ExecutionPlan) -> list[list[int]]:
+    """Dependency depth of every step of a valid plan, shaped like ExecutionResult.execution_order."""
+    deps = {s.step: s.depends_on for s in plan.steps}
+    depth: dict[int, int] = {}
+
+    def level(step: int) -> int:
+        if step not in depth:
+            depth[step] = 1 + max((level(d) for d in deps[step] if d in deps), default=-1)
+        return depth[step]
+
+    levels: dict[int, list[int]] = {}
+    for s in plan.steps:
+        levels.setdefault(level(s.step), []).append(s.step)
+    return [sorted(levels[k]) for k in sorted(levels)]
+
+
+class BatchRun:
+    """One batch: a lazily-built global DAG of step nodes, memoised as asyncio tasks."""
+
+    def __init__(self, checkpoints: CheckpointStore | None = None):
+        self.checkpoints = checkpoints
+        self._nodes: dict[str, asyncio.Task] = {}
+        self._limits = {provider: asyncio.Semaphore(n) for provider, n in PROVIDER_CONCURRENCY.items()}
+        self._planner_limit = asyncio.Semaphore(PLANNER_CONCURRENCY)
+        self.searches_requested = 0
+
+    @property
+    def searches_run(self) -> int:
+        return sum(1 for key in self._nodes if key.startswith("search:"))
+
+    def _node(self, key: str, step: PlanStep, topic: str, deps: dict[int, str]) -> asyncio.Task:
+        if key not in self._nodes:
+            self._nodes[key] = asyncio.create_task(self._run_node(step, topic, deps))
+        return self._nodes[key]
+
+    async def _run_node(self, step: PlanStep, topic: str, deps: dict[int, str]) -> StepResult:
+        dep_results = {}
+        for dep_step, dep_key in deps.items():
+            dep_results[dep_step] = await self._nodes[dep_key]
+        provider = TOOL_PROVIDERS.get(step.tool)
+        limit = self._limits.get(provider)
+        ready_at = time.perf_counter()
+        with span("step", step=step.step, tool=step.tool, depends_on=step.depends_on, topic=topic) as step_span:
+            if limit is None:
+                result = await asyncio.to_thread(run_step_with_retries, step, topic, dep_results, None, ready_at)
+            else:
+                async with limit:
+                    result = await asyncio.to_thread(run_step_with_retries, step, topic, dep_results, None, ready_at)
+            step_span.set(status=result.status, attempts=result.attempts, queue_ms=result.queue_ms)
+            for name in ("input_tokens", "output_tokens"):
+                if name in step_span.attributes:
+                    result.metrics[name] = step_span.attributes[name]
+        return result
+
+    async def run_topic(self, index: int, topic: str) -> tuple[int, ExecutionPlan, dict[int, StepResult], str | None]:
+        async with self._planner_limit:
+            plan = await asyncio.to_thread(create_plan, topic)
+
+        keys: dict[int, str] = {}
+        for step in plan.steps:
+            if step.tool == "search_web":
+                self.searches_requested += 1
+                keys[step.step] = search_key(step, topic)
+            else:
+                keys[step.step] = f"{index}:{step.step}"
+
+        # Create nodes in dependency order so every dependency's task exists first
+        for level in plan_levels(plan):
+            for step in (s for s in plan.steps if s.step in level):
+                deps = {d: keys[d] for d in step.depends_on if d in keys}
+                self._node(keys[step.step], step, topic, deps)
+
+        completed = {}
+        for step in plan.steps:
+            result = await self._nodes[keys[step.step]]
+            # A shared search belongs to the topic that created it; the others get a relabelled copy
+            completed[step.step] = result.model_copy(update={"step": step.step}, deep=True)
+        key = await asyncio.to_thread(self._checkpoint, plan, completed) if self.checkpoints is not None else None
+        return index, plan, completed, key
+
+    def _checkpoint(self, plan: ExecutionPlan, completed: dict[int, StepResult]) -> str:
+        """Save the topic's plan and successful steps under the keys execute_plan would use."""
+        key = self.checkpoints.save_plan(plan)
+        for step in plan.steps:
+            result = completed[step.step]
+            if result.status != "error":
+                self.checkpoints.save_step(key, step_input_hash(step, plan.topic, completed), result)
+        return key
+
+    def cancel(self) -> None:
+        for task in self._nodes.values():
+            task.cancel()
+
+
+async def _produce(topics: list[str], events: asyncio.Queue, checkpoints: CheckpointStore | None) -> None:
+    batch = BatchRun(checkpoints)
+    start = time.perf_counter()
+    succeeded = 0
+    with span("batch", topics=len(topics)) as batch_span, metrics.in_flight("batches_in_flight"):
+        pending = {asyncio.create_task(batch.run_topic(i, t)): (i, t) for i, t in enumerate(topics)}
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index, topic = pending.pop(task)
+                    if task.exception() is not None:
+                        await events.put({"type": "error", "index": index, "topic": topic, "error": str(task.exception())})
+                        continue
+                    _, plan, completed, key = task.result()
+                    result = build_result(plan, completed, plan_levels(plan), plan_hash=key)
+                    result.trace_id = batch_span.trace_id
+                    succeeded += 1
+                    await events.put({"type": "result", "index": index, "topic": topic, "result": result.model_dump(mode="json")})
+        finally:
+            for task in pending:
+                task.cancel()
+            batch.cancel()
+        batch_span.set(searches_requested=batch.searches_requested, searches_run=batch.searches_run)
+
+    await events.put({
+        "type": "done",
+        "topics": len(topics),
+        "succeeded": succeeded,
+        "searches_requested": batch.searches_requested,
+        "searches_run": batch.searches_run,
+        "duration_ms": int((time.perf_counter() - start) * 1000),
+    })
+
+
+async def run_batch(topics: list[str], checkpoints: CheckpointStore | None = None) -> AsyncIterator[dict]:
+    """Plan and execute all topics together, yielding one event per topic as it finishes.
+
+    Events: ``{"type": "result", "index", "topic", "result"}`` or ``{"type": "error", "index",
+    "topic", "error"}`` per topic, then ``{"type": "done", ...}`` with batch statistics.
+    The batch runs in its own task; closing the iterator (client disconnect) cancels it.
+    """
+    events: asyncio.Queue = asyncio.Queue()
+    producer = asyncio.create_task(_produce(topics, events, checkpoints))
+    try:
+        while True:
+            getter = asyncio.ensure_future(events.get())
+            await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                getter.cancel()
+                producer.result()  # the batch itself crashed: surface its exception
+                while not events.empty():
+                    event = events.get_nowait()
+                    yield event
+                return
+            event = getter.result()
+            yield event
+            if event["type"] == "done":
+                return
+    finally:
+        producer.cancel()
@@ -0,0 +1,107 @@
+"""Benchmark: serial generate -> edit vs. speculative N drafts (+ optional editor skip).
+
+Uses stubbed LLMs that sleep for a realistic latency and return synthetic posts whose
+quality varies with temperature, so it runs offline and without API keys:
+
+    python benchmarks/bench_drafts.py --trials 20 --drafts 3 --skip-score 0.85
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drafts import draft_temperatures, pick_best_draft, score_draft  # noqa: E402
+
+GOOD_HOOKS = [
+    "Backend engineers: are your agents ready for production?",
+    "3 lessons from shipping GenAI agents last quarter",
+    "Your API layer is about to get a new kind of client!",
+]
+WEAK_HOOKS = [
+    "In today's post I want to talk about a topic that has been on my mind for quite a long time now",
+    "Hello everyone",
+]
+FILLER = (
+    "Agents call tools through plain HTTP APIs. Latency budgets matter more than model size. "
+    "Teams that log every tool call debug failures in minutes. Start small and measure everything. "
+    "Retries without idempotency keys will double charge your users. Observability is not optional. "
+).split()
+
+
+def stub_generate(temperature: float, rng: random.Random, latency_s: float) -> str:
+    """A fake content_generator: higher temperature -> more variance in length/hashtags/hook."""
+    time.sleep(latency_s * rng.uniform(0.8, 1.2))
+    spread = 40 + 200 * temperature
+    words = max(30, int(rng.gauss(200, spread)))
+    body = " ".join(rng.choice(FILLER) for _ in range(words))
+    hook = rng.choice(GOOD_HOOKS) if rng.random() > temperature * 0.5 else rng.choice(WEAK_HOOKS)
+    hashtags = " ".join(f"#tag{i}" for i in range(max(0, int(rng.gauss(4, 1 + 3 * temperature)))))
+    return f"{hook}\n\n{body}\n\nWhat would you add?\n\n{hashtags}"
+
+
+def stub_edit(draft: str, rng: random.Random, latency_s: float) -> str:
+    """A fake content_editor: normalises hook, length and hashtags."""
+    time.sleep(latency_s * rng.uniform(0.8, 1.2))
+    body_words = [w for w in draft.split() if not w.startswith("#")][:220]
+    return f"{GOOD_HOOKS[0]}\n\n{' '.join(body_words)}\n\nWhat would you add?\n\n#ai #agents #backend #llm"
+
+
+def run_trial(mode: str, rng: random.Random, args) -> tuple[float, float, float, bool]:
+    start = time.perf_counter()
+    if mode == "serial":
+        draft = stub_generate(0.7, rng, args.gen_latency)
+        score = score_draft(draft).total
+    else:
+        draft, best, _ = pick_best_draft(
+            lambda t: stub_generate(t, random.Random(rng.random()), args.gen_latency),
+            draft_temperatures(args.drafts),
+        )
+        score = best.total
+
+    skipped = mode == "speculative+skip" and score >= args.skip_score
+    final = draft if skipped else stub_edit(draft, rng, args.edit_latency)
+    return time.perf_counter() - start, score, score_draft(final).total, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=20)
+    parser.add_argument("--drafts", type=int, default=3)
+    parser.add_argument("--skip-score", type=float, default=0.85)
+    parser.add_argument("--gen-latency", type=float, default=0.4, help="stub generator latency (s)")
+    parser.add_argument("--edit-latency", type=float, default=0.3, help="stub editor latency (s)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'Mode':<20} {'Mean s':>8} {'P95 s':>8} {'Pre-edit':>9} {'Final':>7} {'Skipped':>8} {'LLM calls':>10}")
+    print("-" * 75)
+    for mode in ("serial", "speculative", "speculative+skip"):
+        rng = random.Random(args.seed)
+        latencies, finals, pre_edit, skips = [], [], [], 0
+        for _ in range(args.trials):
+            latency, draft_score, final_score, skipped = run_trial(mode, rng, args)
+            latencies.append(latency)
+            pre_edit.append(draft_score)
+            finals.append(final_score)
+            skips += int(skipped)
+        drafts_per_trial = 1 if mode == "serial" else args.drafts
+        calls = args.trials * drafts_per_trial + (args.trials - skips)
+        p95 = sorted(latencies)[max(0, int(0.95 * len(latencies)) - 1)]
+        print(
+            f"{mode:<20} {statistics.mean(latencies):>8.2f} {p95:>8.2f} "
+            f"{statistics.mean(pre_edit):>9.3f} {statistics.mean(finals):>7.3f} {skips:>8} {calls:>10}"
+        )
+    print(
+        f"\nSpeculative mode trades {args.drafts}x generator calls for a better starting draft; "
+        f"with --skip-score the editor round-trip is dropped when the best draft already scores "
+        f">= {args.skip_score}."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark: unthrottled provider calls vs. ratelimit.ProviderLimiter against a fake quota.
+
+FakeProvider enforces an RPM and TPM quota in one-second windows (rpm/60 requests and
+tpm/60 tokens per second, like providers that police per-minute quotas at a finer
+grain) and raises a 429 when a call exceeds it. Runs offline and without API keys:
+
+    python benchmarks/bench_ratelimit.py --calls 80 --threads 20 --rpm 600 --tpm 60000
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ratelimit import ProviderLimiter  # noqa: E402
+
+
+class FakeRateLimitError(Exception):
+    status_code = 429
+
+
+class FakeProvider:
+    def __init__(self, rpm: int, tpm: int, latency_s: float):
+        self.rpm, self.tpm, self.latency_s = rpm, tpm, latency_s
+        self._lock = threading.Lock()
+        self._window = -1
+        self._requests = self._tokens = 0
+        self.throttled = 0
+        self.served = 0
+
+    def call(self, tokens: int, rng: random.Random) -> dict:
+        with self._lock:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window, self._requests, self._tokens = window, 0, 0
+            if self._requests + 1 > self.rpm / 60 or self._tokens + tokens > self.tpm / 60:
+                self.throttled += 1
+                raise FakeRateLimitError("429 Too Many Requests")
+            self._requests += 1
+            self._tokens += tokens
+        time.sleep(self.latency_s * rng.uniform(0.7, 1.3))
+        with self._lock:
+            self.served += 1
+        return {"tokens": tokens}
+
+
+def run(mode: str, args) -> None:
+    provider = FakeProvider(args.rpm, args.tpm, args.latency)
+    limiter = None
+    if mode != "unthrottled":
+        limiter = ProviderLimiter(
+            "fake", rpm=args.rpm, tpm=args.tpm, max_concurrency=args.threads,
+            backoff_s=0.2, cooldown_s=1.0, burst_s=60.0 if mode == "limiter" else 1.0,
+        )
+    rng = random.Random(args.seed)
+    sizes = [rng.randint(50, 150) for _ in range(args.calls)]
+    failures = 0
+
+    def one(i: int) -> None:
+        nonlocal failures
+        call_rng = random.Random(args.seed + i)
+        try:
+            if limiter is None:
+                provider.call(sizes[i], call_rng)
+            else:
+                limiter.call(lambda: provider.call(sizes[i], call_rng), estimated_tokens=sizes[i],
+                             usage=lambda r: r["tokens"])
+        except FakeRateLimitError:
+            failures += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(one, range(args.calls)))
+    elapsed = time.perf_counter() - start
+    window = f"{limiter.window:.1f}" if limiter else "-"
+    print(
+        f"{mode:<18} {provider.served:>6}/{args.calls:<4} {failures:>7} {provider.throttled:>6} "
+        f"{elapsed:>8.1f}s {provider.served / elapsed * 60:>9.0f} {window:>7}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=80)
+    parser.add_argument("--threads", type=int, default=20)
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--tpm", type=int, default=60000)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"quota: {args.rpm} RPM / {args.tpm} TPM, {args.calls} calls of 50-150 tokens from {args.threads} threads")
+    print(f"{'mode':<18} {'served':>11} {'failed':>7} {'429s':>6} {'wall':>9} {'req/min':>9} {'window':>7}")
+    for mode in ("unthrottled", "limiter", "limiter 1s burst"):
+        run(mode, args)
+
+
+if __name__ == "__main__":
+    main()
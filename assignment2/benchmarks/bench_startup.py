@@ -0,0 +1,78 @@
+"""Benchmark: API cold start (``import api``) and provider warm-up time.
+
+Each run is a fresh interpreter, so nothing is cached between runs. Runs offline with
+PROVIDER_BACKEND=stub; with --backend real the warm-up builds the real clients (keys
+are needed for Gemini and Tavily, otherwise the error is reported instead of a time):
+
+    python benchmarks/bench_startup.py --runs 5 --backend stub --top 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, time
+start = time.perf_counter()
+import api
+imported = time.perf_counter() - start
+import providers
+warm_up = providers.warm_up()
+print(json.dumps({"import_s": imported, "warm_up": warm_up, "total_s": time.perf_counter() - start}))
+"""
+
+
+def run_probe(backend: str) -> dict:
+    env = {**os.environ, "PROVIDER_BACKEND": backend, "TRACE_PATH": ""}
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=APP_DIR, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def top_imports(backend: str, n: int) -> list[tuple[float, str]]:
+    """Slowest direct imports of api by cumulative import time, from ``python -X importtime``."""
+    env = {**os.environ, "PROVIDER_BACKEND": backend, "TRACE_PATH": ""}
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import api"], cwd=APP_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Modules imported directly by api (nested imports are included in their parent's time)
+        if len(name) - len(name.lstrip()) == 3:
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:n]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--backend", choices=("stub", "real"), default="stub")
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest imports of api")
+    args = parser.parse_args()
+
+    runs = [run_probe(args.backend) for _ in range(args.runs)]
+    print(f"backend={args.backend} runs={args.runs}")
+    print(f"  import api        median {statistics.median(r['import_s'] for r in runs):.3f}s")
+    for name in runs[0]["warm_up"]:
+        values = [r["warm_up"][name] for r in runs]
+        if all(isinstance(v, (int, float)) for v in values):
+            print(f"  warm up {name:<10} median {statistics.median(values):.3f}s")
+        else:
+            print(f"  warm up {name:<10} failed: {next(v for v in values if isinstance(v, str))}")
+    print(f"  total             median {statistics.median(r['total_s'] for r in runs):.3f}s")
+
+    if args.top:
+        print(f"\nslowest imports of `import api` ({args.backend}):")
+        for seconds, name in top_imports(args.backend, args.top):
+            print(f"  {seconds:6.3f}s  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Per-step checkpoints so a failed plan can be resumed without repeating finished work.
+
+Every successful StepResult is stored in SQLite under (plan_hash, step, input_hash).
+The input hash covers the step definition, the topic and the outputs of the step's
+dependencies, so a step is only reused when exactly the same inputs reach it again;
+if an upstream step produces a different output, everything downstream re-runs.
+Rows older than the TTL are deleted when the store is opened and, at most every
+``PURGE_INTERVAL_S``, when results are written, so the database does not grow
+without bound.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from schemas import ExecutionPlan, PlanStep, StepResult
+
+PURGE_INTERVAL_S = 300.0
+
+
+def plan_hash(plan: ExecutionPlan) -> str:
+    return hashlib.sha256(plan.model_dump_json().encode("utf-8")).hexdigest()[:16]
+
+
+def step_input_hash(step: PlanStep, topic: str, dependency_results: dict[int, StepResult]) -> str:
+    payload = {
+        "step": step.model_dump(),
+        "topic": topic,
+        "inputs": {
+            str(dep): dependency_results[dep].output
+            for dep in sorted(step.depends_on) if dep in dependency_results
+        },
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class CheckpointStore:
+    """SQLite-backed plan and step-result store, safe to share between worker threads."""
+
+    def __init__(self, path: str, ttl_s: float | None = None):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._ttl_s = ttl_s
+        self._purged_at = 0.0
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "plan_hash TEXT PRIMARY KEY, plan TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS steps ("
+                "plan_hash TEXT NOT NULL, step INTEGER NOT NULL, input_hash TEXT NOT NULL, "
+                "result TEXT NOT NULL, created_at REAL NOT NULL, "
+                "PRIMARY KEY (plan_hash, step, input_hash))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS steps_created_at ON steps (created_at)")
+        self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Delete plans and step results older than the TTL; returns the number of rows removed."""
+        if self._ttl_s is None:
+            return 0
+        cutoff = time.time() - self._ttl_s
+        with self._lock, self._conn:
+            removed = self._conn.execute("DELETE FROM steps WHERE created_at < ?", (cutoff,)).rowcount
+            removed += self._conn.execute("DELETE FROM plans WHERE created_at < ?", (cutoff,)).rowcount
+        self._purged_at = time.monotonic()
+        return removed
+
+    def _maybe_purge(self) -> None:
+        if self._ttl_s is not None and time.monotonic() - self._purged_at >= min(PURGE_INTERVAL_S, self._ttl_s):
+            self.purge_expired()
+
+    def save_plan(self, plan: ExecutionPlan) -> str:
+        key = plan_hash(plan)
+        self._maybe_purge()
+        # Re-saving refreshes created_at, so a plan that is still being run is not purged
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO plans (plan_hash, plan, created_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (plan_hash) DO UPDATE SET created_at = excluded.created_at",
+                (key, plan.model_dump_json(), time.time()),
+            )
+        return key
+
+    def load_plan(self, key: str) -> ExecutionPlan | None:
+        with self._lock:
+            row = self._conn.execute("SELECT plan FROM plans WHERE plan_hash = ?", (key,)).fetchone()
+        return ExecutionPlan.model_validate_json(row[0]) if row else None
+
+    def get_step(self, key: str, step: int, input_hash: str) -> StepResult | None:
+        """Return the stored result for this exact step input, unless it has expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM steps WHERE plan_hash = ? AND step = ? AND input_hash = ?",
+                (key, step, input_hash),
+            ).fetchone()
+        if row is None:
+            return None
+        if self._ttl_s is not None and time.time() - row[1] > self._ttl_s:
+            return None
+        return StepResult.model_validate_json(row[0])
+
+    def save_step(self, key: str, input_hash: str, result: StepResult) -> None:
+        self._maybe_purge()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO steps (plan_hash, step, input_hash, result, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, result.step, input_hash, result.model_dump_json(), time.time()),
+            )
+
+
+def downstream_closure(plan: ExecutionPlan, steps: set[int]) -> set[int]:
+    """The given steps plus every step that transitively depends on them."""
+    closure = set(steps)
+    changed = True
+    while changed:
+        changed = False
+        for s in plan.steps:
+            if s.step not in closure and any(dep in closure for dep in s.depends_on):
+                closure.add(s.step)
+                changed = True
+    return closure
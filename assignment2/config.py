@@ -3,13 +3,79 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
-HF_TOKEN = os.getenv("HF_TOKEN")
+HF_TOKEN = os.getenv("HF_TOKEN")  # optional
+
+
+def require_key(name: str) -> str:
+    """Return an API key, raising only when a client that needs it is actually built."""
+    value = os.getenv(name)
+    if not value or value.startswith("your-"):
+        raise EnvironmentError(f"{name} is not set. Add it to assignment2/.env")
+    return value
 
-if not GOOGLE_API_KEY or GOOGLE_API_KEY == "your-google-api-key-here":
-    raise EnvironmentError("GOOGLE_API_KEY is not set. Add it to assignment2/.env")
-if not TAVILY_API_KEY or TAVILY_API_KEY == "your-tavily-api-key-here":
-    raise EnvironmentError("TAVILY_API_KEY is not set. Add it to assignment2/.env")
 
 GEMINI_MODEL = "gemini-2.5-flash"
+
+# Provider clients (see providers.py): "real" or "stub" (offline, no API keys needed)
+PROVIDER_BACKEND = os.getenv("PROVIDER_BACKEND", "real")
+WARM_UP_PROVIDERS = os.getenv("WARM_UP_PROVIDERS", "1") != "0"  # build clients at API startup
+STUB_LATENCY_S = float(os.getenv("STUB_LATENCY_S", "0"))
+
+# Job queue (see jobs.py)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "20"))
+JOB_TIMEOUT_S = float(os.getenv("JOB_TIMEOUT_S", "600"))
+JOB_DB_PATH = os.getenv("JOB_DB_PATH")  # unset -> in-memory queue, set -> SQLite-backed
+
+# Speculative drafts (see drafts.py): 0/1 = single draft, N >= 2 = N concurrent drafts
+SPECULATIVE_DRAFTS = int(os.getenv("SPECULATIVE_DRAFTS", "0"))
+# Skip the editor when the best draft scores at least this (0..1); unset = always edit
+EDITOR_SKIP_SCORE = float(os.getenv("EDITOR_SKIP_SCORE")) if os.getenv("EDITOR_SKIP_SCORE") else None
+
+# Step checkpoints and retries (see checkpoints.py)
+CHECKPOINT_DB_PATH = os.getenv(
+    "CHECKPOINT_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "checkpoints.db")
+)  # set to "" to disable; stored results are only reused by /resume
+CHECKPOINT_TTL_S = float(os.getenv("CHECKPOINT_TTL_S", "86400"))
+STEP_MAX_RETRIES = int(os.getenv("STEP_MAX_RETRIES", "2"))  # transient failures only
+STEP_RETRY_BACKOFF_S = float(os.getenv("STEP_RETRY_BACKOFF_S", "1.0"))
+
+# Research condensing before summarize / generate_post (see research.py); 0 disables
+RESEARCH_TOKEN_BUDGET = int(os.getenv("RESEARCH_TOKEN_BUDGET", "2500"))
+
+# Telemetry (see telemetry.py / trace_viewer.py); empty TRACE_PATH disables trace export
+TRACE_PATH = os.getenv(
+    "TRACE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "traces.jsonl")
+)
+
+# Generated image blob store (see images.py)
+IMAGE_DIR = os.getenv("IMAGE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "images"))
+IMAGE_THUMB_SIZE = int(os.getenv("IMAGE_THUMB_SIZE", "320"))
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "85"))
+
+# Batch endpoint (see batch.py): max topics per request and concurrent calls per provider
+BATCH_MAX_TOPICS = int(os.getenv("BATCH_MAX_TOPICS", "100"))
+PLANNER_CONCURRENCY = int(os.getenv("PLANNER_CONCURRENCY", "8"))
+PROVIDER_CONCURRENCY = {
+    "gemini": int(os.getenv("GEMINI_CONCURRENCY", "8")),
+    "tavily": int(os.getenv("TAVILY_CONCURRENCY", "8")),
+    "huggingface": int(os.getenv("HF_CONCURRENCY", "2")),
+}
+
+# Provider quotas (see ratelimit.py); 0 = unlimited. Shared by every request in this process.
+PROVIDER_RPM = {
+    "gemini": int(os.getenv("GEMINI_RPM", "60")),
+    "tavily": int(os.getenv("TAVILY_RPM", "100")),
+    "huggingface": int(os.getenv("HF_RPM", "10")),
+}
+PROVIDER_TPM = {
+    "gemini": int(os.getenv("GEMINI_TPM", "250000")),
+}
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "4"))
+RATE_LIMIT_BACKOFF_S = float(os.getenv("RATE_LIMIT_BACKOFF_S", "2.0"))
+# Calls slower than this count as congestion for adaptive concurrency
+PROVIDER_LATENCY_TARGET_S = {
+    "gemini": float(os.getenv("GEMINI_LATENCY_TARGET_S", "30")),
+    "tavily": float(os.getenv("TAVILY_LATENCY_TARGET_S", "10")),
+    "huggingface": float(os.getenv("HF_LATENCY_TARGET_S", "60")),
+}
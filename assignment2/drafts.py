@@ -0,0 +1,130 @@
+"""Speculative draft generation: N variants in parallel, picked by a cheap local scorer.
+
+The scorer only uses text heuristics (no LLM call), so judging N drafts costs
+microseconds compared to the seconds each generation takes.
+"""
+
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from pydantic import BaseModel
+
+# Targets taken from the generator prompt (agents/generator.py)
+TARGET_WORDS = (150, 250)
+TARGET_HASHTAGS = (3, 5)
+
+_HASHTAG = re.compile(r"#\w+")
+_WORD = re.compile(r"[A-Za-z0-9']+")
+_SENTENCE_END = re.compile(r"[.!?]+")
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+_WEAK_OPENERS = ("in today's", "in this post", "i am excited", "i'm excited", "hello", "hi ")
+
+
+class DraftScore(BaseModel):
+    total: float
+    length: float
+    hashtags: float
+    hook: float
+    readability: float
+
+
+def _band_score(value: float, low: float, high: float, falloff: float) -> float:
+    """1.0 inside [low, high], decaying linearly to 0 ``falloff`` units outside it."""
+    if low <= value <= high:
+        return 1.0
+    distance = low - value if value < low else value - high
+    return max(0.0, 1.0 - distance / falloff)
+
+
+def _syllables(word: str) -> int:
+    word = word.lower()
+    count = len(_VOWEL_GROUPS.findall(word))
+    if word.endswith("e") and count > 1:
+        count -= 1
+    return max(1, count)
+
+
+def _readability(body: str) -> float:
+    """Flesch reading ease mapped to 0..1 (30 = dense academic text, 80 = plain English)."""
+    words = _WORD.findall(body)
+    if not words:
+        return 0.0
+    sentences = max(1, len(_SENTENCE_END.findall(body)))
+    syllables = sum(_syllables(w) for w in words)
+    flesch = 206.835 - 1.015 * (len(words) / sentences) - 84.6 * (syllables / len(words))
+    score = _band_score(flesch, 55, 80, 40)
+    # The prompt asks for plain text: penalise markdown that leaks through.
+    if "**" in body or re.search(r"^#{1,6}\s", body, re.MULTILINE):
+        score *= 0.7
+    return score
+
+
+def _hook(first_line: str) -> float:
+    words = _WORD.findall(first_line)
+    if not words:
+        return 0.0
+    score = _band_score(len(words), 4, 14, 12)
+    lowered = first_line.lower()
+    if first_line.rstrip().endswith(("?", "!")) or any(c.isdigit() for c in first_line):
+        score = min(1.0, score + 0.2)
+    if lowered.startswith(_WEAK_OPENERS):
+        score *= 0.5
+    return score
+
+
+def score_draft(text: str) -> DraftScore:
+    """Score a LinkedIn draft on length, hashtag count, hook strength and readability."""
+    if not text.strip():
+        return DraftScore(total=0.0, length=0.0, hashtags=0.0, hook=0.0, readability=0.0)
+
+    lines = [line.strip() for line in text.strip().splitlines() if line.strip()]
+    hashtags = len(_HASHTAG.findall(text))
+    body = _HASHTAG.sub("", text)
+
+    length = _band_score(len(_WORD.findall(body)), *TARGET_WORDS, falloff=150)
+    hashtag_score = _band_score(hashtags, *TARGET_HASHTAGS, falloff=4)
+    hook = _hook(lines[0])
+    readability = _readability(body)
+    total = 0.3 * length + 0.2 * hashtag_score + 0.25 * hook + 0.25 * readability
+    return DraftScore(
+        total=round(total, 3),
+        length=round(length, 3),
+        hashtags=round(hashtag_score, 3),
+        hook=round(hook, 3),
+        readability=round(readability, 3),
+    )
+
+
+def draft_temperatures(n: int, low: float = 0.4, high: float = 1.0) -> list[float]:
+    """N temperatures spread evenly over [low, high]."""
+    if n <= 1:
+        return [round((low + high) / 2, 2)]
+    return [round(low + (high - low) * i / (n - 1), 2) for i in range(n)]
+
+
+def pick_best_draft(
+    generate: Callable[[float], str],
+    temperatures: list[float],
+) -> tuple[str, DraftScore, list[tuple[float, DraftScore]]]:
+    """Generate one draft per temperature concurrently and return the best-scoring one.
+
+    A variant that raises is dropped; the first error is re-raised only if every variant failed.
+    Returns (best_draft, best_score, [(temperature, score), ...] for every successful variant).
+    """
+    with ThreadPoolExecutor(max_workers=len(temperatures)) as pool:
+        # copy_context keeps the caller's trace span current inside the pool threads
+        futures = [(t, pool.submit(contextvars.copy_context().run, generate, t)) for t in temperatures]
+    scored, errors = [], []
+    for t, future in futures:
+        try:
+            draft = future.result()
+        except Exception as e:
+            errors.append(e)
+            continue
+        scored.append((draft, score_draft(draft), t))
+    if not scored:
+        raise errors[0]
+    best_draft, best_score, _ = max(scored, key=lambda item: item[1].total)
+    return best_draft, best_score, [(t, score) for _, score, t in scored]
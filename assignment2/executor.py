@@ -1,17 +1,76 @@
 import asyncio
+import random
+import threading
 import time
+from typing import Awaitable, Callable
+from checkpoints import CheckpointStore, step_input_hash
+from config import (
+    EDITOR_SKIP_SCORE,
+    RESEARCH_TOKEN_BUDGET,
+    SPECULATIVE_DRAFTS,
+    STEP_MAX_RETRIES,
+    STEP_RETRY_BACKOFF_S,
+)
+from drafts import draft_temperatures, pick_best_draft, score_draft
+from ratelimit import is_transient_error
+from research import condense_research
+from telemetry import metrics, span
 from schemas import ExecutionPlan, StepResult, ExecutionResult
 from tools.search import search_web
 from tools.summarizer import summarize
-from tools.image_generator import generate_image
+from tools.image_generator import generate_image, image_store
 from agents.generator import generate_post
 from agents.editor import edit_post
 
 
-def _run_step(step, topic: str, dependency_outputs: dict[int, str]) -> StepResult:
-    """Execute a single plan step synchronously."""
+class ExecutionCancelled(Exception):
+    """Raised inside a step when its job was cancelled before the step started."""
+
+
+def _upstream_outputs(step, dependency_results: dict[int, StepResult]) -> list[str]:
+    return [dependency_results[dep].output for dep in step.depends_on if dep in dependency_results]
+
+
+def _condensed(texts: list[str], topic: str, metrics: dict[str, float]) -> str:
+    """Condense upstream research before it goes into an LLM prompt, recording the sizes."""
+    if RESEARCH_TOKEN_BUDGET <= 0 or not texts:
+        return "\n\n".join(texts)
+    condensed = condense_research(texts, topic, RESEARCH_TOKEN_BUDGET)
+    metrics["research_tokens_before"] = condensed.tokens_before
+    metrics["research_tokens_after"] = condensed.tokens_after
+    metrics["duplicates_removed"] = condensed.duplicates_removed
+    return condensed.text
+
+
+def _generate(topic: str, research: str) -> tuple[str, float]:
+    """Write the post, speculatively picking the best of N drafts when enabled."""
+    if SPECULATIVE_DRAFTS >= 2:
+        draft, score, _ = pick_best_draft(
+            lambda t: generate_post(topic, research, temperature=t),
+            draft_temperatures(SPECULATIVE_DRAFTS),
+        )
+        return draft, score.total
+    draft = generate_post(topic, research)
+    return draft, score_draft(draft).total
+
+
+def _run_step(
+    step,
+    topic: str,
+    dependency_results: dict[int, StepResult],
+    cancel_event: threading.Event | None = None,
+) -> tuple[StepResult, bool]:
+    """Execute a single plan step synchronously.
+
+    Returns the result and whether a failure is transient (worth retrying).
+    """
     start = time.perf_counter()
+    score = None
+    metrics: dict[str, float] = {}
     try:
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExecutionCancelled("Execution cancelled")
+
         if step.tool == "search_web":
             # Use the step description as the search query, or fall back to topic
             query = step.description if step.description else topic
@@ -19,27 +78,38 @@ def _run_step(step, topic: str, dependency_outputs: dict[int, str]) -> StepResul
 
         elif step.tool == "summarizer":
             # Aggregate outputs from dependencies
-            combined = "\n\n".join(
-                dependency_outputs[dep] for dep in step.depends_on if dep in dependency_outputs
-            )
+            combined = _condensed(_upstream_outputs(step, dependency_results), topic, metrics)
             output = summarize(combined or topic)
 
         elif step.tool == "content_generator":
             # Gather all upstream research
-            research = "\n\n".join(
-                dependency_outputs[dep] for dep in step.depends_on if dep in dependency_outputs
-            )
-            output = generate_post(topic, research)
+            research = _condensed(_upstream_outputs(step, dependency_results), topic, metrics)
+            output, score = _generate(topic, research)
 
         elif step.tool == "content_editor":
             # Get the draft from the dependency (content_generator)
-            draft = "\n\n".join(
-                dependency_outputs[dep] for dep in step.depends_on if dep in dependency_outputs
-            )
+            draft = "\n\n".join(_upstream_outputs(step, dependency_results))
+            draft_scores = [
+                dependency_results[dep].score for dep in step.depends_on
+                if dep in dependency_results and dependency_results[dep].tool == "content_generator"
+            ]
+            if (
+                EDITOR_SKIP_SCORE is not None
+                and draft_scores
+                and all(s is not None and s >= EDITOR_SKIP_SCORE for s in draft_scores)
+            ):
+                # The draft is already good enough; pass it through unedited.
+                return StepResult(
+                    step=step.step,
+                    tool=step.tool,
+                    status="skipped",
+                    output=draft,
+                    duration_ms=int((time.perf_counter() - start) * 1000),
+                ), False
             output = edit_post(draft)
 
         elif step.tool == "image_generator":
-            img_b64, err = generate_image(topic)
+            image_id, err = generate_image(topic)
             if err:
                 return StepResult(
                     step=step.step,
@@ -47,29 +117,104 @@ def _run_step(step, topic: str, dependency_outputs: dict[int, str]) -> StepResul
                     status="error",
                     error=err,
                     duration_ms=int((time.perf_counter() - start) * 1000),
-                )
-            output = img_b64 or ""
+                ), is_transient_error(err)
+            output = image_id or ""
 
         else:
-            output = f"Unknown tool: {step.tool}"
+            raise ValueError(f"Unknown tool: {step.tool}")
 
         duration_ms = int((time.perf_counter() - start) * 1000)
-        return StepResult(step=step.step, tool=step.tool, status="success", output=output, duration_ms=duration_ms)
+        return StepResult(
+            step=step.step, tool=step.tool, status="success", output=output, duration_ms=duration_ms,
+            score=score, metrics=metrics,
+        ), False
 
     except Exception as e:
         duration_ms = int((time.perf_counter() - start) * 1000)
-        return StepResult(step=step.step, tool=step.tool, status="error", output="", error=str(e), duration_ms=duration_ms)
+        result = StepResult(step=step.step, tool=step.tool, status="error", output="", error=str(e), duration_ms=duration_ms)
+        return result, is_transient_error(e)
 
 
-async def execute_plan(plan: ExecutionPlan) -> ExecutionResult:
-    """Execute a plan respecting dependencies, running independent steps in parallel."""
+def run_step_with_retries(
+    step,
+    topic: str,
+    dependency_results: dict[int, StepResult],
+    cancel_event: threading.Event | None = None,
+    ready_at: float | None = None,
+) -> StepResult:
+    """Run a step, retrying transient failures with jittered exponential backoff.
+
+    Only timeouts, connection errors and 5xx responses are retried; anything else
+    (an unknown tool, bad input, a 429 the rate limiter already retried) fails at once.
+
+    ``ready_at`` (perf_counter) is when the step's dependencies were satisfied; the gap
+    until a worker thread picks it up is reported as ``queue_ms``.
+    """
+    queue_ms = int((time.perf_counter() - ready_at) * 1000) if ready_at is not None else 0
+    with metrics.in_flight("steps_in_flight", tool=step.tool):
+        for attempt in range(1, STEP_MAX_RETRIES + 2):
+            result, transient = _run_step(step, topic, dependency_results, cancel_event)
+            result.attempts = attempt
+            if result.status != "error" or not transient or attempt > STEP_MAX_RETRIES:
+                break
+            delay = STEP_RETRY_BACKOFF_S * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5)
+            if cancel_event is not None:
+                if cancel_event.wait(delay):
+                    break
+            else:
+                time.sleep(delay)
+    result.queue_ms = queue_ms
+    metrics.observe("step_queue_seconds", queue_ms / 1000, tool=step.tool)
+    metrics.observe("step_duration_seconds", result.duration_ms / 1000, tool=step.tool)
+    if result.status == "error":
+        metrics.inc("step_errors_total", tool=step.tool)
+    return result
+
+
+async def execute_plan(
+    plan: ExecutionPlan,
+    cancel_event: threading.Event | None = None,
+    on_step: Callable[[StepResult], Awaitable[None] | None] | None = None,
+    checkpoints: CheckpointStore | None = None,
+    force: set[int] | None = None,
+    resume: bool = False,
+) -> ExecutionResult:
+    """Execute a plan respecting dependencies, running independent steps in parallel.
+
+    ``cancel_event`` is checked before every wave and by every step before it starts,
+    so a cancelled job stops scheduling work and in-flight waves finish as errors.
+    ``on_step`` is called with each StepResult as soon as its wave completes.
+    With ``checkpoints``, the plan and every successful step are saved. Only with
+    ``resume`` are they read back: a step whose exact inputs already succeeded for this
+    plan is reused instead of re-run, and steps in ``force`` always re-run.
+    The run is traced as a "plan" span with wave, step and provider-call children.
+    """
+    with span("plan", topic=plan.topic, steps=len(plan.steps)) as plan_span, metrics.in_flight("plans_in_flight"):
+        result = await _execute_plan(plan, cancel_event, on_step, checkpoints, force, resume)
+        plan_span.set(plan_hash=result.plan_hash)
+        result.trace_id = plan_span.trace_id
+        return result
+
+
+async def _execute_plan(
+    plan: ExecutionPlan,
+    cancel_event: threading.Event | None = None,
+    on_step: Callable[[StepResult], Awaitable[None] | None] | None = None,
+    checkpoints: CheckpointStore | None = None,
+    force: set[int] | None = None,
+    resume: bool = False,
+) -> ExecutionResult:
+    key = checkpoints.save_plan(plan) if checkpoints is not None else None
+    force = force or set()
     completed: dict[int, StepResult] = {}
-    outputs: dict[int, str] = {}  # step_number -> output string
     execution_order: list[list[int]] = []
     all_steps = {s.step: s for s in plan.steps}
     remaining = set(all_steps.keys())
 
     while remaining:
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExecutionCancelled("Execution cancelled")
+
         # Find steps whose dependencies are all satisfied
         wave = [
             step_num for step_num in remaining
@@ -77,44 +222,107 @@ async def execute_plan(plan: ExecutionPlan) -> ExecutionResult:
         ]
 
         if not wave:
-            # Deadlock — dependencies can never be satisfied
+            # Deadlock (cycle or missing step): report every unreachable step instead of dropping it.
+            # Plans from create_plan are repaired by plan_validator, so this only guards hand-built plans.
+            blocked = [
+                StepResult(
+                    step=step_num,
+                    tool=all_steps[step_num].tool,
+                    status="error",
+                    error=f"Unsatisfiable dependencies: {[d for d in all_steps[step_num].depends_on if d not in completed]}",
+                )
+                for step_num in sorted(remaining)
+            ]
+            for result in blocked:
+                completed[result.step] = result
+                if on_step is not None:
+                    maybe_awaitable = on_step(result)
+                    if asyncio.iscoroutine(maybe_awaitable):
+                        await maybe_awaitable
             break
 
         execution_order.append(sorted(wave))
 
         # Run wave in parallel
+        ready_at = time.perf_counter()
+
         async def run(step_num):
             step = all_steps[step_num]
-            return await asyncio.to_thread(_run_step, step, plan.topic, outputs)
+            with span("step", step=step_num, tool=step.tool, depends_on=step.depends_on) as step_span:
+                result = await _run_or_reuse(step)
+                step_span.set(status=result.status, cached=result.cached, attempts=result.attempts,
+                              queue_ms=result.queue_ms)
+                for name in ("input_tokens", "output_tokens"):
+                    if name in step_span.attributes:
+                        result.metrics[name] = step_span.attributes[name]
+                return result
+
+        async def _run_or_reuse(step):
+            if checkpoints is None:
+                return await asyncio.to_thread(
+                    run_step_with_retries, step, plan.topic, completed, cancel_event, ready_at
+                )
 
-        results = await asyncio.gather(*(run(s) for s in wave))
+            input_hash = step_input_hash(step, plan.topic, completed)
+            if resume and step.step not in force:
+                cached = await asyncio.to_thread(checkpoints.get_step, key, step.step, input_hash)
+                # An image checkpoint is only useful while its blob is still on disk
+                if cached is not None and (step.tool != "image_generator" or image_store.exists(cached.output)):
+                    cached.cached = True
+                    return cached
+            result = await asyncio.to_thread(
+                run_step_with_retries, step, plan.topic, completed, cancel_event, ready_at
+            )
+            if result.status != "error":
+                await asyncio.to_thread(checkpoints.save_step, key, input_hash, result)
+            return result
+
+        with span("wave", index=len(execution_order), steps=sorted(wave)):
+            results = await asyncio.gather(*(run(s) for s in wave))
 
         for result in results:
             completed[result.step] = result
-            outputs[result.step] = result.output
             remaining.discard(result.step)
+            if on_step is not None:
+                maybe_awaitable = on_step(result)
+                if asyncio.iscoroutine(maybe_awaitable):
+                    await maybe_awaitable
+
+    return build_result(plan, completed, execution_order, plan_hash=key)
+
 
+def build_result(
+    plan: ExecutionPlan,
+    completed: dict[int, StepResult],
+    execution_order: list[list[int]],
+    plan_hash: str | None = None,
+) -> ExecutionResult:
+    """Assemble an ExecutionResult, picking the final post and image from the step results."""
     # Extract final post (from content_editor or content_generator)
     final_post = None
-    image_base64 = None
+    image_id = None
     for step in reversed(plan.steps):
-        if step.tool == "content_editor" and step.step in outputs:
-            final_post = outputs[step.step]
+        if step.step not in completed or completed[step.step].status == "error":
+            continue
+        if step.tool == "content_editor":
+            final_post = completed[step.step].output
             break
-        if step.tool == "content_generator" and step.step in outputs and final_post is None:
-            final_post = outputs[step.step]
+        if step.tool == "content_generator" and final_post is None:
+            final_post = completed[step.step].output
 
     for step in plan.steps:
-        if step.tool == "image_generator" and step.step in outputs:
+        if step.tool == "image_generator" and step.step in completed:
             result = completed[step.step]
             if result.status == "success":
-                image_base64 = outputs[step.step]
+                image_id = result.output or None
             break
 
     return ExecutionResult(
         plan=plan,
         results=list(completed.values()),
         execution_order=execution_order,
+        plan_hash=plan_hash,
         final_post=final_post,
-        image_base64=image_base64,
+        image_id=image_id,
+        image_url=f"/images/{image_id}" if image_id else None,
     )
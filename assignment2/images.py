@@ -0,0 +1,89 @@
+"""Content-addressed local blob store for generated images.
+
+The original image is stored once as lossless PNG under its SHA-256 (so storing the
+same image again is a no-op). Results reference it by id, and the API serves it from
+disk. WebP/JPEG re-encodings and thumbnails are created on first request and cached
+next to the original, so each variant is encoded only once.
+"""
+
+import io
+import hashlib
+import os
+import re
+import threading
+
+from PIL import Image
+
+FORMATS = {"png": "PNG", "webp": "WEBP", "jpeg": "JPEG"}
+MEDIA_TYPES = {"png": "image/png", "webp": "image/webp", "jpeg": "image/jpeg"}
+
+_IMAGE_ID = re.compile(r"^[0-9a-f]{64}$")
+
+
+class ImageNotFoundError(Exception):
+    """Raised for an unknown or malformed image id."""
+
+
+class ImageStore:
+    """Images on disk at ``<root>/<id[:2]>/<id>.png``; variants at ``<id>.<size>.<format>``."""
+
+    def __init__(self, root: str, thumb_size: int = 320, quality: int = 85):
+        self._root = root
+        self._thumb_size = thumb_size
+        self._quality = quality
+        self._lock = threading.Lock()  # one encoder per variant at a time
+
+    def _path(self, image_id: str, suffix: str) -> str:
+        if not _IMAGE_ID.match(image_id):
+            raise ImageNotFoundError(image_id)
+        return os.path.join(self._root, image_id[:2], f"{image_id}.{suffix}")
+
+    def _write(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # readers never see a half-written file
+
+    def put(self, image: Image.Image) -> str:
+        """Store a PIL image and return its id."""
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        data = buffer.getvalue()
+        image_id = hashlib.sha256(data).hexdigest()
+        path = self._path(image_id, "png")
+        if not os.path.exists(path):
+            self._write(path, data)
+        return image_id
+
+    def exists(self, image_id: str) -> bool:
+        try:
+            return os.path.exists(self._path(image_id, "png"))
+        except ImageNotFoundError:
+            return False
+
+    def variant(self, image_id: str, fmt: str = "webp", size: str = "full") -> str:
+        """Path to the image in ``fmt`` ("png", "webp", "jpeg") at ``size`` ("full", "thumb")."""
+        if fmt not in FORMATS or size not in ("full", "thumb"):
+            raise ValueError(f"Unsupported variant: {size}/{fmt}")
+        original = self._path(image_id, "png")
+        if not os.path.exists(original):
+            raise ImageNotFoundError(image_id)
+        if fmt == "png" and size == "full":
+            return original
+
+        path = self._path(image_id, f"{size}.{fmt}")
+        if os.path.exists(path):
+            return path
+        with self._lock:
+            if os.path.exists(path):
+                return path
+            with Image.open(original) as image:
+                if size == "thumb":
+                    image.thumbnail((self._thumb_size, self._thumb_size))
+                if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                buffer = io.BytesIO()
+                image.save(buffer, format=FORMATS[fmt], quality=self._quality)
+            self._write(path, buffer.getvalue())
+        return path
@@ -0,0 +1,240 @@
+"""Asynchronous job queue and worker pool for long-running plan executions.
+
+``POST /jobs`` only enqueues a topic and returns immediately; a fixed pool of worker
+tasks pulls job ids off an asyncio queue and runs them through a pluggable ``runner``
+coroutine (the real planner + executor in api.py, or a stub in local tests).
+Job state lives in a store: in memory by default, or in SQLite when ``JOB_DB_PATH``
+is set, in which case queued/interrupted jobs are re-queued on restart.
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+from typing import AsyncIterator, Awaitable, Callable
+
+from schemas import ExecutionResult, JobInfo, StepResult
+
+TERMINAL_STATUSES = {"succeeded", "failed", "cancelled", "timed_out"}
+
+StepCallback = Callable[[StepResult], Awaitable[None]]
+JobRunner = Callable[[str, threading.Event, StepCallback], Awaitable[ExecutionResult]]
+
+
+class QueueFullError(Exception):
+    """Raised by JobManager.submit when admission control rejects a new job."""
+
+
+class JobNotFoundError(Exception):
+    """Raised when a job id is unknown to the store."""
+
+
+class MemoryJobStore:
+    """Keeps jobs in a dict. Nothing survives a restart."""
+
+    def __init__(self):
+        self._jobs: dict[str, JobInfo] = {}
+
+    def save(self, job: JobInfo) -> None:
+        self._jobs[job.job_id] = job
+
+    def get(self, job_id: str) -> JobInfo | None:
+        return self._jobs.get(job_id)
+
+    def pending(self) -> list[JobInfo]:
+        return []
+
+
+class SQLiteJobStore:
+    """Persists jobs as JSON rows so queued and interrupted jobs survive a restart."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL, data TEXT NOT NULL)"
+            )
+
+    def save(self, job: JobInfo) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, status, created_at, data) VALUES (?, ?, ?, ?)",
+                (job.job_id, job.status, job.created_at, job.model_dump_json()),
+            )
+
+    def get(self, job_id: str) -> JobInfo | None:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return JobInfo.model_validate_json(row[0]) if row else None
+
+    def pending(self) -> list[JobInfo]:
+        """Jobs that were queued or running when the process stopped, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        jobs = [JobInfo.model_validate_json(r[0]) for r in rows]
+        for job in jobs:
+            job.status = "queued"
+            job.started_at = None
+        return jobs
+
+
+class JobManager:
+    """Admission control, a worker pool, per-job timeouts and cancellation."""
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        store: MemoryJobStore | SQLiteJobStore | None = None,
+        workers: int = 2,
+        max_queue: int = 20,
+        timeout_s: float = 600,
+    ):
+        self._runner = runner
+        self._store = store or MemoryJobStore()
+        self._num_workers = workers
+        self._max_queue = max_queue
+        self._timeout_s = timeout_s
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._queued: set[str] = set()  # jobs still waiting; cancelled ids stay in _queue but not here
+        self._workers: list[asyncio.Task] = []
+        self._running: dict[str, tuple[asyncio.Task, threading.Event]] = {}
+        self._cancel_requested: set[str] = set()
+        # Event history of unfinished jobs only; both entries are dropped once a job finishes
+        self._events: dict[str, list[dict]] = {}
+        self._changed: dict[str, asyncio.Event] = {}
+
+    async def start(self) -> None:
+        """Re-queue jobs left over from a previous process and start the workers."""
+        for job in self._store.pending():
+            self._store.save(job)
+            self._queued.add(job.job_id)
+            self._queue.put_nowait(job.job_id)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self._num_workers)]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, topic: str) -> JobInfo:
+        if len(self._queued) >= self._max_queue:
+            raise QueueFullError(f"Job queue is full ({self._max_queue} pending jobs)")
+        job = JobInfo(job_id=uuid.uuid4().hex, topic=topic, created_at=time.time())
+        self._store.save(job)
+        self._emit(job.job_id, {"type": "status", "status": job.status})
+        self._queued.add(job.job_id)
+        self._queue.put_nowait(job.job_id)
+        return job
+
+    def get(self, job_id: str) -> JobInfo:
+        job = self._store.get(job_id)
+        if job is None:
+            raise JobNotFoundError(job_id)
+        return job
+
+    def cancel(self, job_id: str) -> JobInfo:
+        """Cancel a queued or running job. Running steps see the cancel event and stop."""
+        job = self.get(job_id)
+        if job.status in TERMINAL_STATUSES:
+            return job
+        self._cancel_requested.add(job_id)
+        if job_id in self._running:
+            task, cancel_event = self._running[job_id]
+            cancel_event.set()
+            task.cancel()
+        else:
+            self._queued.discard(job_id)
+            self._finish(job, "cancelled")
+        return job
+
+    async def events(self, job_id: str) -> AsyncIterator[dict]:
+        """Yield the job's events from the beginning, then live ones until it finishes.
+
+        A finished job's history is no longer kept, so it is reported from the store as
+        its final status and a ``done`` event.
+        """
+        job = self.get(job_id)
+        if job_id not in self._events:
+            # Finished, or restored from SQLite without an in-memory history: report the current state.
+            yield {"type": "status", "status": job.status}
+            if job.status in TERMINAL_STATUSES:
+                yield {"type": "done", "job": job.model_dump()}
+                return
+        # Hold on to the history and its event: _finish drops them from the dicts after the final event
+        history = self._events.setdefault(job_id, [])
+        changed = self._changed.setdefault(job_id, asyncio.Event())
+        sent = 0
+        while True:
+            changed.clear()
+            while sent < len(history):
+                event = history[sent]
+                sent += 1
+                yield event
+                if event["type"] == "done":
+                    return
+            await changed.wait()
+
+    # ── internals ────────────────────────────────────────────────────────────
+
+    def _emit(self, job_id: str, event: dict) -> None:
+        self._events.setdefault(job_id, []).append(event)
+        self._changed.setdefault(job_id, asyncio.Event()).set()
+
+    def _finish(self, job: JobInfo, status: str, error: str | None = None,
+                result: ExecutionResult | None = None) -> None:
+        job.status = status
+        job.error = error
+        job.result = result
+        job.finished_at = time.time()
+        self._store.save(job)
+        self._cancel_requested.discard(job.job_id)
+        self._emit(job.job_id, {"type": "status", "status": status, "error": error})
+        self._emit(job.job_id, {"type": "done", "job": job.model_dump()})
+        # Live subscribers keep their own references and still receive the events above
+        self._events.pop(job.job_id, None)
+        self._changed.pop(job.job_id, None)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._queued.discard(job_id)
+            try:
+                job = self._store.get(job_id)
+                if job is not None and job.status == "queued":
+                    await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: JobInfo) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        self._store.save(job)
+        self._emit(job.job_id, {"type": "status", "status": "running"})
+
+        async def on_step(result: StepResult) -> None:
+            self._emit(job.job_id, {"type": "step", "result": result.model_dump()})
+
+        cancel_event = threading.Event()
+        task = asyncio.create_task(self._runner(job.topic, cancel_event, on_step))
+        self._running[job.job_id] = (task, cancel_event)
+        try:
+            result = await asyncio.wait_for(task, timeout=self._timeout_s)
+            self._finish(job, "succeeded", result=result)
+        except asyncio.TimeoutError:
+            cancel_event.set()
+            self._finish(job, "timed_out", error=f"Job exceeded {self._timeout_s:.0f}s timeout")
+        except asyncio.CancelledError:
+            cancel_event.set()
+            if job.job_id not in self._cancel_requested:
+                raise  # the worker itself is shutting down; the job stays "running" and is re-queued
+            self._finish(job, "cancelled")
+        except Exception as e:
+            self._finish(job, "failed", error=str(e))
+        finally:
+            self._running.pop(job.job_id, None)
@@ -0,0 +1,307 @@
+"""Local structural validation, repair and optimisation of planner output.
+
+The planner's structured output guarantees the JSON shape of a plan, not that the
+plan can run. Instead of asking the LLM again, plans are checked and fixed here in
+microseconds:
+
+- ``validate_plan`` reports duplicate step numbers, unknown tools, dangling or
+  self dependencies, cycles and violations of the planner's rules.
+- ``repair_plan`` fixes all of them so the plan always executes to completion. Tools
+  that only need the topic (search_web, image_generator) lose their dependencies,
+  and no step waits on a later pipeline stage (a summarizer on the draft, a generator
+  on the editor). This also breaks the common cycles on the side that loses nothing.
+- ``optimize_plan`` rewrites a repaired plan for maximum parallelism: generator and
+  editor keep only the inputs they actually consume, and summarizers that feed
+  exactly the same steps are collapsed into one.
+"""
+
+from pydantic import BaseModel
+
+from schemas import ExecutionPlan, PlanStep
+
+KNOWN_TOOLS = ("search_web", "summarizer", "content_generator", "content_editor", "image_generator")
+RESEARCH_TOOLS = ("search_web", "summarizer")
+TOPIC_ONLY_TOOLS = ("search_web", "image_generator")  # their inputs are the description/topic only
+# Pipeline order: a step never uses the output of a step from a later stage
+STAGES = {"search_web": 0, "image_generator": 0, "summarizer": 1, "content_generator": 2, "content_editor": 3}
+
+
+class PlanIssue(BaseModel):
+    # duplicate_step, unknown_tool, dangling_dependency, self_dependency, unused_dependency, cycle,
+    # missing_step or missing_dependency
+    kind: str
+    step: int | None = None
+    detail: str
+
+    def __str__(self) -> str:
+        return f"{self.kind}: {self.detail}"
+
+
+def _back_edges(steps: list[PlanStep]) -> list[tuple[int, int]]:
+    """Edges (step, dep) closing a cycle, found by depth-first search in step order."""
+    deps = {s.step: [d for d in s.depends_on if d != s.step] for s in steps}
+    state: dict[int, int] = {}  # 1 = on the DFS stack, 2 = finished
+    back = []
+    for root in sorted(deps):
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(sorted(deps[root])))]
+        while stack:
+            node, children = stack[-1]
+            for dep in children:
+                if dep not in deps:
+                    continue
+                if state.get(dep) == 1:
+                    back.append((node, dep))
+                elif dep not in state:
+                    state[dep] = 1
+                    stack.append((dep, iter(sorted(deps[dep]))))
+                    break
+            else:
+                state[node] = 2
+                stack.pop()
+    return back
+
+
+def _ancestors(step: int, deps: dict[int, list[int]]) -> set[int]:
+    seen, frontier = set(), list(deps.get(step, []))
+    while frontier:
+        d = frontier.pop()
+        if d not in seen and d in deps:
+            seen.add(d)
+            frontier.extend(deps[d])
+    return seen
+
+
+def _research_sinks(steps: list[PlanStep]) -> list[int]:
+    """Research steps not consumed by another research step; these must reach the generator."""
+    research = [s for s in steps if s.tool in RESEARCH_TOOLS]
+    consumed = {d for s in research for d in s.depends_on}
+    return [s.step for s in research if s.step not in consumed]
+
+
+def _rule_issues(steps: list[PlanStep]) -> list[PlanIssue]:
+    """Violations of the planner prompt's rules (assumes unique, known, acyclic steps)."""
+    issues = []
+    by_tool = {tool: [s for s in steps if s.tool == tool] for tool in KNOWN_TOOLS}
+    if not by_tool["search_web"]:
+        issues.append(PlanIssue(kind="missing_step", detail="plan has no search_web step"))
+    if not by_tool["content_generator"]:
+        issues.append(PlanIssue(kind="missing_step", detail="plan has no content_generator step"))
+
+    tools = {s.step: s.tool for s in steps}
+    for s in steps:
+        late = [d for d in s.depends_on if STAGES[tools[d]] > STAGES[s.tool]]
+        if s.tool in TOPIC_ONLY_TOOLS and s.depends_on:
+            issues.append(PlanIssue(
+                kind="unused_dependency", step=s.step, detail=f"{s.tool} step {s.step} ignores its dependencies {s.depends_on}",
+            ))
+        elif late:
+            issues.append(PlanIssue(
+                kind="unused_dependency", step=s.step, detail=f"{s.tool} step {s.step} depends on later-stage steps {late}",
+            ))
+
+    deps = {s.step: s.depends_on for s in steps}
+    sinks = _research_sinks(steps)
+    for gen in by_tool["content_generator"]:
+        missing = sorted(set(sinks) - _ancestors(gen.step, deps))
+        if missing:
+            issues.append(PlanIssue(
+                kind="missing_dependency", step=gen.step,
+                detail=f"content_generator step {gen.step} does not use research steps {missing}",
+            ))
+    generators = {s.step for s in by_tool["content_generator"]}
+    for editor in by_tool["content_editor"]:
+        if generators and not generators & set(editor.depends_on):
+            issues.append(PlanIssue(
+                kind="missing_dependency", step=editor.step,
+                detail=f"content_editor step {editor.step} does not depend on a content_generator",
+            ))
+    return issues
+
+
+def validate_plan(plan: ExecutionPlan) -> list[PlanIssue]:
+    """Every structural problem in ``plan``; an empty list means it will run to completion."""
+    issues = []
+    seen = set()
+    for s in plan.steps:
+        if s.step in seen:
+            issues.append(PlanIssue(kind="duplicate_step", step=s.step, detail=f"step number {s.step} is used twice"))
+        seen.add(s.step)
+        if s.tool not in KNOWN_TOOLS:
+            issues.append(PlanIssue(kind="unknown_tool", step=s.step, detail=f"step {s.step} uses unknown tool {s.tool!r}"))
+    for s in plan.steps:
+        for dep in s.depends_on:
+            if dep == s.step:
+                issues.append(PlanIssue(kind="self_dependency", step=s.step, detail=f"step {s.step} depends on itself"))
+            elif dep not in seen:
+                issues.append(PlanIssue(
+                    kind="dangling_dependency", step=s.step, detail=f"step {s.step} depends on missing step {dep}",
+                ))
+    for step, dep in _back_edges(plan.steps):
+        issues.append(PlanIssue(kind="cycle", step=step, detail=f"dependency {step} -> {dep} closes a cycle"))
+    if not issues:
+        issues.extend(_rule_issues(plan.steps))
+    return issues
+
+
+def repair_plan(plan: ExecutionPlan) -> tuple[ExecutionPlan, list[PlanIssue]]:
+    """Return a runnable copy of ``plan`` and the issues that were fixed."""
+    fixed: list[PlanIssue] = []
+    steps = [s.model_copy(deep=True) for s in plan.steps]
+
+    # Duplicate step numbers: later copies get fresh numbers; references keep pointing at the first
+    used = {s.step for s in steps}
+    seen = set()
+    for s in steps:
+        if s.step in seen:
+            new = max(used) + 1
+            fixed.append(PlanIssue(kind="duplicate_step", step=s.step, detail=f"renumbered duplicate step {s.step} to {new}"))
+            used.add(new)
+            s.step = new
+        seen.add(s.step)
+
+    # Unknown tools: drop the step, dependents inherit its dependencies
+    dropped = {s.step: s.depends_on for s in steps if s.tool not in KNOWN_TOOLS}
+    for s in steps:
+        if s.step in dropped:
+            fixed.append(PlanIssue(kind="unknown_tool", step=s.step, detail=f"removed step {s.step} with unknown tool {s.tool!r}"))
+    steps = [s for s in steps if s.step not in dropped]
+    for s in steps:
+        expanded, frontier, visited = [], list(s.depends_on), set()
+        while frontier:
+            dep = frontier.pop(0)
+            if dep in visited:
+                continue
+            visited.add(dep)
+            if dep in dropped:
+                frontier.extend(dropped[dep])
+            else:
+                expanded.append(dep)
+        s.depends_on = expanded
+
+    # Dangling and self dependencies
+    numbers = {s.step for s in steps}
+    for s in steps:
+        kept = []
+        for dep in s.depends_on:
+            if dep == s.step:
+                fixed.append(PlanIssue(kind="self_dependency", step=s.step, detail=f"removed self dependency of step {s.step}"))
+            elif dep not in numbers:
+                fixed.append(PlanIssue(kind="dangling_dependency", step=s.step, detail=f"removed missing dependency {s.step} -> {dep}"))
+            elif dep not in kept:
+                kept.append(dep)
+        s.depends_on = kept
+
+    # search_web / image_generator read only their description and the topic, so waiting on
+    # other steps just delays them (and is the usual way a planner creates a cycle)
+    for s in steps:
+        if s.tool in TOPIC_ONLY_TOOLS and s.depends_on:
+            fixed.append(PlanIssue(
+                kind="unused_dependency", step=s.step, detail=f"removed dependencies {s.depends_on} of {s.tool} step {s.step}",
+            ))
+            s.depends_on = []
+
+    # A step never uses a later stage's output (a summarizer condenses research, a generator
+    # writes from it). Such edges only delay the step, and if they close a cycle, breaking it
+    # by DFS order could drop the real edge instead (e.g. the generator's research input).
+    tools = {s.step: s.tool for s in steps}
+    for s in steps:
+        late = [d for d in s.depends_on if STAGES[tools[d]] > STAGES[s.tool]]
+        if late:
+            fixed.append(PlanIssue(
+                kind="unused_dependency", step=s.step, detail=f"removed later-stage dependencies {late} of {s.tool} step {s.step}",
+            ))
+            s.depends_on = [d for d in s.depends_on if d not in late]
+
+    # Cycles: remove the edge that closes each one
+    by_number = {s.step: s for s in steps}
+    for step, dep in _back_edges(steps):
+        by_number[step].depends_on.remove(dep)
+        fixed.append(PlanIssue(kind="cycle", step=step, detail=f"removed dependency {step} -> {dep} to break a cycle"))
+
+    fixed.extend(_enforce_rules(plan.topic, steps))
+    return ExecutionPlan(topic=plan.topic, steps=steps), fixed
+
+
+def _enforce_rules(topic: str, steps: list[PlanStep]) -> list[PlanIssue]:
+    """Add the steps and edges the planner prompt makes mandatory (mutates ``steps``)."""
+    fixed = []
+    next_number = max((s.step for s in steps), default=0) + 1
+
+    if not any(s.tool == "search_web" for s in steps):
+        steps.append(PlanStep(step=next_number, tool="search_web", description=topic))
+        fixed.append(PlanIssue(kind="missing_step", step=next_number, detail=f"added search_web step {next_number}"))
+        next_number += 1
+
+    if not any(s.tool == "content_generator" for s in steps):
+        steps.append(PlanStep(step=next_number, tool="content_generator", description=f"Write a LinkedIn post about {topic}"))
+        fixed.append(PlanIssue(kind="missing_step", step=next_number, detail=f"added content_generator step {next_number}"))
+        next_number += 1
+
+    sinks = _research_sinks(steps)
+    deps = {s.step: s.depends_on for s in steps}
+    generators = [s for s in steps if s.tool == "content_generator"]
+    for gen in generators:
+        ancestors = _ancestors(gen.step, deps)
+        for sink in sinks:
+            if sink not in ancestors and gen.step not in _ancestors(sink, deps):
+                gen.depends_on.append(sink)
+                fixed.append(PlanIssue(
+                    kind="missing_dependency", step=gen.step, detail=f"added dependency {gen.step} -> {sink}",
+                ))
+
+    for editor in (s for s in steps if s.tool == "content_editor"):
+        if not any(g.step in editor.depends_on for g in generators):
+            gen = next((g for g in reversed(generators) if editor.step not in _ancestors(g.step, deps)), None)
+            if gen is not None:
+                editor.depends_on.append(gen.step)
+                fixed.append(PlanIssue(
+                    kind="missing_dependency", step=editor.step, detail=f"added dependency {editor.step} -> {gen.step}",
+                ))
+    return fixed
+
+
+def optimize_plan(plan: ExecutionPlan) -> ExecutionPlan:
+    """Rewrite dependencies of a valid plan for maximum parallelism without changing its output."""
+    steps = [s.model_copy(deep=True) for s in plan.steps]
+    tools = {s.step: s.tool for s in steps}
+
+    for s in steps:
+        if s.tool == "content_generator":
+            s.depends_on = [d for d in s.depends_on if tools[d] in RESEARCH_TOOLS]
+        elif s.tool == "content_editor":
+            # Every dependency's output is concatenated into the draft, so only drafts belong here
+            s.depends_on = [d for d in s.depends_on if tools[d] == "content_generator"] or s.depends_on
+
+    # Summarizers feeding exactly the same steps are merged into one call over all their inputs
+    consumers: dict[int, frozenset[int]] = {
+        s.step: frozenset(c.step for c in steps if s.step in c.depends_on) for s in steps if s.tool == "summarizer"
+    }
+    groups: dict[frozenset[int], list[int]] = {}
+    for number, users in consumers.items():
+        if users:
+            groups.setdefault(users, []).append(number)
+    merged: dict[int, int] = {}
+    for numbers in groups.values():
+        keep, *rest = sorted(numbers)
+        for number in rest:
+            merged[number] = keep
+    if merged:
+        by_number = {s.step: s for s in steps}
+        for number, keep in merged.items():
+            target = by_number[keep]
+            target.depends_on += [d for d in by_number[number].depends_on if d not in target.depends_on]
+        steps = [s for s in steps if s.step not in merged]
+        for s in steps:
+            rewired = []
+            for dep in s.depends_on:
+                dep = merged.get(dep, dep)
+                if dep not in rewired:
+                    rewired.append(dep)
+            s.depends_on = rewired
+
+    for s in steps:
+        s.depends_on.sort()
+    return ExecutionPlan(topic=plan.topic, steps=steps)
@@ -0,0 +1,118 @@
+"""Lazily built, shared provider clients behind a pluggable registry.
+
+Importing the agents and tools no longer constructs any client. Each provider
+("gemini", "tavily", "huggingface") is built by its registered factory on first
+use and then shared by every request:
+
+- One ChatGoogleGenerativeAI instance serves every Gemini call. Other temperatures
+  are ``model_copy`` variants, which reuse the same google-genai client and so its
+  pooled HTTP connections.
+- Tavily goes through one TavilyClient on a pooled ``requests.Session``.
+- huggingface_hub already shares one HTTP client across InferenceClient calls.
+
+``register`` swaps in another factory; PROVIDER_BACKEND=stub registers the offline
+stubs from stubs.py, so the whole app runs without API keys. ``warm_up`` builds every
+client ahead of time (the API does this at startup) so the first request does not
+pay the import and setup cost.
+"""
+
+import threading
+import time
+from typing import Any, Callable
+
+from config import GEMINI_MODEL, HF_TOKEN, PROVIDER_BACKEND, PROVIDER_CONCURRENCY, require_key
+from telemetry import metrics
+
+PROVIDERS = ("gemini", "tavily", "huggingface")
+
+
+def _gemini():
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(model=GEMINI_MODEL, google_api_key=require_key("GOOGLE_API_KEY"))
+
+
+def _tavily():
+    import requests
+    from requests.adapters import HTTPAdapter
+    from tavily import TavilyClient
+
+    pool = PROVIDER_CONCURRENCY.get("tavily", 8)
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool))
+    return TavilyClient(api_key=require_key("TAVILY_API_KEY"), session=session)
+
+
+def _huggingface():
+    from huggingface_hub import InferenceClient
+
+    return InferenceClient(provider="nscale", api_key=HF_TOKEN)
+
+
+def _stub(name: str) -> Callable[[], Any]:
+    def factory():
+        import stubs
+
+        return {"gemini": stubs.StubChatModel, "tavily": stubs.StubSearchClient, "huggingface": stubs.StubImageClient}[name]()
+
+    return factory
+
+
+_factories: dict[str, Callable[[], Any]] = {"gemini": _gemini, "tavily": _tavily, "huggingface": _huggingface}
+_instances: dict[str, Any] = {}
+_chat_models: dict[float | None, Any] = {}
+_lock = threading.RLock()
+
+
+def register(name: str, factory: Callable[[], Any]) -> None:
+    """Replace the factory for ``name``; the next ``get`` builds a fresh client from it."""
+    with _lock:
+        _factories[name] = factory
+        _instances.pop(name, None)
+        if name == "gemini":
+            _chat_models.clear()
+
+
+def use_stubs() -> None:
+    for name in PROVIDERS:
+        register(name, _stub(name))
+
+
+def get(name: str) -> Any:
+    """The shared client for ``name``, built on first use."""
+    client = _instances.get(name)
+    if client is not None:
+        return client
+    with _lock:
+        if name not in _instances:
+            _instances[name] = _factories[name]()
+        return _instances[name]
+
+
+def chat_model(temperature: float | None = None):
+    """The shared Gemini chat model, at ``temperature`` (None = model default)."""
+    with _lock:
+        if temperature not in _chat_models:
+            base = get("gemini")
+            _chat_models[temperature] = base if temperature is None else base.model_copy(update={"temperature": temperature})
+        return _chat_models[temperature]
+
+
+def warm_up(names: tuple[str, ...] = PROVIDERS) -> dict[str, float | str]:
+    """Build the given clients now. Returns seconds per provider, or the error for ones that failed."""
+    timings: dict[str, float | str] = {}
+    for name in names:
+        start = time.perf_counter()
+        try:
+            get(name)
+        except Exception as e:  # e.g. a missing key: report it, the first real call will raise again
+            metrics.inc("provider_errors_total", provider=name, operation="warm_up")
+            timings[name] = f"{type(e).__name__}: {e}"
+            continue
+        timings[name] = time.perf_counter() - start
+        metrics.gauge_set("provider_warm_up_seconds", timings[name], provider=name)
+    return timings
+
+
+if PROVIDER_BACKEND == "stub":
+    use_stubs()
@@ -0,0 +1,271 @@
+"""Per-provider rate limiting with adaptive concurrency, shared by every request.
+
+Each provider gets one ProviderLimiter for the whole process:
+
+- Two token buckets enforce the provider quota: requests per minute and (for LLMs)
+  tokens per minute. A call reserves its estimated prompt tokens up front, and the
+  bucket is corrected with the real usage (``usage_metadata``) once it returns.
+- Concurrency is capped by an AIMD window. Every fast, successful call adds
+  1/window (about +1 per window of calls). A 429 halves the window and drains the
+  buckets' saved-up burst, so later calls are paced at the quota rate. A call
+  slower than the latency target shrinks the window by 10%. Each decrease is
+  applied at most once per cooldown, so a burst of 429s counts as one signal.
+- A 429 is retried with jittered exponential backoff (honouring Retry-After when
+  the exception carries one). Other errors propagate to the executor, which retries
+  only the transient ones (``is_transient_error``).
+
+Provider calls run in worker threads, so everything here is thread-based.
+"""
+
+import random
+import re
+import threading
+import time
+from typing import Callable, TypeVar
+
+from config import (
+    PROVIDER_CONCURRENCY,
+    PROVIDER_LATENCY_TARGET_S,
+    PROVIDER_RPM,
+    PROVIDER_TPM,
+    RATE_LIMIT_BACKOFF_S,
+    RATE_LIMIT_RETRIES,
+)
+from telemetry import metrics
+
+T = TypeVar("T")
+
+_THROTTLE_MARKERS = ("429", "resource_exhausted", "resource exhausted", "rate limit", "ratelimit", "too many requests", "quota")
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Best-effort 429 detection across the Google, Tavily and HuggingFace client exceptions."""
+    for obj in (error, getattr(error, "response", None)):
+        for attr in ("status_code", "code", "status"):
+            if getattr(obj, attr, None) in (429, "429", "RESOURCE_EXHAUSTED"):
+                return True
+    message = str(error).lower()
+    return any(marker in message for marker in _THROTTLE_MARKERS)
+
+
+_TRANSIENT_MARKERS = (
+    "timed out", "timeout", "deadline exceeded", "connection reset", "connection refused", "connection aborted",
+    "temporarily unavailable", "service unavailable", "bad gateway", "gateway timeout", "internal server error",
+)
+_TRANSIENT_NAMES = ("Timeout", "ConnectionError", "ConnectError", "TransportError", "ServiceUnavailable",
+                    "DeadlineExceeded", "InternalServerError")
+
+
+def _status(error: BaseException) -> int | None:
+    for obj in (error, getattr(error, "response", None)):
+        for attr in ("status_code", "code", "status"):
+            value = getattr(obj, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def is_transient_error(error: BaseException | str) -> bool:
+    """Whether retrying the same call may succeed: timeouts, connection failures and 5xx responses.
+
+    429s are not transient here, since the limiter has already retried them. Programming
+    and input errors (``ValueError``, ``TypeError``, validation errors, unknown tools)
+    fail the same way every time. A plain message (tools that report errors as strings)
+    is classified by its wording.
+    """
+    if isinstance(error, str):
+        message = error.lower()
+        return not any(m in message for m in _THROTTLE_MARKERS) and (
+            any(m in message for m in _TRANSIENT_MARKERS) or re.search(r"\b50[0-4]\b", message) is not None
+        )
+    if is_rate_limit_error(error) or isinstance(error, (ValueError, TypeError, KeyError, AttributeError)):
+        return False
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    if any(name in cls.__name__ for cls in type(error).__mro__ for name in _TRANSIENT_NAMES):
+        return True
+    status = _status(error)
+    return status is not None and 500 <= status < 600
+
+
+def _retry_after(error: BaseException) -> float | None:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+def usage_tokens(response) -> int:
+    """Total tokens reported by a LangChain message (0 when the provider reports none)."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    return usage.get("total_tokens") or usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``per_minute / 60`` tokens per second.
+
+    It holds at most ``burst_s`` seconds of quota (a full minute by default, matching
+    per-minute quotas; lower it for providers that also enforce per-second limits).
+
+    ``reserve`` may drive the level negative; later callers then wait off the debt,
+    which is how under-estimated token counts are paid back.
+    """
+
+    def __init__(self, per_minute: float, burst_s: float = 60.0):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_s)
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens now and return how long the caller must wait before using them."""
+        amount = min(amount, self.capacity)  # a single oversized request must still be able to run
+        with self._lock:
+            self._refill()
+            self._level -= amount
+            return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def drain(self) -> None:
+        """Drop any saved-up burst: the provider says the quota is spent, so pace at the refill rate."""
+        with self._lock:
+            self._refill()
+            self._level = min(self._level, 0.0)
+
+    def adjust(self, delta: float) -> None:
+        """Correct an earlier reservation by ``delta`` tokens (positive = used more than reserved)."""
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level - delta)
+
+
+class ProviderLimiter:
+    def __init__(
+        self,
+        name: str,
+        rpm: int = 0,
+        tpm: int = 0,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        latency_target_s: float | None = None,
+        retries: int = RATE_LIMIT_RETRIES,
+        backoff_s: float = RATE_LIMIT_BACKOFF_S,
+        cooldown_s: float = 5.0,
+        burst_s: float = 60.0,
+    ):
+        self.name = name
+        self.requests = TokenBucket(rpm, burst_s) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm, burst_s) if tpm > 0 else None
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_target_s = latency_target_s
+        self.retries = retries
+        self.backoff_s = backoff_s
+        self.cooldown_s = cooldown_s
+        self.window = float(max_concurrency)
+        self._active = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+        metrics.gauge_set("ratelimit_concurrency_limit", self.window, provider=name)
+
+    def _enter(self) -> None:
+        with self._cond:
+            while self._active >= max(self.min_concurrency, int(self.window)):
+                self._cond.wait()
+            self._active += 1
+
+    def _exit(self) -> None:
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def _decrease(self, factor: float) -> None:
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown_s:
+                return
+            self._last_decrease = now
+            self.window = max(float(self.min_concurrency), self.window * factor)
+        metrics.gauge_set("ratelimit_concurrency_limit", self.window, provider=self.name)
+
+    def _increase(self) -> None:
+        with self._cond:
+            self.window = min(float(self.max_concurrency), self.window + 1.0 / self.window)
+            self._cond.notify_all()
+        metrics.gauge_set("ratelimit_concurrency_limit", self.window, provider=self.name)
+
+    def _wait_for_quota(self, estimated_tokens: int) -> None:
+        wait = self.requests.reserve(1) if self.requests else 0.0
+        if self.tokens and estimated_tokens:
+            wait = max(wait, self.tokens.reserve(estimated_tokens))
+        if wait > 0:
+            metrics.observe("ratelimit_wait_seconds", wait, provider=self.name)
+            time.sleep(wait)
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        estimated_tokens: int = 0,
+        usage: Callable[[T], int] = usage_tokens,
+    ) -> T:
+        """Run ``fn`` within the provider's quota and concurrency window, retrying 429s."""
+        attempt = 0
+        while True:
+            # Quota is reserved before taking a slot, so a caller sleeping on the buckets never holds one
+            self._wait_for_quota(estimated_tokens)
+            self._enter()
+            try:
+                start = time.monotonic()
+                result = fn()
+            except Exception as e:
+                if not is_rate_limit_error(e):
+                    raise
+                metrics.inc("ratelimit_throttled_total", provider=self.name)
+                self._decrease(0.5)
+                for bucket in (self.requests, self.tokens):
+                    if bucket is not None:
+                        bucket.drain()
+                if attempt >= self.retries:
+                    raise
+                delay = _retry_after(e) or self.backoff_s * (2 ** attempt) * random.uniform(0.5, 1.5)
+            else:
+                latency = time.monotonic() - start
+                if self.tokens:
+                    actual = usage(result)
+                    if actual:
+                        self.tokens.adjust(actual - min(estimated_tokens, self.tokens.capacity))
+                if self.latency_target_s is not None and latency > self.latency_target_s:
+                    self._decrease(0.9)
+                else:
+                    self._increase()
+                return result
+            finally:
+                self._exit()
+            # Back off outside the concurrency window so other callers can use the slot
+            metrics.inc("ratelimit_retries_total", provider=self.name)
+            time.sleep(delay)
+            attempt += 1
+
+
+_limiters: dict[str, ProviderLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter(provider: str) -> ProviderLimiter:
+    """The process-wide limiter for ``provider``, configured from config.py on first use."""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = ProviderLimiter(
+                provider,
+                rpm=PROVIDER_RPM.get(provider, 0),
+                tpm=PROVIDER_TPM.get(provider, 0),
+                max_concurrency=PROVIDER_CONCURRENCY.get(provider, 8),
+                latency_target_s=PROVIDER_LATENCY_TARGET_S.get(provider),
+            )
+        return _limiters[provider]
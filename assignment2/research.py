@@ -0,0 +1,169 @@
+"""Local research condensing, run by the executor before summarize / generate_post.
+
+Several search_web steps return overlapping articles (syndicated copies, the same
+press release on different sites) plus cookie banners and navigation text. This
+stage removes near-duplicate results with SimHash, strips boilerplate lines, and
+then extracts the most central sentences until a token budget is met. Everything
+runs locally, so the LLM prompt shrinks without adding a model call.
+"""
+
+import hashlib
+import math
+import re
+from collections import Counter
+
+from pydantic import BaseModel
+
+RESULT_SEPARATOR = "\n\n---\n\n"  # how tools/search.py joins results
+
+_WORD = re.compile(r"[a-z0-9']+")
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+# Typical banner / call-to-action phrasing. A line is only dropped when these phrases make up
+# at least half of its words, so "Users can sign in with passkeys" is kept.
+_BOILERPLATE = re.compile(
+    r"(?<!\w)(we use cookies|(accept|reject)( all)?( cookies)?|cookies?( settings| policy| preferences)?|"
+    r"to (improve|enhance|personali[sz]e) your( browsing)? experience|"
+    r"(subscribe|sign up)( now| today)?( to| for)?( our)?( free)?( newsletter)?|newsletter|"
+    r"(sign|log) (in|out|up)|login|register|create an? (free )?account|to continue( reading)?|"
+    r"all rights reserved|(copyright|\u00a9)( \d{4}(-\d{4})?)?|privacy policy|"
+    r"terms (of|and conditions of) (use|service)|"
+    r"advertisement|click here|read more|share (this|on)( article| post| story)?|follow us( on)?|"
+    r"skip to( main)? content|for the latest (news|updates))(?!\w)",
+    re.IGNORECASE,
+)
+_STOPWORDS = frozenset(
+    "a an and are as at be been but by can for from has have how in into is it its more most "
+    "not of on or our so than that the their them there these they this to was we were what "
+    "when which who will with you your".split()
+)
+
+
+class CondensedResearch(BaseModel):
+    text: str
+    tokens_before: int
+    tokens_after: int
+    duplicates_removed: int
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English prose)."""
+    return math.ceil(len(text) / 4)
+
+
+def _words(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def simhash(text: str, bits: int = 64) -> int:
+    """64-bit SimHash over word trigrams; near-identical texts differ in only a few bits."""
+    words = _words(text)
+    shingles = [" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))]
+    weights = [0] * bits
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(bits):
+            weights[i] += 1 if (h >> i) & 1 else -1
+    return sum(1 << i for i, w in enumerate(weights) if w > 0)
+
+
+def _split_document(doc: str) -> tuple[list[str], str]:
+    """Split a formatted search result into header lines (title, URL) and body text.
+
+    Only the leading ``**title**`` line and the ``URL:`` line after it are header;
+    bold text inside the content stays in the body.
+    """
+    lines = [line.strip() for line in doc.strip().splitlines()]
+    header = []
+    if lines and lines[0].startswith("**"):
+        header.append(lines.pop(0))
+    if lines and lines[0].startswith("URL:"):
+        header.append(lines.pop(0))
+    return header, "\n".join(line for line in lines if line)
+
+
+def strip_boilerplate(body: str) -> str:
+    kept = []
+    for line in body.splitlines():
+        words = line.split()
+        boilerplate_words = sum(len(m.group().split()) for m in _BOILERPLATE.finditer(line))
+        if boilerplate_words and boilerplate_words * 2 >= len(words):
+            continue
+        # Navigation crumbs: a couple of bare words, no sentence punctuation, not a bullet point
+        if len(words) <= 3 and not re.search(r"[.!?:]", line) and not line.lstrip().startswith(("-", "*", "•")):
+            continue
+        kept.append(line)
+    return "\n".join(kept)
+
+
+def dedupe(docs: list[str], max_distance: int = 3) -> tuple[list[str], int]:
+    """Drop documents whose SimHash is within ``max_distance`` bits of an earlier one."""
+    kept, hashes = [], []
+    for doc in docs:
+        h = simhash(_split_document(doc)[1] or doc)
+        if any(bin(h ^ other).count("1") <= max_distance for other in hashes):
+            continue
+        hashes.append(h)
+        kept.append(doc)
+    return kept, len(docs) - len(kept)
+
+
+def _select_sentences(docs: list[tuple[list[str], list[str]]], query: str, token_budget: int) -> list[set[int]]:
+    """Greedy extractive selection: central, query-relevant sentences first, within budget."""
+    doc_freq = Counter()
+    for _, sentences in docs:
+        doc_freq.update({w for s in sentences for w in _words(s) if w not in _STOPWORDS})
+    query_terms = {w for w in _words(query) if w not in _STOPWORDS}
+
+    candidates = []
+    seen = set()
+    for d, (_, sentences) in enumerate(docs):
+        for i, sentence in enumerate(sentences):
+            words = [w for w in _words(sentence) if w not in _STOPWORDS]
+            normalized = " ".join(words)
+            if len(words) < 4 or normalized in seen:
+                continue
+            seen.add(normalized)
+            unique = set(words)
+            score = sum(doc_freq[w] for w in unique) / math.sqrt(len(words)) + 2 * len(unique & query_terms)
+            candidates.append((score, d, i, estimate_tokens(sentence)))
+
+    selected = [set() for _ in docs]
+    used = sum(estimate_tokens("\n".join(header)) for header, _ in docs)
+    for _, d, i, cost in sorted(candidates, reverse=True):
+        if used + cost > token_budget:
+            continue
+        selected[d].add(i)
+        used += cost
+    return selected
+
+
+def condense_research(texts: list[str], query: str, token_budget: int) -> CondensedResearch:
+    """Deduplicate, strip and (if still over ``token_budget``) extract the given upstream outputs."""
+    original = "\n\n".join(texts)
+    tokens_before = estimate_tokens(original)
+
+    docs = [doc for text in texts for doc in text.split(RESULT_SEPARATOR) if doc.strip()]
+    docs, removed = dedupe(docs)
+
+    parsed = []
+    for doc in docs:
+        header, body = _split_document(doc)
+        parsed.append((header, strip_boilerplate(body)))
+
+    if sum(estimate_tokens("\n".join(h) + "\n" + b) for h, b in parsed) > token_budget:
+        split = [(header, [s for s in _SENTENCE_SPLIT.split(body.replace("\n", " ")) if s.strip()])
+                 for header, body in parsed]
+        selected = _select_sentences(split, query, token_budget)
+        parsed = [
+            (header, " ".join(s for i, s in enumerate(sentences) if i in keep))
+            for (header, sentences), keep in zip(split, selected)
+        ]
+
+    blocks = ["\n".join(header + [body]).strip() for header, body in parsed if body.strip()]
+    text = RESULT_SEPARATOR.join(blocks) or original
+    return CondensedResearch(
+        text=text,
+        tokens_before=tokens_before,
+        tokens_after=estimate_tokens(text),
+        duplicates_removed=removed,
+    )
@@ -16,15 +16,34 @@ class ExecutionPlan(BaseModel):
 class StepResult(BaseModel):
     step: int
     tool: str
-    status: str = "success"  # "success" or "error"
+    status: str = "success"  # "success", "error" or "skipped"
     output: str = ""
     duration_ms: int = 0
+    queue_ms: int = 0  # time between dependencies being satisfied and the step starting
     error: str | None = None
+    score: float | None = None  # local draft score (content_generator only)
+    attempts: int = 1
+    cached: bool = False  # reused from a checkpoint instead of re-run
+    metrics: dict[str, float] = Field(default_factory=dict)  # research token counts, LLM input/output tokens
 
 
 class ExecutionResult(BaseModel):
     plan: ExecutionPlan
     results: list[StepResult]
     execution_order: list[list[int]] = Field(default_factory=list, description="Waves of parallel step numbers")
+    plan_hash: str | None = Field(default=None, description="Checkpoint key; pass to /resume to re-run failed steps")
+    trace_id: str | None = Field(default=None, description="Trace id in TRACE_PATH; see trace_viewer.py")
     final_post: str | None = None
-    image_base64: str | None = None
+    image_id: str | None = Field(default=None, description="Content hash of the generated image in the image store")
+    image_url: str | None = Field(default=None, description="Relative URL serving the image; see GET /images/{image_id}")
+
+
+class JobInfo(BaseModel):
+    job_id: str
+    topic: str
+    status: str = "queued"  # "queued", "running", "succeeded", "failed", "cancelled" or "timed_out"
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    result: ExecutionResult | None = None
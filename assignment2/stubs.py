@@ -0,0 +1,140 @@
+"""Offline stand-ins for the Gemini, Tavily and HuggingFace clients.
+
+Enabled with PROVIDER_BACKEND=stub (or providers.use_stubs()). They return
+deterministic, well-formed output with fake token usage, so the API, UI, jobs and
+benchmarks run without network access or API keys. STUB_LATENCY_S adds a sleep per
+call to imitate real provider latency.
+"""
+
+import hashlib
+import re
+import time
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from PIL import Image
+
+from config import STUB_LATENCY_S
+from research import estimate_tokens
+from schemas import ExecutionPlan, PlanStep
+
+
+def _text(message) -> str:
+    content = message.content if isinstance(message, BaseMessage) else message.get("content", "")
+    return content if isinstance(content, str) else " ".join(str(part) for part in content)
+
+
+def _messages(value) -> list:
+    if hasattr(value, "to_messages"):  # a PromptValue
+        return value.to_messages()
+    if isinstance(value, str):
+        return [{"role": "human", "content": value}]
+    return list(value)
+
+
+def _message(text: str, prompt: str) -> AIMessage:
+    input_tokens, output_tokens = estimate_tokens(prompt), estimate_tokens(text)
+    return AIMessage(
+        content=text,
+        usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        },
+    )
+
+
+def stub_plan(topic: str) -> ExecutionPlan:
+    return ExecutionPlan(topic=topic, steps=[
+        PlanStep(step=1, tool="search_web", description=f"{topic} latest news"),
+        PlanStep(step=2, tool="search_web", description=f"{topic} best practices"),
+        PlanStep(step=3, tool="image_generator", description=f"Banner image for {topic}"),
+        PlanStep(step=4, tool="content_generator", description="Write the post", depends_on=[1, 2]),
+        PlanStep(step=5, tool="content_editor", description="Polish the post", depends_on=[4]),
+    ])
+
+
+class StubChatModel(BaseChatModel):
+    """Answers like the planner, summarizer, generator or editor, depending on the prompt."""
+
+    temperature: float | None = None  # accepted (providers.chat_model copies it) but ignored
+
+    @property
+    def _llm_type(self) -> str:
+        return "stub"
+
+    def _reply(self, system: str, human: str) -> str:
+        if "editor" in system:
+            return human  # the draft is already "polished"
+        if human.startswith("Summarize"):
+            sentences = re.split(r"(?<=[.!?])\s+", human.split("\n\n", 1)[-1])
+            return "\n".join(f"- {s.strip()}" for s in sentences[:6] if s.strip())
+        topic = re.search(r"Topic: (.*)", human)
+        topic = topic.group(1).strip() if topic else "this topic"
+        words = re.findall(r"[A-Za-z][A-Za-z']+", human)[:180]
+        body = " ".join(words)
+        return (
+            f"What does {topic} mean for your team this year?\n\n"
+            f"{body}.\n\n"
+            f"What would you add?\n\n#{re.sub(r'[^A-Za-z0-9]', '', topic.title())[:30] or 'AI'} #AI #Engineering"
+        )
+
+    def _generate(self, messages: list[BaseMessage], stop=None, run_manager=None, **kwargs) -> ChatResult:
+        if STUB_LATENCY_S:
+            time.sleep(STUB_LATENCY_S)
+        system = " ".join(_text(m) for m in messages if m.type == "system")
+        human = _text(messages[-1])
+        message = _message(self._reply(system, human), system + human)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def with_structured_output(self, schema, *, include_raw: bool = False, **kwargs):
+        if schema is not ExecutionPlan:
+            raise NotImplementedError(f"StubChatModel only produces ExecutionPlan, not {schema!r}")
+
+        def plan(value):
+            if STUB_LATENCY_S:
+                time.sleep(STUB_LATENCY_S)
+            messages = _messages(value)
+            human = _text(messages[-1])
+            topic = human.split("about:", 1)[-1].strip()
+            parsed = stub_plan(topic)
+            if not include_raw:
+                return parsed
+            raw = _message(parsed.model_dump_json(), " ".join(_text(m) for m in messages))
+            return {"raw": raw, "parsed": parsed, "parsing_error": None}
+
+        return RunnableLambda(plan)
+
+
+class StubSearchClient:
+    """Mimics TavilyClient.search: a dict with a "results" list."""
+
+    def search(self, query: str, max_results: int = 5, **kwargs) -> dict:
+        if STUB_LATENCY_S:
+            time.sleep(STUB_LATENCY_S)
+        slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")
+        return {"query": query, "results": [
+            {
+                "title": f"{query}: perspective {i + 1}",
+                "url": f"https://example.com/{slug}/{i + 1}",
+                "content": (
+                    f"Teams adopting {query} report faster delivery when they start small. "
+                    f"Finding {i + 1}: measuring outcomes early keeps {query} projects on track. "
+                    f"Practitioners recommend pairing {query} with clear ownership and observability."
+                ),
+            }
+            for i in range(max_results)
+        ]}
+
+
+class StubImageClient:
+    """Mimics InferenceClient.text_to_image with a gradient coloured by the prompt's hash."""
+
+    def text_to_image(self, prompt: str, model: str | None = None, **kwargs) -> Image.Image:
+        if STUB_LATENCY_S:
+            time.sleep(STUB_LATENCY_S)
+        r, g, b = hashlib.sha256(prompt.encode("utf-8")).digest()[:3]
+        gradient = Image.linear_gradient("L").resize((1024, 576))
+        return Image.merge("RGB", [gradient.point(lambda v, c=c: (v * c) // 255) for c in (r, g, b)])
@@ -0,0 +1,212 @@
+"""Lightweight tracing and Prometheus-style metrics for the executor.
+
+Spans follow the OpenTelemetry shape (trace id, span id, parent id, start/end,
+attributes) without the SDK dependency: request -> plan -> wave -> step -> provider.
+The current span is kept in a ContextVar, which asyncio.to_thread copies into worker
+threads, so provider calls made inside a step are parented correctly. Finished traces
+are appended as one JSON line each to TRACE_PATH for trace_viewer.py.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from config import TRACE_PATH
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Span:
+    def __init__(self, name: str, parent: "Span | None", attributes: dict):
+        self.name = name
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.span_id = uuid.uuid4().hex[:16]
+        self.start = time.time()
+        self.end: float | None = None
+        self.attributes = dict(attributes)
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def record_usage(self, response) -> None:
+        """Add token usage from a LangChain message (``usage_metadata``) to this span and its ancestors."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        provider = self.attributes.get("provider", "unknown")
+        metrics.inc("provider_tokens_total", input_tokens, provider=provider, direction="input")
+        metrics.inc("provider_tokens_total", output_tokens, provider=provider, direction="output")
+        # Sibling spans (e.g. parallel drafts) run in worker threads and share ancestors
+        with _usage_lock:
+            span = self
+            while span is not None:
+                span.attributes["input_tokens"] = span.attributes.get("input_tokens", 0) + input_tokens
+                span.attributes["output_tokens"] = span.attributes.get("output_tokens", 0) + output_tokens
+                span = span.parent
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "start": self.start,
+            "end": self.end,
+            "attributes": self.attributes,
+        }
+
+
+_current: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_traces: dict[str, list[Span]] = {}
+_traces_lock = threading.Lock()
+_export_lock = threading.Lock()
+_usage_lock = threading.Lock()
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Open a child of the current span (or a new trace). The root span exports the trace on exit."""
+    parent = _current.get()
+    s = Span(name, parent, attributes)
+    if parent is None:
+        with _traces_lock:
+            _traces[s.trace_id] = []
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.set(error=str(e) or type(e).__name__)
+        raise
+    finally:
+        s.end = time.time()
+        _current.reset(token)
+        with _traces_lock:
+            spans = _traces.get(s.trace_id)
+            if spans is not None:  # late spans from an already exported trace are dropped
+                spans.append(s)
+            if parent is None:
+                finished = _traces.pop(s.trace_id, [])
+        if parent is None:
+            _export(finished)
+
+
+@contextmanager
+def provider_call(provider: str, operation: str):
+    """Span + latency histogram around one upstream API call."""
+    with span(f"{provider}.{operation}", provider=provider, operation=operation) as s:
+        start = time.perf_counter()
+        try:
+            yield s
+        except Exception:
+            metrics.inc("provider_errors_total", provider=provider, operation=operation)
+            raise
+        finally:
+            metrics.observe("provider_latency_seconds", time.perf_counter() - start,
+                            provider=provider, operation=operation)
+
+
+def _export(spans: list[Span]) -> None:
+    if not TRACE_PATH or not spans:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(TRACE_PATH)), exist_ok=True)
+    line = json.dumps({"trace_id": spans[0].trace_id, "spans": [s.to_dict() for s in spans]})
+    with _export_lock, open(TRACE_PATH, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def _quantile(sorted_values: list[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class Metrics:
+    """Thread-safe counters, gauges and windowed summaries rendered in Prometheus text format."""
+
+    def __init__(self, window: int = 2048):
+        self._lock = threading.Lock()
+        self._window = window
+        self._counters: dict[tuple, float] = defaultdict(float)
+        self._gauges: dict[tuple, float] = defaultdict(float)
+        self._samples: dict[tuple, deque] = {}
+        self._sums: dict[tuple, float] = defaultdict(float)
+        self._counts: dict[tuple, int] = defaultdict(int)
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return (name, tuple(sorted(labels.items())))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        with self._lock:
+            self._counters[self._key(name, labels)] += value
+
+    def gauge_add(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[self._key(name, labels)] += value
+
+    def gauge_set(self, name: str, value: float, **labels) -> None:
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self._samples.setdefault(key, deque(maxlen=self._window)).append(value)
+            self._sums[key] += value
+            self._counts[key] += 1
+
+    @contextmanager
+    def in_flight(self, name: str, **labels):
+        self.gauge_add(name, 1, **labels)
+        try:
+            yield
+        finally:
+            self.gauge_add(name, -1, **labels)
+
+    def quantiles(self, name: str, **labels) -> dict[float, float]:
+        with self._lock:
+            samples = sorted(self._samples.get(self._key(name, labels), ()))
+        return {q: _quantile(samples, q) for q in QUANTILES} if samples else {}
+
+    def render_prometheus(self) -> str:
+        def fmt_labels(labels: tuple, extra: dict | None = None) -> str:
+            items = list(labels) + list((extra or {}).items())
+            return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}" if items else ""
+
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            samples = {k: sorted(v) for k, v in self._samples.items()}
+            sums, counts = dict(self._sums), dict(self._counts)
+
+        lines, typed = [], set()
+        for (name, labels), value in sorted(counters.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{fmt_labels(labels)} {value:g}")
+        for (name, labels), value in sorted(gauges.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} gauge")
+                typed.add(name)
+            lines.append(f"{name}{fmt_labels(labels)} {value:g}")
+        for (name, labels), values in sorted(samples.items()):
+            if name not in typed:
+                lines.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for q in QUANTILES:
+                lines.append(f"{name}{fmt_labels(labels, {'quantile': q})} {_quantile(values, q):.6f}")
+            lines.append(f"{name}_sum{fmt_labels(labels)} {sums[(name, labels)]:.6f}")
+            lines.append(f"{name}_count{fmt_labels(labels)} {counts[(name, labels)]}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
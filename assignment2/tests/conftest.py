@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The app modules are flat (``import jobs``), so tests import them from the assignment2 directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,185 @@
+"""JobManager driven by a stub runner: no planner, providers or API keys involved."""
+
+import asyncio
+import threading
+
+import pytest
+
+from jobs import JobManager, MemoryJobStore, QueueFullError, SQLiteJobStore
+from schemas import ExecutionPlan, ExecutionResult, PlanStep, StepResult
+
+
+def stub_plan(topic: str) -> ExecutionPlan:
+    return ExecutionPlan(topic=topic, steps=[
+        PlanStep(step=1, tool="search_web", description=topic),
+        PlanStep(step=2, tool="content_generator", description="write", depends_on=[1]),
+    ])
+
+
+class StubExecutor:
+    """Stands in for executor.execute_plan: one result per step, each step waiting for ``gate``."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.started: list[str] = []
+
+    async def execute_plan(self, plan: ExecutionPlan, cancel_event: threading.Event, on_step) -> ExecutionResult:
+        self.started.append(plan.topic)
+        results = []
+        for step in plan.steps:
+            await self.gate.wait()
+            if cancel_event.is_set():
+                raise asyncio.CancelledError
+            result = StepResult(step=step.step, tool=step.tool, output=f"{step.tool}: {plan.topic}")
+            results.append(result)
+            await on_step(result)
+        return ExecutionResult(plan=plan, results=results, final_post=results[-1].output)
+
+    async def runner(self, topic: str, cancel_event: threading.Event, on_step) -> ExecutionResult:
+        return await self.execute_plan(stub_plan(topic), cancel_event, on_step)
+
+
+async def collect(manager: JobManager, job_id: str) -> list[dict]:
+    return [event async for event in manager.events(job_id)]
+
+
+async def settle() -> None:
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_submit_runs_job_and_streams_events():
+    async def scenario():
+        stub = StubExecutor()
+        manager = JobManager(stub.runner, workers=1)
+        await manager.start()
+        job = manager.submit("rust")
+        listener = asyncio.create_task(collect(manager, job.job_id))
+        await settle()
+        assert manager.get(job.job_id).status == "running"
+        stub.gate.set()
+        events = await asyncio.wait_for(listener, timeout=5)
+        await manager.stop()
+        return manager, job, events
+
+    manager, job, events = asyncio.run(scenario())
+    assert [e["type"] for e in events] == ["status", "status", "step", "step", "status", "done"]
+    assert [e["status"] for e in events if e["type"] == "status"] == ["queued", "running", "succeeded"]
+    finished = manager.get(job.job_id)
+    assert finished.status == "succeeded"
+    assert finished.result.final_post == "content_generator: rust"
+    assert events[-1]["job"]["status"] == "succeeded"
+
+
+def test_finished_job_history_is_dropped():
+    async def scenario():
+        stub = StubExecutor()
+        stub.gate.set()
+        manager = JobManager(stub.runner, workers=2)
+        await manager.start()
+        jobs = [manager.submit(f"topic {i}") for i in range(5)]
+        for job in jobs:
+            await asyncio.wait_for(collect(manager, job.job_id), timeout=5)
+        late = await collect(manager, jobs[0].job_id)
+        await manager.stop()
+        return manager, late
+
+    manager, late = asyncio.run(scenario())
+    assert manager._events == {} and manager._changed == {}
+    # A subscriber arriving after the job finished still gets its final state
+    assert [e["type"] for e in late] == ["status", "done"]
+    assert late[0]["status"] == "succeeded"
+
+
+def test_cancel_queued_job_frees_its_queue_slot():
+    async def scenario():
+        stub = StubExecutor()
+        manager = JobManager(stub.runner, workers=1, max_queue=2)
+        await manager.start()
+        running = manager.submit("running")
+        await settle()  # the single worker picks it up and blocks on the gate
+        queued = [manager.submit("a"), manager.submit("b")]
+        with pytest.raises(QueueFullError):
+            manager.submit("c")
+        for job in queued:
+            manager.cancel(job.job_id)
+        # Cancelled ids are still in the asyncio queue but no longer count as pending
+        replacements = [manager.submit("d"), manager.submit("e")]
+        stub.gate.set()
+        for job in [running, *replacements]:
+            await asyncio.wait_for(collect(manager, job.job_id), timeout=5)
+        await manager.stop()
+        return manager, stub, queued, replacements
+
+    manager, stub, queued, replacements = asyncio.run(scenario())
+    assert [manager.get(j.job_id).status for j in queued] == ["cancelled", "cancelled"]
+    assert [manager.get(j.job_id).status for j in replacements] == ["succeeded", "succeeded"]
+    assert stub.started == ["running", "d", "e"]
+
+
+def test_cancel_running_job():
+    async def scenario():
+        stub = StubExecutor()
+        manager = JobManager(stub.runner, workers=1)
+        await manager.start()
+        job = manager.submit("slow")
+        listener = asyncio.create_task(collect(manager, job.job_id))
+        await settle()
+        manager.cancel(job.job_id)
+        events = await asyncio.wait_for(listener, timeout=5)
+        await manager.stop()
+        return manager, job, events
+
+    manager, job, events = asyncio.run(scenario())
+    assert manager.get(job.job_id).status == "cancelled"
+    assert events[-1]["type"] == "done" and events[-1]["job"]["status"] == "cancelled"
+    assert not any(e["type"] == "step" for e in events)
+
+
+def test_timeout():
+    async def scenario():
+        stub = StubExecutor()
+        manager = JobManager(stub.runner, workers=1, timeout_s=0.05)
+        await manager.start()
+        job = manager.submit("never")
+        events = await asyncio.wait_for(collect(manager, job.job_id), timeout=5)
+        await manager.stop()
+        return manager, job, events
+
+    manager, job, events = asyncio.run(scenario())
+    assert manager.get(job.job_id).status == "timed_out"
+    assert events[-1]["job"]["status"] == "timed_out"
+
+
+def test_restart_requeues_interrupted_jobs(tmp_path):
+    path = str(tmp_path / "jobs.db")
+
+    async def first_process():
+        stub = StubExecutor()
+        manager = JobManager(stub.runner, store=SQLiteJobStore(path), workers=1)
+        await manager.start()
+        interrupted = manager.submit("interrupted")
+        await settle()
+        waiting = manager.submit("waiting")
+        await manager.stop()  # shut down mid-run, like a killed process
+        return interrupted, waiting
+
+    async def second_process(job_ids):
+        stub = StubExecutor()
+        stub.gate.set()
+        manager = JobManager(stub.runner, store=SQLiteJobStore(path), workers=1)
+        await manager.start()
+        events = [await asyncio.wait_for(collect(manager, job_id), timeout=5) for job_id in job_ids]
+        await manager.stop()
+        return manager, stub, events
+
+    interrupted, waiting = asyncio.run(first_process())
+    assert SQLiteJobStore(path).get(interrupted.job_id).status == "running"
+    manager, stub, events = asyncio.run(second_process([interrupted.job_id, waiting.job_id]))
+    assert stub.started == ["interrupted", "waiting"]
+    assert [manager.get(j.job_id).status for j in (interrupted, waiting)] == ["succeeded", "succeeded"]
+    assert all(e[-1]["job"]["status"] == "succeeded" for e in events)
+
+
+def test_memory_store_has_nothing_to_restore():
+    assert MemoryJobStore().pending() == []
@@ -0,0 +1,90 @@
+"""validate_plan / repair_plan / optimize_plan on hand-built plans (no planner call)."""
+
+import pytest
+
+from plan_validator import optimize_plan, repair_plan, validate_plan
+from schemas import ExecutionPlan, PlanStep
+
+
+def plan(*steps: tuple) -> ExecutionPlan:
+    return ExecutionPlan(topic="vector databases", steps=[
+        PlanStep(step=n, tool=tool, description=f"{tool} {n}", depends_on=list(deps)) for n, tool, deps in steps
+    ])
+
+
+VALID = plan(
+    (1, "search_web", []),
+    (2, "search_web", []),
+    (3, "summarizer", [1, 2]),
+    (4, "content_generator", [3]),
+    (5, "content_editor", [4]),
+    (6, "image_generator", []),
+)
+
+BROKEN = {
+    "duplicate_step": plan((1, "search_web", []), (1, "search_web", []), (2, "content_generator", [1])),
+    "unknown_tool": plan((1, "search_web", []), (2, "translate", [1]), (3, "content_generator", [2])),
+    "dangling_dependency": plan((1, "search_web", []), (2, "content_generator", [1, 9])),
+    "self_dependency": plan((1, "search_web", []), (2, "content_generator", [1, 2])),
+    "unused_dependency": plan(
+        (1, "search_web", []), (2, "search_web", [1]), (3, "content_generator", [2]), (4, "image_generator", [3]),
+    ),
+    "cycle": plan((1, "search_web", []), (2, "content_generator", [1, 3]), (3, "content_editor", [2])),
+    "summarizer_cycle": plan((1, "search_web", []), (2, "summarizer", [1, 3]), (3, "content_generator", [2])),
+    "missing_step": plan((1, "summarizer", []), (2, "content_editor", [1])),
+    "missing_dependency": plan(
+        (1, "search_web", []), (2, "search_web", []), (3, "content_generator", [1]), (4, "content_editor", [1]),
+    ),
+}
+
+
+def test_valid_plan_has_no_issues():
+    assert validate_plan(VALID) == []
+    repaired, fixed = repair_plan(VALID)
+    assert fixed == [] and repaired == VALID
+
+
+@pytest.mark.parametrize("name", BROKEN)
+def test_repair_produces_a_valid_plan(name):
+    broken = BROKEN[name]
+    assert validate_plan(broken) != []
+    repaired, fixed = repair_plan(broken)
+    assert fixed
+    assert validate_plan(repaired) == []
+    assert validate_plan(optimize_plan(repaired)) == []
+
+
+def test_summarizer_cycle_keeps_the_generator_research_input():
+    repaired, fixed = repair_plan(BROKEN["summarizer_cycle"])
+    deps = {s.step: s.depends_on for s in repaired.steps}
+    assert deps[2] == [1]  # the summarizer no longer waits on the post
+    assert deps[3] == [2]
+    assert [i.kind for i in fixed] == ["unused_dependency"]
+
+
+def test_generator_editor_cycle_keeps_the_editor_draft_input():
+    repaired, _ = repair_plan(BROKEN["cycle"])
+    deps = {s.step: s.depends_on for s in repaired.steps}
+    assert deps == {1: [], 2: [1], 3: [2]}
+
+
+def test_validate_reports_issue_kinds():
+    for name, broken in BROKEN.items():
+        kinds = {i.kind for i in validate_plan(broken)}
+        expected = "cycle" if name == "summarizer_cycle" else name
+        assert expected in kinds, (name, kinds)
+
+
+def test_optimize_drops_unused_inputs_and_merges_summarizers():
+    optimized = optimize_plan(plan(
+        (1, "search_web", []),
+        (2, "search_web", []),
+        (3, "summarizer", [1]),
+        (4, "summarizer", [2]),
+        (5, "content_generator", [3, 4]),
+        (6, "image_generator", []),
+        (7, "content_editor", [5, 1, 6]),
+    ))
+    deps = {s.step: s.depends_on for s in optimized.steps}
+    assert deps == {1: [], 2: [], 3: [1, 2], 5: [3], 6: [], 7: [5]}
+    assert validate_plan(optimized) == []
@@ -0,0 +1,163 @@
+"""ProviderLimiter against a local fake provider that enforces RPM/TPM quotas with 429s."""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from benchmarks.bench_ratelimit import FakeProvider, FakeRateLimitError
+from ratelimit import ProviderLimiter, TokenBucket, is_rate_limit_error, is_transient_error
+
+
+def test_token_bucket_paces_after_burst():
+    bucket = TokenBucket(per_minute=600, burst_s=1.0)  # 10 per second, burst of 10
+    assert [bucket.reserve(1) for _ in range(10)] == [0.0] * 10
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.01)
+    bucket.adjust(-1)  # the last reservation was not used after all
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.01)
+
+
+def test_token_bucket_drain_and_oversized_reservation():
+    bucket = TokenBucket(per_minute=60, burst_s=5.0)  # 1 per second, burst of 5
+    bucket.drain()
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.01)
+    # A request larger than the bucket is capped at its capacity instead of waiting forever
+    assert TokenBucket(per_minute=60, burst_s=5.0).reserve(1000) == 0.0
+
+
+def _load(limiter: ProviderLimiter | None, calls: int = 40, threads: int = 8) -> tuple[FakeProvider, int, float]:
+    """``calls`` calls of 80 tokens against a 20 requests/s fake quota; returns the provider, failures and wall time."""
+    provider = FakeProvider(rpm=1200, tpm=120_000, latency_s=0.01)
+    rng = random.Random(1)
+    failures = 0
+
+    def one(_):
+        nonlocal failures
+        try:
+            if limiter is None:
+                provider.call(80, rng)
+            else:
+                limiter.call(lambda: provider.call(80, rng), estimated_tokens=80, usage=lambda r: r["tokens"])
+        except FakeRateLimitError:
+            failures += 1
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(one, range(calls)))
+    return provider, failures, time.monotonic() - start
+
+
+def test_limiter_keeps_fake_provider_within_quota():
+    _, unthrottled_failures, _ = _load(None)
+    # The fake counts calls per calendar second, so the limiter runs a little under its quota
+    # (18/s) with almost no burst; otherwise one window can see a burst plus a second of refill
+    limiter = ProviderLimiter("fake", rpm=1080, tpm=120_000, max_concurrency=8, burst_s=0.1,
+                              backoff_s=0.05, cooldown_s=0.5)
+    provider, failures, elapsed = _load(limiter)
+
+    assert unthrottled_failures >= 10
+    assert failures == 0 and provider.served == 40
+    assert provider.throttled <= 2
+    assert elapsed >= 40 / 18 - 0.2
+
+
+def test_429_halves_window_once_per_cooldown_and_retries():
+    limiter = ProviderLimiter("fake", max_concurrency=8, backoff_s=0.001, cooldown_s=60.0, retries=3)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) <= 2:
+            raise FakeRateLimitError("429 Too Many Requests")
+        return "ok"
+
+    assert limiter.call(flaky, usage=lambda r: 0) == "ok"
+    assert len(attempts) == 3
+    # Two 429s inside one cooldown count as a single decrease, then the success adds 1/window
+    assert limiter.window == pytest.approx(4.0 + 1 / 4.0)
+
+
+def test_429_gives_up_after_retries():
+    limiter = ProviderLimiter("fake", backoff_s=0.001, retries=2)
+    attempts = []
+
+    def throttled():
+        attempts.append(1)
+        raise FakeRateLimitError("429")
+
+    with pytest.raises(FakeRateLimitError):
+        limiter.call(throttled)
+    assert len(attempts) == 3
+
+
+def test_other_errors_are_not_retried():
+    limiter = ProviderLimiter("fake", backoff_s=0.001, retries=3)
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        limiter.call(broken)
+    assert len(attempts) == 1
+    assert limiter.window == 8.0
+
+
+def test_slow_calls_shrink_window():
+    limiter = ProviderLimiter("fake", max_concurrency=10, latency_target_s=0.01, cooldown_s=0.0)
+    limiter.call(lambda: time.sleep(0.02), usage=lambda r: 0)
+    assert limiter.window == pytest.approx(9.0)
+
+
+def test_concurrency_window_caps_parallel_calls():
+    limiter = ProviderLimiter("fake", max_concurrency=3)
+    active = peak = 0
+    lock = threading.Lock()
+
+    def call():
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        list(pool.map(lambda _: limiter.call(call, usage=lambda r: 0), range(20)))
+    assert peak <= 3
+
+
+def test_quota_wait_does_not_hold_a_slot():
+    limiter = ProviderLimiter("fake", tpm=60, max_concurrency=1, burst_s=1.0)  # 1 token per second
+    limiter.tokens.drain()
+    waiting = threading.Thread(target=limiter.call, args=(lambda: None,), kwargs={"estimated_tokens": 1})
+    waiting.start()
+    time.sleep(0.05)  # the first caller is now sleeping on the token bucket
+    start = time.monotonic()
+    limiter.call(lambda: None, usage=lambda r: 0)
+    assert time.monotonic() - start < 0.5
+    waiting.join()
+
+def test_error_classification():
+    request = httpx.Request("POST", "https://example.com")
+
+    def status_error(code: int) -> httpx.HTTPStatusError:
+        return httpx.HTTPStatusError(str(code), request=request, response=httpx.Response(code, request=request))
+
+    assert is_rate_limit_error(FakeRateLimitError("slow down"))
+    assert is_rate_limit_error(Exception("RESOURCE_EXHAUSTED: quota exceeded"))
+    assert not is_rate_limit_error(ValueError("bad input"))
+
+    assert is_transient_error(httpx.ReadTimeout("timed out"))
+    assert is_transient_error(ConnectionError("reset"))
+    assert is_transient_error(status_error(503))
+    assert is_transient_error("503 Service Unavailable")
+    assert not is_transient_error(status_error(400))
+    assert not is_transient_error(status_error(429))  # already retried by the limiter
+    assert not is_transient_error(ValueError("Unknown tool: foo"))
+    assert not is_transient_error("Invalid prompt")
@@ -1,18 +1,16 @@
-import io
-import base64
-from huggingface_hub import InferenceClient
-from config import HF_TOKEN
+import providers
+from config import IMAGE_DIR, IMAGE_QUALITY, IMAGE_THUMB_SIZE
+from images import ImageStore
+from ratelimit import limiter
+from telemetry import provider_call
 
-_client = InferenceClient(
-    provider="nscale",
-    api_key=HF_TOKEN,
-)
+image_store = ImageStore(IMAGE_DIR, thumb_size=IMAGE_THUMB_SIZE, quality=IMAGE_QUALITY)
 
 
 def generate_image(topic: str) -> tuple[str | None, str | None]:
     """Generate a professional LinkedIn banner image using Stable Diffusion XL via HuggingFace Inference Client.
 
-    Returns (base64_str, error). One of them will be None.
+    The image is written to the local blob store. Returns (image_id, error). One of them will be None.
     """
     prompt = (
         f"Professional, modern LinkedIn banner image about: {topic}. "
@@ -20,14 +18,14 @@ def generate_image(topic: str) -> tuple[str | None, str | None]:
         f"No text, no words, no letters in the image. Suitable as a LinkedIn post header."
     )
     try:
-        image = _client.text_to_image(
-            prompt,
-            model="stabilityai/stable-diffusion-xl-base-1.0",
-        )
-        # image is a PIL.Image object — convert to base64
-        buffer = io.BytesIO()
-        image.save(buffer, format="PNG")
-        img_b64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
-        return img_b64, None
+        with provider_call("huggingface", "text_to_image"):
+            image = limiter("huggingface").call(
+                lambda: providers.get("huggingface").text_to_image(
+                    prompt,
+                    model="stabilityai/stable-diffusion-xl-base-1.0",
+                )
+            )
+        # image is a PIL.Image object — store it by content hash instead of inlining it in the result
+        return image_store.put(image), None
     except Exception as e:
         return None, str(e)
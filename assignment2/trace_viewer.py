@@ -0,0 +1,134 @@
+"""Offline viewer for the traces written by telemetry.py.
+
+Prints each trace as an indented span tree with a timeline bar, then the
+critical path through the plan's steps: starting from the step that finished
+last, repeatedly follow the dependency that finished last. In a /batch trace the
+topics reuse step numbers, so dependencies are followed within the same topic.
+
+    python trace_viewer.py                  # last trace
+    python trace_viewer.py --last 5
+    python trace_viewer.py --trace <trace_id>
+"""
+
+import argparse
+import json
+import sys
+
+from config import TRACE_PATH
+
+BAR_WIDTH = 40
+
+
+def load_traces(path: str) -> list[dict]:
+    traces = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                traces.append(json.loads(line))
+    return traces
+
+
+def _label(s: dict) -> str:
+    attrs = s["attributes"]
+    if s["name"] == "step":
+        label = f"step {attrs.get('step')} {attrs.get('tool')}"
+        if attrs.get("cached"):
+            label += " (cached)"
+        elif attrs.get("status") and attrs["status"] != "success":
+            label += f" ({attrs['status']})"
+        return label
+    if s["name"] == "wave":
+        return f"wave {attrs.get('index')} {attrs.get('steps')}"
+    return s["name"]
+
+
+def _tokens(s: dict) -> str:
+    attrs = s["attributes"]
+    if "input_tokens" not in attrs and "output_tokens" not in attrs:
+        return ""
+    return f"  tok {attrs.get('input_tokens', 0)}/{attrs.get('output_tokens', 0)}"
+
+
+def critical_path(spans: list[dict]) -> list[dict]:
+    """Step spans on the longest dependency chain, first step first."""
+    # Batch step spans carry their topic; single-plan ones do not (topic None)
+    steps = {(s["attributes"].get("topic"), s["attributes"]["step"]): s for s in spans if s["name"] == "step"}
+    if not steps:
+        return []
+    path = [max(steps.values(), key=lambda s: s["end"])]
+    while True:
+        topic = path[-1]["attributes"].get("topic")
+        deps = [steps[(topic, d)] for d in path[-1]["attributes"].get("depends_on", []) if (topic, d) in steps]
+        if not deps:
+            break
+        path.append(max(deps, key=lambda s: s["end"]))
+    return list(reversed(path))
+
+
+def render(trace: dict) -> str:
+    spans = sorted(trace["spans"], key=lambda s: s["start"])
+    children: dict[str | None, list[dict]] = {}
+    ids = {s["span_id"] for s in spans}
+    for s in spans:
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        children.setdefault(parent, []).append(s)
+
+    t0 = spans[0]["start"]
+    total = max(s["end"] for s in spans) - t0 or 1e-9
+    lines = [f"trace {trace['trace_id']}  ({total * 1000:.0f} ms, {len(spans)} spans)"]
+
+    def walk(parent_id, depth):
+        for s in children.get(parent_id, []):
+            offset, duration = s["start"] - t0, s["end"] - s["start"]
+            left = int(offset / total * BAR_WIDTH)
+            width = max(1, int(duration / total * BAR_WIDTH))
+            bar = " " * left + "█" * min(width, BAR_WIDTH - left)
+            name = ("  " * depth + _label(s))[:38]
+            error = "  !" if "error" in s["attributes"] else ""
+            lines.append(
+                f"  {name:<38} |{bar:<{BAR_WIDTH}}| +{offset * 1000:7.0f} ms {duration * 1000:7.0f} ms"
+                f"{_tokens(s)}{error}"
+            )
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+
+    path = critical_path(spans)
+    if path:
+        lines.append("  critical path:")
+        for s in path:
+            attrs = s["attributes"]
+            queue = f", queued {attrs['queue_ms']} ms" if attrs.get("queue_ms") else ""
+            topic = f" [{attrs['topic']}]" if attrs.get("topic") else ""
+            lines.append(
+                f"    step {attrs['step']} {attrs['tool']}{topic}: {(s['end'] - s['start']) * 1000:.0f} ms{queue}"
+            )
+        span_ms = (path[-1]["end"] - path[0]["start"]) * 1000
+        lines.append(f"    = {span_ms:.0f} ms of {total * 1000:.0f} ms")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show span trees and critical paths from the trace log.")
+    parser.add_argument("--path", default=TRACE_PATH, help="Trace JSONL file (default: TRACE_PATH)")
+    parser.add_argument("--trace", help="Show only this trace id")
+    parser.add_argument("--last", type=int, default=1, help="Show the N most recent traces")
+    args = parser.parse_args()
+
+    try:
+        traces = load_traces(args.path)
+    except FileNotFoundError:
+        sys.exit(f"No trace file at {args.path}")
+
+    if args.trace:
+        traces = [t for t in traces if t["trace_id"].startswith(args.trace)]
+        if not traces:
+            sys.exit(f"Trace not found: {args.trace}")
+    else:
+        traces = traces[-args.last:]
+
+    print("\n\n".join(render(t) for t in traces))
+
+
+if __name__ == "__main__":
+    main()
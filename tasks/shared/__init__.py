@@ -0,0 +1 @@
+"""Helpers shared by the tasks scripts (imported after adding ``tasks/`` to sys.path)."""
@@ -0,0 +1,91 @@
+"""Content-addressed on-disk store of LLM completions.
+
+Each completion is stored in SQLite under ``llm.request_key(request)``: a hash of
+the model, messages and every sampling parameter. A rerun that sends the same
+request gets the stored response back without an API call. ``llm.chat`` consults
+it according to LLM_CACHE_MODE:
+
+- ``auto`` (default): deterministic calls (temperature 0) are read from the cache
+  and stored after a miss.
+- ``record``: every call goes to the API and its response is stored, overwriting
+  any earlier one. Non-deterministic calls are recorded too, so a recorded run can
+  be replayed exactly.
+- ``replay``: every call is answered from the cache and a miss raises
+  ``CacheMissError``. Nothing goes over the network, so scoring code can be
+  iterated on fully offline.
+- ``off``: the disk cache is not used.
+
+Inspect or clear the cache with ``python tasks/shared/cache.py [--clear]``.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+MODES = ("off", "auto", "record", "replay")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(Path(__file__).resolve().parent.parent / ".cache" / "llm_cache.sqlite3"))
+
+
+class CacheMissError(LookupError):
+    """Replay mode found no stored completion for a request."""
+
+
+class CompletionCache:
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, request TEXT NOT NULL, "
+                "response TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM completions WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, request: dict, response: dict) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, request, response, created_at) VALUES (?, ?, ?, ?, ?)",
+                (key, request["model"], json.dumps(request, sort_keys=True, default=str), json.dumps(response), time.time()),
+            )
+
+    def counts(self) -> dict[str, int]:
+        """Stored completions per model."""
+        with self._lock:
+            rows = self._conn.execute("SELECT model, COUNT(*) FROM completions GROUP BY model ORDER BY model").fetchall()
+        return dict(rows)
+
+    def clear(self) -> int:
+        with self._lock, self._conn:
+            return self._conn.execute("DELETE FROM completions").rowcount
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or clear the LLM completion cache.")
+    parser.add_argument("--path", default=LLM_CACHE_PATH)
+    parser.add_argument("--clear", action="store_true", help="delete every stored completion")
+    args = parser.parse_args()
+
+    cache = CompletionCache(args.path)
+    if args.clear:
+        print(f"Deleted {cache.clear()} completions from {args.path}")
+        return
+    counts = cache.counts()
+    print(f"{args.path}: {sum(counts.values())} completions")
+    for model, count in counts.items():
+        print(f"  {model}: {count}")
+
+
+if __name__ == "__main__":
+    main()
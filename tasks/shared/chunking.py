@@ -0,0 +1,182 @@
+"""Structure-aware chunking as generators over offsets, sized in tokens.
+
+The day-5 pipeline used to chunk a constitution with four functions that each
+built lists of new strings. Articles were cut out and re-split at their clauses.
+Anything still too long went through ``_split_text``, which grew its pieces with
+``current + sep + seg`` (quadratic in the article's length). Sizes were measured
+in characters, although the limit that matters is the embedding model's tokens.
+
+Here every chunk is a ``(start, end)`` span into the one document string:
+
+- ``split_spans`` cuts a span into pieces of at most ``max_tokens``. It prefers
+  paragraph breaks, then line breaks, then spaces. Each segment is counted once,
+  and pieces are packed by adding up the counts, so the work is linear.
+- ``chunk_articles`` streams ``Chunk`` records for a constitution: one per
+  article, per clause ``(1)``, ``(2)``… when the article is too long, and per part
+  when a clause is still too long. Each chunk keeps its lineage (article, clause,
+  part and offsets). Its text is only sliced out when it is asked for.
+
+Counts default to ``tokens.count``. Pass ``count`` to size chunks with another
+tokenizer (assignment1 passes its own).
+"""
+
+import re
+from typing import Callable, Iterator, NamedTuple
+
+from . import tokens
+
+# A line starting with a number (possibly with a letter suffix like 2A, 31B), a period and whitespace
+ARTICLE_PATTERN = re.compile(r"^(\d+[A-Z]?)\.\s", re.MULTILINE)
+# Sub-clause markers like (1), (2) at the start of a line
+CLAUSE_PATTERN = re.compile(r"^\s*\((\d+)\)", re.MULTILINE)
+# Preferred cut points, coarsest first
+BOUNDARIES = [re.compile(r"\n\s*\n"), re.compile(r"\n"), re.compile(r"[ \t]+")]
+MAX_CHUNK_TOKENS = 250
+MIN_CHUNK_CHARS = 50  # shorter "articles" are schedule entries and list items
+
+
+class Chunk(NamedTuple):
+    document: str
+    start: int
+    end: int
+    source: str
+    article_id: str  # "preamble" for the text before the first article
+    clause: str = ""
+    part: int = 0  # 1, 2, ... when the article or clause was split further
+
+    def __repr__(self) -> str:
+        return f"Chunk({self.source!r}, {self.label!r}, {self.start}:{self.end})"
+
+    @property
+    def text(self) -> str:
+        return self.document[self.start:self.end]
+
+    @property
+    def label(self) -> str:
+        """Article, clause and part in one id, e.g. ``"12(3)_p2"``."""
+        label = f"{self.article_id}({self.clause})" if self.clause else self.article_id
+        return f"{label}_p{self.part}" if self.part else label
+
+    def as_dict(self) -> dict:
+        return {"text": self.text, "source": self.source, "article_id": self.label, "start": self.start, "end": self.end}
+
+
+def _trim(text: str, start: int, end: int) -> tuple[int, int]:
+    """The span without its leading and trailing whitespace."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def _trimmed(text: str, start: int, end: int) -> Iterator[tuple[int, int]]:
+    start, end = _trim(text, start, end)
+    if end > start:
+        yield start, end
+
+
+def _segments(text: str, start: int, end: int, boundary: re.Pattern) -> Iterator[tuple[int, int]]:
+    """Consecutive spans covering ``text[start:end]``, each ending just after a boundary."""
+    pos = start
+    for match in boundary.finditer(text, start, end):
+        if match.end() > pos:
+            yield pos, match.end()
+            pos = match.end()
+    if pos < end:
+        yield pos, end
+
+
+def _pack(text: str, start: int, end: int, max_tokens: int, count: Callable[[str], int], level: int) -> Iterator[tuple[int, int]]:
+    if level == len(BOUNDARIES):
+        # One unbroken run of characters: cut it in proportion to its token count
+        step = max(1, (end - start) * max_tokens // count(text[start:end]))
+        for s in range(start, end, step):
+            yield s, min(s + step, end)
+        return
+
+    piece_start = piece_end = start
+    piece_tokens = 0
+    for seg_start, seg_end in _segments(text, start, end, BOUNDARIES[level]):
+        n = count(text[seg_start:seg_end])
+        if piece_tokens + n <= max_tokens:
+            piece_end, piece_tokens = seg_end, piece_tokens + n
+            continue
+        yield from _trimmed(text, piece_start, piece_end)
+        if n > max_tokens:
+            yield from _pack(text, *_trim(text, seg_start, seg_end), max_tokens, count, level + 1)
+            piece_start = piece_end = seg_end
+            piece_tokens = 0
+        else:
+            piece_start, piece_end, piece_tokens = seg_start, seg_end, n
+    yield from _trimmed(text, piece_start, piece_end)
+
+
+def split_spans(
+    text: str,
+    start: int = 0,
+    end: int | None = None,
+    max_tokens: int = MAX_CHUNK_TOKENS,
+    count: Callable[[str], int] | None = None,
+) -> Iterator[tuple[int, int]]:
+    """(start, end) spans of ``text[start:end]`` of at most ``max_tokens``, whitespace-trimmed.
+
+    A piece's size is the sum of its segments' counts. BPE merges across the cut
+    points can only make the real count a little smaller.
+    """
+    count = count or tokens.count
+    start, end = _trim(text, start, len(text) if end is None else end)
+    if start == end:
+        return
+    if count(text[start:end]) <= max_tokens:
+        yield start, end
+    else:
+        yield from _pack(text, start, end, max_tokens, count, 0)
+
+
+def _parts(text, start, end, source, article_id, clause, max_tokens, count) -> Iterator[Chunk]:
+    spans = list(split_spans(text, start, end, max_tokens, count))
+    for i, (s, e) in enumerate(spans, 1):
+        yield Chunk(text, s, e, source, article_id, clause, i if len(spans) > 1 else 0)
+
+
+def _article(text, start, end, source, article_id, max_tokens, count, min_chars) -> Iterator[Chunk]:
+    start, end = _trim(text, start, end)
+    if end - start < min_chars:
+        return
+    if count(text[start:end]) <= max_tokens:
+        yield Chunk(text, start, end, source, article_id)
+        return
+
+    clauses = list(CLAUSE_PATTERN.finditer(text, start, end))
+    if len(clauses) <= 1:
+        yield from _parts(text, start, end, source, article_id, "", max_tokens, count)
+        return
+    for i, match in enumerate(clauses):
+        # The article's heading stays with its first clause
+        clause_start = start if i == 0 else match.start()
+        clause_end = clauses[i + 1].start() if i + 1 < len(clauses) else end
+        yield from _parts(text, clause_start, clause_end, source, article_id, match.group(1), max_tokens, count)
+
+
+def chunk_articles(
+    text: str,
+    source: str,
+    max_tokens: int = MAX_CHUNK_TOKENS,
+    count: Callable[[str], int] | None = None,
+    min_chars: int = MIN_CHUNK_CHARS,
+) -> Iterator[Chunk]:
+    """Chunks of a cleaned constitution, in document order, each at most ``max_tokens``."""
+    count = count or tokens.count
+    previous = None
+    for match in ARTICLE_PATTERN.finditer(text):
+        if previous is None:
+            # The text before the first article (preamble, part headings, etc.)
+            yield from _article(text, 0, match.start(), source, "preamble", max_tokens, count, min_chars)
+        else:
+            yield from _article(text, previous.start(), match.start(), source, previous.group(1), max_tokens, count, min_chars)
+        previous = match
+    if previous is None:
+        yield from _article(text, 0, len(text), source, "preamble", max_tokens, count, min_chars)
+    else:
+        yield from _article(text, previous.start(), len(text), source, previous.group(1), max_tokens, count, min_chars)
@@ -0,0 +1,153 @@
+"""Line-oriented cleaning of extracted PDF text with precompiled rule sets.
+
+The constitution scripts used to clean text with a chain of ``re.sub(...,
+flags=re.MULTILINE)`` calls. Each call rescanned the whole multi-megabyte text and
+recompiled its pattern. A ``Cleaner`` compiles its rules once into one alternation
+and makes one pass over the lines:
+
+1. Classify: every line is matched once against the combined pattern. The first
+   rule that matches the whole line drops it. This is the expensive part, and it
+   works per page, so ``clean_pages`` can spread it over worker processes.
+2. Resolve: one linear pass replays what the sequential ``re.sub`` calls did
+   around a dropped line, since their ``^\\s*`` / ``\\s*$`` also swallow adjacent
+   whitespace-only lines. Runs of blank lines are then collapsed.
+
+The output is identical to the old regex chain; see
+``tasks/week-1/day-5/bench_clean.py``.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Iterable, NamedTuple
+
+_CONTENT, _BLANK = -1, -2
+
+
+class Rule(NamedTuple):
+    """A line to drop: ``pattern`` must match the whole line.
+
+    ``eat_before`` / ``eat_after`` mirror a leading ``^\\s*`` / trailing ``\\s*$``
+    in the original regex: whitespace-only lines right before / after a dropped
+    line are removed with it.
+
+    Patterns see one line at a time. Where a MULTILINE regex's inner ``\\s`` would
+    have crossed a line break (a header split as "THE CONSTITUTION OF" / "INDIA"),
+    the line is kept. bench_clean.py checks that this never happens in the PDFs.
+    """
+
+    pattern: str
+    eat_before: bool = False
+    eat_after: bool = True
+
+
+class Cleaner:
+    def __init__(self, rules: list[Rule]):
+        self.rules = list(rules)
+        self._pattern = re.compile("|".join(f"({rule.pattern})" for rule in self.rules))
+        # Group number of each rule's outer group (rule patterns may contain groups of their own)
+        self._rule_of_group = {}
+        group = 1
+        for i, rule in enumerate(self.rules):
+            self._rule_of_group[group] = i
+            group += re.compile(rule.pattern).groups + 1
+
+    def __repr__(self) -> str:
+        # Stable across runs: pdf.extract_text keys its cleaned-text cache on it
+        return f"Cleaner({self.rules!r})"
+
+    def classify(self, lines: Iterable[str]) -> list[int]:
+        """Per line: the index of the rule that drops it, or _CONTENT / _BLANK."""
+        kinds = []
+        for line in lines:
+            match = self._pattern.fullmatch(line)
+            if match:
+                kinds.append(self._rule_of_group[match.lastindex])  # the outer group closes last
+            else:
+                kinds.append(_BLANK if not line or line.isspace() else _CONTENT)
+        return kinds
+
+    def _classify_page(self, page: str) -> list[int]:
+        return self.classify(page.split("\n"))
+
+    def clean_lines(self, lines: list[str], kinds: list[int] | None = None) -> list[str]:
+        """The cleaned lines (blank-line runs collapsed; surrounding whitespace not yet stripped)."""
+        kinds = self.classify(lines) if kinds is None else kinds
+        blank = [kind == _BLANK for kind in kinds]
+        out = list(lines)
+        by_rule: list[list[int]] = [[] for _ in self.rules]
+        for i, kind in enumerate(kinds):
+            if kind >= 0:
+                by_rule[kind].append(i)
+        # Replay the rules in order: a rule only swallows lines that are blank by the time it runs
+        for rule, dropped in zip(self.rules, by_rule):
+            for i in dropped:
+                out[i] = ""
+                if rule.eat_before:
+                    j = i - 1
+                    while j >= 0 and blank[j]:
+                        out[j] = ""
+                        j -= 1
+                if rule.eat_after:
+                    j = i + 1
+                    while j < len(out) and blank[j]:
+                        out[j] = ""
+                        j += 1
+            for i in dropped:
+                blank[i] = True
+        collapsed = []
+        for line in out:
+            if line or not collapsed or collapsed[-1]:
+                collapsed.append(line)
+        return collapsed
+
+    def clean(self, text: str) -> str:
+        return "\n".join(self.clean_lines(text.split("\n"))).strip()
+
+    def clean_pages(self, pages: list[str], workers: int = 1) -> str:
+        """``clean`` of ``"".join(page + "\\n" for page in pages)``, classifying the pages in parallel.
+
+        With ``workers`` > 1 the calling script needs an ``if __name__ == "__main__"``
+        guard (worker processes re-import it on Windows and macOS).
+        """
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as pool:
+                kinds = list(chain.from_iterable(pool.map(self._classify_page, pages, chunksize=16)))
+        else:
+            kinds = list(chain.from_iterable(map(self._classify_page, pages)))
+        lines = [line for page in pages for line in page.split("\n")] + [""]
+        kinds.append(_BLANK)
+        return "\n".join(self.clean_lines(lines, kinds)).strip()
+
+
+# Rule sets for the constitution PDFs, in the order the original regexes ran
+SEPARATOR_RULES = [
+    Rule(r"[_]{10,}\s*"),  # footnote separator lines
+    Rule(r"[–\-]{10,}\s*"),
+]
+PAGE_RULES = [
+    # Footnotes, e.g. "1. Subs. by the Constitution..."
+    Rule(r"\d{1,2}\.\s+(Ins\.|Added|Subs\.|Omitted|See |The word|Ins |Added |Subs |Rep\.).*", eat_after=False),
+    Rule(r"\s*\(\w+\)\s*", eat_before=True),  # roman numeral page numbers like (xviii)
+    Rule(r"\s*\d{1,3}\s*", eat_before=True),  # standalone page numbers
+]
+HEADER_RULES = {
+    "india": [
+        Rule(r"THE CONSTITUTION OF\s+INDIA\s*"),
+        Rule(r"\(Part\s+[IVXLC]+[A-Z]?\..*?\)\s*"),
+    ],
+    "pak": [
+        Rule(r"\s*CONSTITUTION OF PAKISTAN\s*\d*\s*", eat_before=True),
+    ],
+}
+
+light_cleaner = Cleaner(SEPARATOR_RULES)
+_constitution_cleaners: dict[str, Cleaner] = {}
+
+
+def constitution_cleaner(source: str) -> Cleaner:
+    """Headers, footnotes, separators and page numbers for a constitution PDF (picked by file name)."""
+    key = next((name for name in HEADER_RULES if name in source.lower()), "")
+    if key not in _constitution_cleaners:
+        _constitution_cleaners[key] = Cleaner(HEADER_RULES.get(key, []) + SEPARATOR_RULES + PAGE_RULES)
+    return _constitution_cleaners[key]
@@ -0,0 +1,138 @@
+"""Question answering over one document, many questions per session.
+
+Re-sending a whole document with every question makes the document the bulk of
+every request. ``DocumentSession`` builds the request so the provider can reuse
+work between questions:
+
+- Full-document mode (the document fits ``max_document_tokens``): the system
+  message, holding the instructions and then the document, is built once and is
+  byte-identical for every question, and the question is the only part that
+  changes. Providers with prompt caching (Groq for the models that support it)
+  then serve the shared prefix from cache at a discount, and it shows up as
+  ``cached_tokens`` in the usage.
+- Retrieval mode (the document is over budget): the document is split into
+  sections (summarize.split_sections), and each question gets only its
+  best-matching sections by BM25, at most ``context_tokens`` of them, kept in
+  document order.
+
+Each ``ask`` returns a report that compares the tokens actually billed with what
+full-document mode would have sent for the same question.
+"""
+
+import math
+import re
+from collections import Counter
+
+from . import llm, tokens
+from .summarize import split_sections
+
+INSTRUCTIONS = "Answer the question using only the document below. If the answer is not in the document, say so."
+SECTION_TOKENS = 800
+CONTEXT_TOKENS = 6000
+ANSWER_RESERVE_TOKENS = 2048
+EXCERPT_SEPARATOR = "\n\n[...]\n\n"
+
+_WORD = re.compile(r"\w+")
+
+
+def _terms(text: str) -> list[str]:
+    return [w.lower() for w in _WORD.findall(text)]
+
+
+class _BM25:
+    def __init__(self, texts: list[str], k1: float = 1.5, b: float = 0.75):
+        self.k1, self.b = k1, b
+        self.docs = [Counter(_terms(t)) for t in texts]
+        self.lengths = [sum(d.values()) for d in self.docs]
+        self.avg_length = sum(self.lengths) / len(self.lengths) if self.lengths else 0
+        df = Counter(term for d in self.docs for term in d)
+        n = len(self.docs)
+        self.idf = {term: math.log(1 + (n - f + 0.5) / (f + 0.5)) for term, f in df.items()}
+
+    def scores(self, query: str) -> list[float]:
+        terms = set(_terms(query))
+        scores = []
+        for doc, length in zip(self.docs, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+            scores.append(sum(
+                self.idf[t] * doc[t] * (self.k1 + 1) / (doc[t] + norm)
+                for t in terms if t in doc
+            ))
+        return scores
+
+
+class DocumentSession:
+    """Ask many questions about one document, sending as little as possible per question."""
+
+    def __init__(
+        self,
+        document: str,
+        *,
+        model: str = llm.GROQ_MODEL,
+        instructions: str = INSTRUCTIONS,
+        max_document_tokens: int | None = None,
+        section_tokens: int = SECTION_TOKENS,
+        context_tokens: int = CONTEXT_TOKENS,
+        **params,
+    ):
+        """``params`` are passed to every ``llm.chat`` call (temperature, max_tokens, ...)."""
+        self.model = model
+        self.instructions = instructions
+        self.context_tokens = context_tokens
+        self.params = params
+        self.document_tokens = tokens.count(document, model)
+        if max_document_tokens is None:
+            max_document_tokens = tokens.context_limit(model) - ANSWER_RESERVE_TOKENS
+        # Built once so every question shares exactly the same prefix bytes
+        self.prefix = f"{instructions}\n\nDocument:\n{document}"
+        self.prefix_tokens = tokens.count_messages([{"role": "system", "content": self.prefix}], model)
+        self.mode = "full" if self.document_tokens <= max_document_tokens else "retrieval"
+        if self.mode == "retrieval":
+            self.sections = split_sections(document, section_tokens, model)
+            self._index = _BM25(self.sections)
+        self.reports: list[dict] = []
+
+    def relevant_sections(self, question: str) -> list[str]:
+        """The best-matching sections within ``context_tokens``, in document order."""
+        scores = self._index.scores(question)
+        ranked = sorted(range(len(self.sections)), key=lambda i: -scores[i])
+        fitted = tokens.fit([self.sections[i] for i in ranked], self.context_tokens, self.model, separator=EXCERPT_SEPARATOR)
+        kept = ranked[:len(fitted)]
+        return [self.sections[i] for i in sorted(kept)]
+
+    def messages(self, question: str) -> list[dict]:
+        if self.mode == "full":
+            system = self.prefix
+        else:
+            excerpts = EXCERPT_SEPARATOR.join(self.relevant_sections(question))
+            system = f"{self.instructions}\n\nDocument excerpts:\n{excerpts}"
+        return [{"role": "system", "content": system}, {"role": "user", "content": question}]
+
+    async def ask(self, question: str) -> dict:
+        """Answer ``question``; the report also lands in ``self.reports``."""
+        messages = self.messages(question)
+        response = await llm.chat(messages, model=self.model, **self.params)
+        usage = response.usage
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", 0) or 0
+        full = self.prefix_tokens + tokens.TOKENS_PER_MESSAGE + tokens.count(question, self.model)
+        report = {
+            "question": question,
+            "answer": (response.choices[0].message.content or "").strip(),
+            "mode": self.mode,
+            "prompt_tokens": usage.prompt_tokens,
+            "cached_tokens": cached,
+            "completion_tokens": usage.completion_tokens,
+            "full_document_tokens": full,
+            # Tokens that full-document mode would have sent and that were not sent, or were served from cache
+            "saved_tokens": full - (usage.prompt_tokens - cached),
+        }
+        self.reports.append(report)
+        return report
+
+    def totals(self) -> dict:
+        """Token totals over every question asked so far."""
+        keys = ("prompt_tokens", "cached_tokens", "completion_tokens", "full_document_tokens", "saved_tokens")
+        totals = {key: sum(r[key] for r in self.reports) for key in keys}
+        totals["questions"] = len(self.reports)
+        return totals
@@ -0,0 +1,184 @@
+"""Batched, concurrent embedding through a local Ollama server, pipelined into Chroma.
+
+The Chroma scripts used to upsert batches of 50 documents and let the collection's
+``OllamaEmbeddingFunction`` embed each batch. That meant one request at a time,
+and nothing was written while a batch was being embedded. Here:
+
+- ``embed`` sends batches to Ollama's ``/api/embed`` with up to
+  ``EMBED_CONCURRENCY`` requests in flight.
+- The batch size adapts (``BatchSizer``). It doubles while requests come back in
+  well under ``EMBED_TARGET_SECONDS`` and halves when they are slower. A batch
+  that fails with a timeout or a 5xx is split in half and retried.
+- ``upsert`` runs embedding and writing as two pipeline stages. Embedded batches
+  are queued and written to the collection with precomputed ``embeddings=`` by a
+  separate task, while the next batches are still being embedded.
+
+``/api/embed`` returns L2-normalised vectors. The collections' own embedding
+function still embeds the queries. Its vectors may not be normalised, but
+rankings are unchanged (the query norm scales every distance the same way).
+
+Throughput against a local stub server: ``tasks/week-1/day-5/bench_embed.py``.
+"""
+
+import asyncio
+import os
+import time
+from typing import Callable
+
+import httpx
+
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "hf.co/CompendiumLabs/bge-base-en-v1.5-gguf")
+EMBED_CONCURRENCY = int(os.getenv("EMBED_CONCURRENCY", "4"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "32"))  # initial size; adapts from here
+EMBED_TARGET_SECONDS = float(os.getenv("EMBED_TARGET_SECONDS", "2.0"))
+EMBED_TIMEOUT = float(os.getenv("EMBED_TIMEOUT", "120"))
+MAX_BATCH_SIZE = 512
+
+
+class BatchSizer:
+    """Batch size shared by the concurrent requests, adjusted after every response."""
+
+    def __init__(self, size: int = EMBED_BATCH_SIZE, max_size: int = MAX_BATCH_SIZE,
+                 target_seconds: float = EMBED_TARGET_SECONDS):
+        self.size = max(1, min(size, max_size))
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+
+    def record(self, seconds: float) -> None:
+        if seconds < self.target_seconds / 2:
+            self.size = min(self.size * 2, self.max_size)
+        elif seconds > self.target_seconds:
+            self.shrink()
+
+    def shrink(self) -> None:
+        self.size = max(1, self.size // 2)
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 413
+    return isinstance(error, (httpx.TimeoutException, httpx.TransportError))
+
+
+async def _embed_batches(
+    texts: list[str],
+    on_batch: Callable,
+    *,
+    model: str,
+    url: str,
+    concurrency: int,
+    sizer: BatchSizer,
+) -> None:
+    """Embed ``texts`` and ``await on_batch(start, vectors)`` for every batch, in completion order."""
+    position = 0
+    retry: list[tuple[int, int]] = []  # halves of failed batches
+
+    async with httpx.AsyncClient(base_url=url, timeout=EMBED_TIMEOUT) as client:
+        async def worker():
+            nonlocal position
+            while True:
+                if retry:
+                    start, end = retry.pop()
+                elif position < len(texts):
+                    start, end = position, min(position + sizer.size, len(texts))
+                    position = end
+                else:
+                    return
+                began = time.perf_counter()
+                try:
+                    response = await client.post("/api/embed", json={"model": model, "input": texts[start:end]})
+                    response.raise_for_status()
+                except Exception as e:
+                    if end - start == 1 or not _retryable(e):
+                        raise
+                    sizer.shrink()
+                    middle = (start + end) // 2
+                    retry.extend([(middle, end), (start, middle)])
+                    continue
+                sizer.record(time.perf_counter() - began)
+                await on_batch(start, response.json()["embeddings"])
+
+        await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+
+async def embed_async(
+    texts: list[str],
+    *,
+    model: str = EMBEDDING_MODEL,
+    url: str = OLLAMA_URL,
+    concurrency: int = EMBED_CONCURRENCY,
+    batch_size: int = EMBED_BATCH_SIZE,
+) -> list[list[float]]:
+    """One vector per text, in input order."""
+    vectors: list = [None] * len(texts)
+
+    async def collect(start, batch):
+        vectors[start:start + len(batch)] = batch
+
+    await _embed_batches(texts, collect, model=model, url=url, concurrency=concurrency, sizer=BatchSizer(batch_size))
+    return vectors
+
+
+def embed(texts: list[str], **kwargs) -> list[list[float]]:
+    """``embed_async`` for synchronous scripts."""
+    return asyncio.run(embed_async(texts, **kwargs))
+
+
+async def upsert_async(
+    collection,
+    ids: list[str],
+    documents: list[str],
+    metadatas: list[dict] | None = None,
+    *,
+    model: str = EMBEDDING_MODEL,
+    url: str = OLLAMA_URL,
+    concurrency: int = EMBED_CONCURRENCY,
+    batch_size: int = EMBED_BATCH_SIZE,
+    progress: Callable[[int, int], None] | None = None,
+) -> int:
+    """Embed ``documents`` and upsert them into a Chroma ``collection`` with precomputed embeddings.
+
+    Writing runs in its own stage (a thread, since Chroma is synchronous), so it
+    overlaps with embedding the following batches. ``progress(done, total)`` is
+    called after every write. Returns the number of documents written.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=2 * max(1, concurrency))
+    done = 0
+
+    async def enqueue(start, vectors):
+        await queue.put((start, vectors))
+
+    async def writer():
+        nonlocal done
+        while (item := await queue.get()) is not None:
+            start, vectors = item
+            end = start + len(vectors)
+            await asyncio.to_thread(
+                collection.upsert,
+                ids=ids[start:end],
+                documents=documents[start:end],
+                metadatas=metadatas[start:end] if metadatas else None,
+                embeddings=vectors,
+            )
+            done += len(vectors)
+            if progress:
+                progress(done, len(documents))
+
+    async def embedder():
+        await _embed_batches(documents, enqueue, model=model, url=url, concurrency=concurrency,
+                             sizer=BatchSizer(batch_size))
+        await queue.put(None)
+
+    stages = [asyncio.create_task(embedder()), asyncio.create_task(writer())]
+    try:
+        await asyncio.gather(*stages)
+    finally:
+        for stage in stages:  # if one stage fails, the other must not wait for it forever
+            stage.cancel()
+    return done
+
+
+def upsert(collection, ids: list[str], documents: list[str], metadatas: list[dict] | None = None, **kwargs) -> int:
+    """``upsert_async`` for synchronous scripts."""
+    return asyncio.run(upsert_async(collection, ids, documents, metadatas, **kwargs))
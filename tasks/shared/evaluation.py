@@ -0,0 +1,201 @@
+"""Concurrent, resumable evaluation of answering strategies ("arms") on a local Ollama server.
+
+``week-1/day-5/evaluate.py`` used to answer every question through RAG, then
+again through direct generation. It made one blocking ``ollama.chat`` call at a
+time, and an interruption lost everything. Here an arm is a function that turns a
+question into a chat request: messages, Ollama options, and any extra fields
+worth recording (e.g. the retrieved chunks). Then:
+
+- Every (question, arm) pair is one task. Tasks run concurrently, at most
+  ``parallelism`` at a time. The arm's own preparation (retrieval) runs in a
+  thread.
+- Each answer is appended to a JSONL checkpoint and flushed as soon as it
+  completes, together with the model, the question and the run's ``settings``
+  (e.g. ``num_ctx``). A rerun skips every pair that already has an answer
+  without an error for the same model, question text and settings; answers from
+  any other configuration are redone, never reported under the new one.
+- Each answer records its latency and Ollama's own timings: model load time,
+  prompt tokens and prompt-eval tokens/s, generated tokens and generation
+  tokens/s.
+- ``summarize`` turns the records into a per-arm performance table.
+
+Ollama reloads the model whenever ``num_ctx`` changes, so arms that run
+concurrently should request the same options.
+"""
+
+import asyncio
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+from .embed import OLLAMA_URL
+
+EVAL_PARALLELISM = int(os.getenv("EVAL_PARALLELISM", "2"))  # match the server's OLLAMA_NUM_PARALLEL
+EVAL_TIMEOUT = float(os.getenv("EVAL_TIMEOUT", "600"))
+
+# question -> {"messages": [...], "options": {...}, **fields to record with the answer}
+Arm = Callable[[dict], dict]
+
+
+def _per_second(count: int, duration_ns: int) -> float | None:
+    return round(count / (duration_ns / 1e9), 1) if count and duration_ns else None
+
+
+def ollama_metrics(body: dict, seconds: float) -> dict:
+    """Latency plus the timings Ollama reports with a non-streamed response (durations are in ns)."""
+    return {
+        "latency_ms": round(seconds * 1000),
+        "total_ms": round(body.get("total_duration", 0) / 1e6),
+        "load_ms": round(body.get("load_duration", 0) / 1e6),
+        "prompt_tokens": body.get("prompt_eval_count", 0),
+        "prompt_eval_tps": _per_second(body.get("prompt_eval_count", 0), body.get("prompt_eval_duration", 0)),
+        "completion_tokens": body.get("eval_count", 0),
+        "eval_tps": _per_second(body.get("eval_count", 0), body.get("eval_duration", 0)),
+    }
+
+
+async def ollama_chat(client: httpx.AsyncClient, model: str, messages: list[dict], options: dict | None = None) -> dict:
+    """One non-streamed ``/api/chat`` call: the answer and its metrics."""
+    began = time.perf_counter()
+    response = await client.post(
+        "/api/chat",
+        json={"model": model, "messages": messages, "stream": False, "options": options or {}},
+    )
+    response.raise_for_status()
+    body = response.json()
+    return {"answer": body["message"]["content"], **ollama_metrics(body, time.perf_counter() - began)}
+
+
+def read_records(path: str | Path) -> list[dict]:
+    path = Path(path)
+    if not path.exists():
+        return []
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass  # a line cut off by an interrupted run; that answer is redone
+    return records
+
+
+def _latest(records: list[dict], questions: list[dict], model: str, settings: dict) -> dict[tuple, dict]:
+    """The latest record per (question id, arm) for this configuration, preferring ones without an error."""
+    texts = {q["id"]: q["question"] for q in questions}
+    latest = {}
+    for record in records:
+        if (record.get("model") != model or record.get("settings", {}) != settings
+                or record.get("question") != texts.get(record["id"])):
+            continue  # answered by another model, with other settings, or for an edited question
+        key = (record["id"], record["arm"])
+        if key not in latest or not record.get("error"):
+            latest[key] = record
+    return latest
+
+
+async def _run(questions, arms, model, settings, output_path, parallelism, url) -> None:
+    latest = _latest(read_records(output_path), questions, model, settings)
+    done = {key for key, record in latest.items() if not record.get("error")}
+    pending = [(q, arm) for q in questions for arm in arms if (q["id"], arm) not in done]
+    print(f"Evaluation: {len(questions) * len(arms)} answers, {len(questions) * len(arms) - len(pending)} "
+          f"already in {output_path}, {len(pending)} to run ({parallelism} at a time)")
+
+    semaphore = asyncio.Semaphore(parallelism)
+    finished = 0
+    with open(output_path, "a", encoding="utf-8") as f:
+        async with httpx.AsyncClient(base_url=url, timeout=EVAL_TIMEOUT) as client:
+            async def run_one(question: dict, arm: str) -> None:
+                nonlocal finished
+                record = {"id": question["id"], "arm": arm, "question": question["question"], "model": model,
+                          "settings": settings}
+                async with semaphore:
+                    try:
+                        request = await asyncio.to_thread(arms[arm], question)
+                        result = await ollama_chat(client, model, request["messages"], request.get("options"))
+                        fields = {k: v for k, v in request.items() if k not in ("messages", "options")}
+                        record.update(result, **fields)
+                    except Exception as e:
+                        record["error"] = f"{type(e).__name__}: {e}"
+                # Written on the event loop thread only, so lines never interleave
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                finished += 1
+                status = f"ERROR: {record['error'][:60]}" if "error" in record else (
+                    f"{record['latency_ms']:,} ms, {record['eval_tps']} tok/s")
+                print(f"  [{finished}/{len(pending)}] Q{question['id']} {arm}: {status}")
+
+            await asyncio.gather(*(run_one(q, arm) for q, arm in pending))
+
+
+def run(
+    questions: list[dict],
+    arms: dict[str, Arm],
+    model: str,
+    output_path: str | Path,
+    parallelism: int = EVAL_PARALLELISM,
+    url: str = OLLAMA_URL,
+    settings: dict | None = None,
+) -> list[dict]:
+    """Answer every question with every arm (skipping those already checkpointed) and return all records.
+
+    ``questions`` need an ``id`` and a ``question``. ``settings`` (JSON values) are
+    whatever else shapes the answers, such as the arms' ``num_ctx``; checkpointed
+    answers are reused only for the same model, question text and settings.
+    Records come back in question order, arms in the order given, one per pair
+    (failed pairs keep their error).
+    """
+    settings = settings or {}
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    asyncio.run(_run(questions, arms, model, settings, output_path, max(1, parallelism), url))
+    latest = _latest(read_records(output_path), questions, model, settings)
+    return [latest[(q["id"], arm)] for q in questions for arm in arms if (q["id"], arm) in latest]
+
+
+def _p95(values: list[float]) -> float:
+    return statistics.quantiles(values, n=20, method="inclusive")[18] if len(values) > 1 else values[0]
+
+
+def summarize(records: list[dict]) -> list[dict]:
+    """Per arm: answers, errors, latency distribution, mean tokens and tokens/s."""
+    arms: dict[str, list[dict]] = {}
+    for record in records:
+        arms.setdefault(record["arm"], []).append(record)
+
+    summary = []
+    for arm, arm_records in arms.items():
+        ok = [r for r in arm_records if not r.get("error")]
+        latencies = [r["latency_ms"] for r in ok]
+
+        def mean(field):
+            values = [r[field] for r in ok if r.get(field) is not None]
+            return round(statistics.mean(values), 1) if values else None
+
+        summary.append({
+            "arm": arm,
+            "answers": len(ok),
+            "errors": len(arm_records) - len(ok),
+            "latency_p50_ms": round(statistics.median(latencies)) if ok else None,
+            "latency_p95_ms": round(_p95(latencies)) if ok else None,
+            "load_ms_mean": mean("load_ms"),
+            "prompt_tokens_mean": mean("prompt_tokens"),
+            "prompt_eval_tps_mean": mean("prompt_eval_tps"),
+            "completion_tokens_mean": mean("completion_tokens"),
+            "eval_tps_mean": mean("eval_tps"),
+        })
+    return summary
+
+
+def print_summary(summary: list[dict]) -> None:
+    columns = ["arm", "answers", "errors", "latency_p50_ms", "latency_p95_ms", "prompt_tokens_mean",
+               "prompt_eval_tps_mean", "completion_tokens_mean", "eval_tps_mean"]
+    width = max(len(row["arm"]) for row in summary) if summary else 3
+    print(f"{'arm':<{width}}  " + "  ".join(columns[1:]))
+    for row in summary:
+        cells = ("" if row[c] is None else str(row[c]) for c in columns[1:])
+        print(f"{row['arm']:<{width}}  " + "  ".join(f"{cell:>{len(c)}}" for c, cell in zip(columns[1:], cells)))
@@ -0,0 +1,231 @@
+"""Shared Groq access for every tasks script.
+
+One AsyncGroq client on a pooled httpx connection pool serves all calls, instead of
+each script building its own client and calling it one request at a time:
+
+- ``chat`` is the single entry point. At most GROQ_CONCURRENCY requests are in
+  flight; 429s, timeouts, connection errors and 5xx responses are retried with
+  jittered exponential backoff (honouring Retry-After).
+- Deterministic requests (temperature 0) are cached by their full request body, in
+  memory and on disk (cache.py; LLM_CACHE_MODE also offers record/replay), and
+  identical requests in flight at the same time share one API call.
+- The client lives on one background event loop, so plain synchronous scripts use
+  ``run`` / ``gather`` to fan out a whole evaluation (every question x strategy) at
+  once and wait roughly one round-trip instead of one per call.
+
+Usage from a script in ``tasks/week-N/day-M/``::
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from shared import llm
+
+    answers = llm.gather(llm.ask([{"role": "user", "content": q}]) for q in questions)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+from pathlib import Path
+from typing import Any, Awaitable, Iterable
+
+import httpx
+from dotenv import load_dotenv
+from groq import APIConnectionError, APIStatusError, AsyncGroq, RateLimitError
+from groq.types.chat import ChatCompletion
+
+from .cache import LLM_CACHE_PATH, MODES, CacheMissError, CompletionCache
+
+load_dotenv(Path(__file__).resolve().parent.parent / ".env")
+
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+GROQ_CONCURRENCY = int(os.getenv("GROQ_CONCURRENCY", "8"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "5"))
+GROQ_BACKOFF_S = float(os.getenv("GROQ_BACKOFF_S", "1.0"))
+GROQ_TIMEOUT_S = float(os.getenv("GROQ_TIMEOUT_S", "60"))
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "auto")
+if LLM_CACHE_MODE not in MODES:
+    raise ValueError(f"LLM_CACHE_MODE must be one of {MODES}, not {LLM_CACHE_MODE!r}")
+
+stats = {"requests": 0, "cache_hits": 0, "disk_hits": 0, "retries": 0}
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+_client: AsyncGroq | None = None
+_semaphore: asyncio.Semaphore | None = None
+_cache: dict[str, Any] = {}
+_inflight: dict[str, asyncio.Future] = {}
+_disk: CompletionCache | None = None
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-loop", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+def run(aw: Awaitable):
+    """Run an awaitable on the shared event loop and return its result (blocks the caller)."""
+    async def _await():
+        return await aw
+
+    return asyncio.run_coroutine_threadsafe(_await(), _background_loop()).result()
+
+
+def gather(aws: Iterable[Awaitable], return_exceptions: bool = False) -> list:
+    """Run all awaitables concurrently; results come back in input order.
+
+    With ``return_exceptions`` a failed awaitable yields its exception instead of
+    failing the whole batch.
+    """
+    aws = list(aws)
+
+    async def _all():
+        return await asyncio.gather(*aws, return_exceptions=return_exceptions)
+
+    return run(_all())
+
+
+def _get_client() -> AsyncGroq:
+    # Only ever called on the background loop, so no lock is needed
+    global _client, _semaphore
+    if _client is None:
+        pool = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=GROQ_CONCURRENCY, max_keepalive_connections=GROQ_CONCURRENCY),
+            timeout=GROQ_TIMEOUT_S,
+        )
+        # Retries are handled here, with the concurrency slot released while backing off
+        _client = AsyncGroq(api_key=os.environ["GROQ_API_KEY"], max_retries=0, timeout=GROQ_TIMEOUT_S, http_client=pool)
+        _semaphore = asyncio.Semaphore(GROQ_CONCURRENCY)
+    return _client
+
+
+def _retryable(error: Exception) -> bool:
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _retry_after(error: Exception) -> float | None:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def request_key(request: dict) -> str:
+    """Cache key of a chat request: a hash of every parameter that affects the response."""
+    return hashlib.sha256(json.dumps(request, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _disk_cache() -> CompletionCache:
+    global _disk
+    if _disk is None:
+        _disk = CompletionCache(LLM_CACHE_PATH)
+    return _disk
+
+
+def _load(key: str):
+    """A stored completion, or None."""
+    stored = _disk_cache().get(key)
+    if stored is None:
+        return None
+    stats["disk_hits"] += 1
+    return ChatCompletion.model_validate(stored)
+
+
+def _store(key: str, request: dict, response) -> None:
+    _disk_cache().put(key, request, response.model_dump(mode="json"))
+
+
+async def _create(request: dict):
+    client = _get_client()
+    attempt = 0
+    while True:
+        async with _semaphore:
+            try:
+                stats["requests"] += 1
+                return await client.chat.completions.create(**request)
+            except Exception as e:
+                if not _retryable(e) or attempt >= GROQ_MAX_RETRIES:
+                    raise
+                delay = _retry_after(e) or GROQ_BACKOFF_S * (2 ** attempt) * random.uniform(0.5, 1.5)
+        stats["retries"] += 1
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def _chat(request: dict, cache: bool):
+    key = request_key(request)
+    if LLM_CACHE_MODE == "replay":
+        response = _cache.get(key) or _load(key)
+        if response is None:
+            raise CacheMissError(f"no recorded completion for {request['model']} request {key[:12]} (LLM_CACHE_MODE=replay)")
+        _cache[key] = response
+        return response
+    if LLM_CACHE_MODE == "record":
+        response = await _create(request)
+        _store(key, request, response)
+        return response
+    if not cache:
+        return await _create(request)
+    if key in _cache:
+        stats["cache_hits"] += 1
+        return _cache[key]
+    if LLM_CACHE_MODE == "auto":
+        response = _load(key)
+        if response is not None:
+            _cache[key] = response
+            return response
+    if key in _inflight:
+        stats["cache_hits"] += 1
+        return await asyncio.shield(_inflight[key])
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        response = await _create(request)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        future.exception()  # mark retrieved so an unshared failure is not logged
+        raise
+    else:
+        _cache[key] = response
+        if LLM_CACHE_MODE == "auto":
+            _store(key, request, response)
+        future.set_result(response)
+        return response
+    finally:
+        del _inflight[key]
+
+
+async def chat(messages: list[dict], *, model: str = GROQ_MODEL, cache: bool | None = None, **params):
+    """One chat completion (the Groq ChatCompletion object).
+
+    ``params`` are passed to ``chat.completions.create`` (temperature, max_tokens, ...).
+    ``cache`` defaults to caching only deterministic calls (temperature 0). Cached
+    responses are shared, so treat the returned object as read-only. In record and
+    replay modes every call is recorded / replayed regardless of ``cache``.
+    """
+    request = {"model": model, "messages": messages, **params}
+    if cache is None:
+        cache = params.get("temperature", 1) == 0  # Groq's default temperature is 1
+    loop = _background_loop()
+    if asyncio.get_running_loop() is loop:
+        return await _chat(request, cache)
+    # Called from another event loop (e.g. a script's own asyncio.run): hop onto the client's loop
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(_chat(request, cache), loop))
+
+
+async def ask(messages: list[dict], **kwargs) -> str:
+    """Like ``chat`` but returns just the stripped message text."""
+    response = await chat(messages, **kwargs)
+    return (response.choices[0].message.content or "").strip()
@@ -0,0 +1,160 @@
+"""PDF text extraction, parallel across pages and cached on disk.
+
+Every script that reads the constitution PDFs used to open them with PyMuPDF, walk
+the pages in one thread, build the text with repeated ``+=`` and do it again on
+every run. Here:
+
+- ``extract_pages`` splits the page range into contiguous blocks and extracts them
+  in parallel worker processes (PyMuPDF is not thread-safe). The workers are plain
+  ``python -m shared.pdf`` subprocesses rather than a multiprocessing pool, which
+  on Windows would re-run the calling script in every worker. Pages come back as a
+  list, and callers join them once.
+- Results are cached in ``tasks/.cache/pdf/`` (``PDF_CACHE_DIR``), keyed by the
+  file's SHA-256 and the page range, so a PDF is parsed once and later runs read
+  the text back. ``extract_text`` also caches the cleaned text per cleaning
+  function (identified by its name and code, and for a bound method such as
+  ``Cleaner.clean`` by its whole class), so the cleaning is not redone either.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from functools import partial
+from pathlib import Path
+from typing import Callable
+
+PDF_CACHE_DIR = Path(os.getenv("PDF_CACHE_DIR", str(Path(__file__).resolve().parent.parent / ".cache" / "pdf")))
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 4)))
+MIN_PAGES_PER_WORKER = 16  # below this, starting processes costs more than it saves
+
+
+def file_hash(path: str | Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_range(path: str, start: int, end: int) -> list[str]:
+    import fitz
+
+    with fitz.open(path) as doc:
+        return [doc[i].get_text() for i in range(start, end)]
+
+
+def _page_count(path: str) -> int:
+    import fitz
+
+    with fitz.open(path) as doc:
+        return len(doc)
+
+
+def _extract_parallel(path: str, bounds: list[tuple[int, int]]) -> list[str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(Path(__file__).resolve().parent.parent), env.get("PYTHONPATH")]))
+    with tempfile.TemporaryDirectory() as tmp:
+        # Results go through files: PyMuPDF prints its own messages to stdout
+        outputs = [os.path.join(tmp, f"{start}.json") for start, _ in bounds]
+        workers = [
+            subprocess.Popen([sys.executable, "-m", "shared.pdf", path, str(start), str(end), out], env=env)
+            for (start, end), out in zip(bounds, outputs)
+        ]
+        pages = []
+        for worker, (start, end), out in zip(workers, bounds, outputs):
+            if worker.wait():
+                raise RuntimeError(f"extracting pages {start}-{end} of {path} failed (exit code {worker.returncode})")
+            with open(out, encoding="utf-8") as f:
+                pages += json.load(f)
+    return pages
+
+
+def _class_code(cls: type) -> str:
+    """The class's source, or the bytecode of its functions when the source is unavailable."""
+    try:
+        return inspect.getsource(cls)
+    except (OSError, TypeError):
+        functions = [v for v in vars(cls).values() if hasattr(v, "__code__")]
+        return repr([(f.__name__, f.__code__.co_code, f.__code__.co_consts) for f in functions])
+
+
+def _fingerprint(fn: Callable) -> str:
+    """Name plus a hash of the function's code (and bound arguments or object), so editing a cleaner invalidates its output.
+
+    For a bound method the whole class is hashed: ``Cleaner.clean`` itself is a
+    one-liner, and the cleaning logic lives in the methods it calls.
+    """
+    if isinstance(fn, partial):
+        name, body = _fingerprint(fn.func), repr((fn.args, sorted(fn.keywords.items())))
+    else:
+        code = getattr(fn, "__code__", None)
+        name = re.sub(r"\W", "_", getattr(fn, "__qualname__", type(fn).__name__))  # "<lambda>" is not a valid file name
+        body = repr((code.co_code, code.co_consts)) if code else repr(fn)
+        if hasattr(fn, "__self__"):  # a bound method: its class and its object (e.g. a Cleaner's rules) matter too
+            body += _class_code(type(fn.__self__)) + repr(fn.__self__)
+    return f"{name}-{hashlib.sha256(body.encode()).hexdigest()[:12]}"
+
+
+def _cache_stem(path: str | Path, start_page: int, end_page: int | None) -> str:
+    return f"{file_hash(path)}_{start_page}-{'end' if end_page is None else end_page}"
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def extract_pages(
+    path: str | Path,
+    start_page: int = 0,
+    end_page: int | None = None,
+    workers: int = PDF_WORKERS,
+) -> list[str]:
+    """Text of pages ``start_page`` up to (not including) ``end_page``, one string per page."""
+    path = str(path)
+    cache_file = PDF_CACHE_DIR / f"{_cache_stem(path, start_page, end_page)}.json"
+    if cache_file.exists():
+        return json.loads(cache_file.read_text(encoding="utf-8"))
+
+    end = _page_count(path) if end_page is None else end_page
+    n = end - start_page
+    workers = max(1, min(workers, n // MIN_PAGES_PER_WORKER))
+    if workers == 1:
+        pages = _extract_range(path, start_page, end)
+    else:
+        step = -(-n // workers)  # ceil: one contiguous block per worker
+        pages = _extract_parallel(path, [(s, min(s + step, end)) for s in range(start_page, end, step)])
+
+    _write(cache_file, json.dumps(pages, ensure_ascii=False))
+    return pages
+
+
+def extract_text(
+    path: str | Path,
+    start_page: int = 0,
+    end_page: int | None = None,
+    clean: Callable[[str], str] | None = None,
+    workers: int = PDF_WORKERS,
+) -> str:
+    """The pages' text, each followed by a newline, optionally passed through ``clean`` (cached too)."""
+    if clean is None:
+        return "".join(page + "\n" for page in extract_pages(path, start_page, end_page, workers))
+
+    cache_file = PDF_CACHE_DIR / f"{_cache_stem(path, start_page, end_page)}.{_fingerprint(clean)}.txt"
+    if cache_file.exists():
+        return cache_file.read_text(encoding="utf-8")
+    text = clean(extract_text(path, start_page, end_page, workers=workers))
+    _write(cache_file, text)
+    return text
+
+
+if __name__ == "__main__":
+    # Worker mode (see _extract_parallel): python -m shared.pdf PATH START END OUTPUT
+    _write(Path(sys.argv[4]), json.dumps(_extract_range(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))))
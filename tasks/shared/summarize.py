@@ -0,0 +1,207 @@
+"""Hierarchical map-reduce summarization of documents larger than one prompt.
+
+``summarize`` never sends the whole document in one request:
+
+1. Map: the document is split into sections of at most ``section_tokens`` tokens,
+   and every section is summarized concurrently.
+2. Reduce: the partial summaries are packed into groups of at most
+   ``merge_tokens`` tokens. Each group is merged into one summary, again
+   concurrently, and the merge is repeated until a single summary is left.
+
+Every summary (section, merge and final) is stored in a SummaryStore under a hash
+of the model, the instructions and the exact input text. A document that has not
+changed is answered from the store without splitting or calling the API. After an
+edit, only the sections whose text changed, and the merges above them, are
+summarized again.
+
+Section boundaries are content-defined so that an edit stays local. A section may
+end after any paragraph once it holds half its budget, but only after paragraphs
+whose hash selects them as a cut point. Inserting text therefore moves the
+boundaries near the edit and leaves the rest of the document cut the same way.
+(Plain greedy packing would shift every later boundary.)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from . import llm, tokens
+
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", str(Path(__file__).resolve().parent.parent / ".cache" / "summaries.json"))
+SECTION_TOKENS = 3000
+MERGE_TOKENS = 6000
+CUT_EVERY = 4  # on average, one paragraph in CUT_EVERY is an allowed cut point
+
+MAP_PROMPT = """Summarize this section of a longer document. Other sections are summarized separately and merged later, so keep every name, identifier and value this section defines.
+{instructions}
+Section:
+"""
+REDUCE_PROMPT = """Merge these partial summaries of consecutive sections of one document into a single summary. Combine entries that describe the same thing, keep every distinct item, and do not invent anything that is not in the summaries.
+{instructions}
+Partial summaries:
+"""
+SYSTEM_PROMPT = "You are a technical documentation summarizer. Create concise but complete summaries that preserve all important details."
+
+
+class SummaryStore:
+    """A JSON file mapping content hashes to summaries."""
+
+    def __init__(self, path: str | Path = SUMMARY_CACHE_PATH):
+        self.path = Path(path)
+        try:
+            self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            self._entries = {}
+        self._dirty = False
+
+    def get(self, key: str) -> str | None:
+        return self._entries.get(key)
+
+    def put(self, key: str, summary: str) -> None:
+        self._entries[key] = summary
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._entries, indent=1, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def _key(*parts: str) -> str:
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+def _pieces(paragraph: str, max_tokens: int, model: str) -> list[str]:
+    """A paragraph as pieces of at most max_tokens: whole lines where possible, else token slices.
+
+    Each line is counted once and the counts are summed (plus one newline per seam),
+    so a long paragraph costs one encode per line rather than one per growing prefix.
+    """
+    if tokens.count(paragraph, model) <= max_tokens:
+        return [paragraph]
+    lines = paragraph.split("\n")
+    newline = tokens.count("\n", model)
+    pieces, current, used = [], [], 0
+    for line, n in zip(lines, tokens.count_many(lines, model)):
+        if current and used + newline + n <= max_tokens:
+            current.append(line)
+            used += newline + n
+            continue
+        if current:
+            pieces.append("\n".join(current))
+        if n <= max_tokens:
+            current, used = [line], n
+        else:
+            ids = tokens.encoding_for(model).encode_ordinary(line)
+            pieces += [tokens.encoding_for(model).decode(ids[i:i + max_tokens]) for i in range(0, len(ids), max_tokens)]
+            current, used = [], 0
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def split_sections(document: str, max_tokens: int = SECTION_TOKENS, model: str = llm.GROQ_MODEL) -> list[str]:
+    """The document as consecutive sections of at most ``max_tokens`` tokens, cut between paragraphs."""
+    paragraphs = [p for block in document.split("\n\n") if block.strip() for p in _pieces(block.strip(), max_tokens, model)]
+    separator = tokens.count("\n\n", model)
+    sections, current, used = [], [], 0
+    for paragraph in paragraphs:
+        n = tokens.count(paragraph, model)
+        if current and used + separator + n > max_tokens:
+            sections.append("\n\n".join(current))
+            current, used = [], 0
+        used += n + (separator if current else 0)
+        current.append(paragraph)
+        if used >= max_tokens // 2 and int(_key(paragraph)[:8], 16) % CUT_EVERY == 0:
+            sections.append("\n\n".join(current))
+            current, used = [], 0
+    if current:
+        sections.append("\n\n".join(current))
+    return sections
+
+
+def _groups(summaries: list[str], max_tokens: int, model: str) -> list[list[str]]:
+    """Consecutive summaries packed into groups that fit one merge prompt (at least two per group)."""
+    groups, current, used = [], [], 0
+    for summary in summaries:
+        n = tokens.count(summary, model)
+        if len(current) >= 2 and used + n > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(summary)
+        used += n
+    if len(current) == 1 and groups:
+        groups[-1].append(current[0])  # never leave a lone summary to "merge" with itself
+    elif current:
+        groups.append(current)
+    return groups
+
+
+async def summarize(
+    document: str,
+    instructions: str = "",
+    *,
+    model: str = llm.GROQ_MODEL,
+    section_tokens: int = SECTION_TOKENS,
+    merge_tokens: int = MERGE_TOKENS,
+    store: SummaryStore | None = None,
+) -> dict:
+    """Map-reduce summary of ``document``.
+
+    ``instructions`` (e.g. what the summary must focus on) are added to every map
+    and reduce prompt. Returns the summary with the section count, how many
+    sections were reused from the store, the number of API calls and their token
+    usage. The store is saved before returning.
+    """
+    store = store or SummaryStore()
+    result = {"summary": "", "sections": 0, "reused_sections": 0, "calls": 0, "cached": False,
+              "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+    async def complete(prompt: str, text: str) -> tuple[str, bool]:
+        key = _key(model, prompt, text)
+        stored = store.get(key)
+        if stored is not None:
+            return stored, True
+        response = await llm.chat(
+            [{"role": "system", "content": SYSTEM_PROMPT}, {"role": "user", "content": prompt + text}],
+            model=model,
+            temperature=0.0,
+        )
+        summary = (response.choices[0].message.content or "").strip()
+        store.put(key, summary)
+        result["calls"] += 1
+        for field in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            result[field] += getattr(response.usage, field)
+        return summary, False
+
+    document_key = _key(model, instructions, str(section_tokens), str(merge_tokens), document)
+    stored = store.get(document_key)
+    if stored is not None:
+        result.update(summary=stored, cached=True)
+        return result
+
+    map_prompt = MAP_PROMPT.format(instructions=instructions)
+    reduce_prompt = REDUCE_PROMPT.format(instructions=instructions)
+    sections = split_sections(document, section_tokens, model)
+    try:
+        mapped = await asyncio.gather(*(complete(map_prompt, section) for section in sections))
+        result["sections"] = len(sections)
+        result["reused_sections"] = sum(reused for _, reused in mapped)
+        summaries = [summary for summary, _ in mapped]
+        while len(summaries) > 1:
+            merged = await asyncio.gather(*(
+                complete(reduce_prompt, "\n\n---\n\n".join(group))
+                for group in _groups(summaries, merge_tokens, model)
+            ))
+            summaries = [summary for summary, _ in merged]
+        result["summary"] = summaries[0] if summaries else ""
+        store.put(document_key, result["summary"])
+    finally:
+        store.save()  # keep finished sections even if a later call failed
+    return result
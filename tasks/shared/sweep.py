@@ -0,0 +1,183 @@
+"""Concurrent parameter sweeps with streamed, resumable CSV output.
+
+A sweep is the cartesian product of some axes (prompt x model x temperature, ...)
+repeated ``runs`` times. Every combination is one task, handled by an async
+``worker`` that returns the result columns:
+
+- Tasks run concurrently, at most ``concurrency`` at a time and at most ``rpm``
+  started per minute, on top of the shared client's own limits (llm.py).
+- Each result is appended to the CSV and flushed as soon as it completes, so an
+  interrupted sweep loses at most the calls that were in flight.
+- Re-running with the same output file skips every task that already has a row
+  without an error; failed tasks are tried again.
+- ``summarize`` reports latency and token distributions per cell (one combination
+  of the axes, over its runs).
+"""
+
+import asyncio
+import csv
+import itertools
+import math
+import statistics
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from . import llm
+
+Worker = Callable[[dict], Awaitable[dict]]
+
+
+def expand_grid(runs: int = 1, **axes: list) -> list[dict]:
+    """Every combination of the axes' values (first axis outermost), each repeated ``runs`` times."""
+    names = list(axes)
+    return [
+        {**dict(zip(names, values)), "run": run}
+        for values in itertools.product(*axes.values())
+        for run in range(1, runs + 1)
+    ]
+
+
+def _key(row: dict, key_fields: list[str]) -> tuple[str, ...]:
+    # Rows read back from the CSV are strings, so compare everything as strings
+    return tuple(str(row[field]) for field in key_fields)
+
+
+def read_rows(path: Path) -> list[dict]:
+    if not path.exists() or path.stat().st_size == 0:
+        return []
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+class _Pacer:
+    """Spaces task starts at least 60/rpm seconds apart (rpm <= 0 disables it)."""
+
+    def __init__(self, rpm: float):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._next = 0.0
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        now = time.monotonic()
+        start = max(now, self._next)
+        self._next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+def run_sweep(
+    grid: list[dict],
+    worker: Worker,
+    output_path: str | Path,
+    fieldnames: list[str],
+    concurrency: int = 8,
+    rpm: float = 0,
+) -> list[dict]:
+    """Run every task of ``grid`` not yet in ``output_path`` and return all results.
+
+    ``fieldnames`` are the CSV columns: the grid's keys, the worker's result keys and
+    ``latency_ms``. A result with a non-empty ``error`` column counts as not done.
+    Results are returned one per task (the latest successful row when there are
+    several), in grid order.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    key_fields = list(grid[0]) if grid else []
+
+    previous = read_rows(output_path)
+    if previous and list(previous[0]) != fieldnames:
+        raise ValueError(f"{output_path} has columns {list(previous[0])}, expected {fieldnames}; use another output file")
+    done = {_key(row, key_fields) for row in previous if not row.get("error")}
+    pending = [task for task in grid if _key(task, key_fields) not in done]
+    print(f"Sweep: {len(grid)} tasks, {len(grid) - len(pending)} already in {output_path}, {len(pending)} to run")
+
+    new_file = not previous
+    with open(output_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+        if new_file:
+            writer.writeheader()
+            f.flush()
+
+        semaphore = asyncio.Semaphore(concurrency)
+        pacer = _Pacer(rpm)
+        finished = 0
+
+        async def run_task(task: dict) -> dict:
+            nonlocal finished
+            async with semaphore:
+                await pacer.wait()
+                start = time.perf_counter()
+                result = await worker(task)
+                row = {**task, **result, "latency_ms": round((time.perf_counter() - start) * 1000)}
+            # Runs on the event loop thread only, so rows never interleave
+            writer.writerow(row)
+            f.flush()
+            finished += 1
+            status = f"ERROR: {str(row['error'])[:50]}" if row.get("error") else "OK"
+            print(f"  [{finished}/{len(pending)}] {' | '.join(str(task[k])[:30] for k in key_fields)} -> {status}")
+            return row
+
+        llm.gather(run_task(task) for task in pending)
+
+    latest: dict[tuple[str, ...], dict] = {}
+    for row in read_rows(output_path):
+        key = _key(row, key_fields)
+        if key not in latest or not row.get("error"):
+            latest[key] = row
+    return [latest[_key(task, key_fields)] for task in grid if _key(task, key_fields) in latest]
+
+
+def _percentile(values: list[int], p: float) -> int:
+    """Nearest-rank percentile (exact for the small per-cell samples of a sweep)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p * len(ordered)) - 1)]
+
+
+def summarize(rows: list[dict], cell_fields: list[str], message_field: str = "message") -> list[dict]:
+    """Latency / token distribution and output variety per cell (combination of ``cell_fields``)."""
+    cells: dict[tuple[str, ...], list[dict]] = {}
+    for row in rows:
+        cells.setdefault(_key(row, cell_fields), []).append(row)
+
+    summary = []
+    for key, cell_rows in cells.items():
+        ok = [r for r in cell_rows if not r.get("error")]
+        latencies = [int(r["latency_ms"]) for r in ok]
+        tokens = [int(r["total_tokens"]) for r in ok]
+        completion = [int(r["completion_tokens"]) for r in ok]
+        summary.append({
+            **dict(zip(cell_fields, key)),
+            "runs": len(cell_rows),
+            "errors": len(cell_rows) - len(ok),
+            "distinct_outputs": len({r[message_field] for r in ok}),
+            "latency_p50_ms": _percentile(latencies, 0.5) if ok else "",
+            "latency_p95_ms": _percentile(latencies, 0.95) if ok else "",
+            "latency_max_ms": max(latencies) if ok else "",
+            "total_tokens_mean": round(statistics.mean(tokens), 1) if ok else "",
+            "total_tokens_min": min(tokens) if ok else "",
+            "total_tokens_max": max(tokens) if ok else "",
+            "completion_tokens_stdev": round(statistics.pstdev(completion), 1) if ok else "",
+        })
+    return summary
+
+
+def write_csv(rows: list[dict], path: str | Path) -> None:
+    if not rows:
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_parquet(csv_path: str | Path) -> Path:
+    """Convert a finished sweep CSV to Parquet next to it (needs pandas and pyarrow)."""
+    try:
+        import pandas as pd
+    except ImportError as e:
+        raise SystemExit("Parquet output needs pandas and pyarrow: pip install pandas pyarrow") from e
+    parquet_path = Path(csv_path).with_suffix(".parquet")
+    pd.read_csv(csv_path, keep_default_na=False).to_parquet(parquet_path, index=False)
+    return parquet_path
@@ -0,0 +1,83 @@
+"""Incremental sync of a Chroma collection with a freshly chunked document set.
+
+The Chroma scripts used to decide on a rebuild by comparing ``collection.count()``
+with the number of chunks, and then dropped and re-embedded everything. Here
+every chunk gets a stable content-hash ID (``content_ids``), and ``sync`` diffs
+those IDs against the ones already stored. The hash covers the embedding model
+too, so switching models re-embeds every chunk instead of keeping vectors from
+the old one:
+
+- chunks whose ID is new are embedded and added (``embed.upsert``);
+- stored IDs that are no longer produced are deleted;
+- chunks that are already stored are not embedded again. Only their metadata is
+  updated, if it changed (e.g. a chunk's position).
+
+After a small edit to a PDF or to the chunking parameters, only the chunks that
+actually changed are embedded.
+"""
+
+import hashlib
+from collections import Counter
+
+from . import embed
+
+DELETE_BATCH_SIZE = 5000
+
+
+def content_ids(texts: list[str], namespaces: list[str] | str = "", model: str = embed.EMBEDDING_MODEL) -> list[str]:
+    """A stable ID per text: its namespace (e.g. the source) plus a hash of its content and ``model``.
+
+    Pass the model that ``sync`` will embed with.
+
+    Identical texts in the same namespace get ``~2``, ``~3``... suffixes in order of
+    appearance, so the IDs stay unique.
+    """
+    if isinstance(namespaces, str):
+        namespaces = [namespaces] * len(texts)
+    seen: Counter = Counter()
+    ids = []
+    for namespace, text in zip(namespaces, texts):
+        digest = hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()[:20]
+        base = f"{namespace}_{digest}" if namespace else digest
+        seen[base] += 1
+        ids.append(base if seen[base] == 1 else f"{base}~{seen[base]}")
+    return ids
+
+
+def sync(collection, ids: list[str], documents: list[str], metadatas: list[dict] | None = None, **embed_kwargs) -> dict:
+    """Make ``collection`` hold exactly these documents, embedding only the new ones.
+
+    ``embed_kwargs`` go to ``embed.upsert`` (model, concurrency, progress, ...).
+    Returns the number of IDs added, deleted, updated (metadata only) and unchanged.
+    """
+    stored = collection.get(include=["metadatas"])
+    stored_metadata = dict(zip(stored["ids"], stored["metadatas"] or [None] * len(stored["ids"])))
+    wanted = set(ids)
+
+    removed = [i for i in stored_metadata if i not in wanted]
+    for start in range(0, len(removed), DELETE_BATCH_SIZE):
+        collection.delete(ids=removed[start:start + DELETE_BATCH_SIZE])
+
+    new = [n for n, i in enumerate(ids) if i not in stored_metadata]
+    if new:
+        embed.upsert(
+            collection,
+            [ids[n] for n in new],
+            [documents[n] for n in new],
+            [metadatas[n] for n in new] if metadatas else None,
+            **embed_kwargs,
+        )
+
+    changed = [
+        n for n, i in enumerate(ids)
+        if metadatas and i in stored_metadata and stored_metadata[i] != metadatas[n]
+    ]
+    if changed:
+        collection.update(ids=[ids[n] for n in changed], metadatas=[metadatas[n] for n in changed])
+
+    return {
+        "added": len(new),
+        "deleted": len(removed),
+        "updated": len(changed),
+        "unchanged": len(ids) - len(new) - len(changed),
+    }
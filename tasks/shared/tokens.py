@@ -0,0 +1,206 @@
+"""Token accounting: exact counts, context-limit checks and cost estimates.
+
+Character-based guesses (``len(text) // 4``) are far off for exactly the inputs the
+task2 tokenizer comparison measured. Code, URLs, JSON, emoji and Urdu all cost many
+more tokens per character than English prose. This module counts with tiktoken
+instead:
+
+- ``count`` is the fast path for arbitrary text. Counts are memoised per
+  (text, encoding), so re-sizing the same chunks or prompts costs a dict lookup.
+  ``count_many`` encodes the uncached texts in one multi-threaded batch.
+- ``count_messages`` sizes a whole chat request, including per-message overhead.
+- ``check_context`` / ``fit`` / ``truncate`` keep a prompt inside a model's
+  context window. ``estimate_cost`` prices a call.
+
+Groq's Llama models do not use an OpenAI tokenizer. Llama 3's vocabulary extends
+cl100k_base and Llama 4's is closest to o200k_base, so counts for them are close
+approximations rather than exact figures. Budgets leave a small margin for this
+(CONTEXT_MARGIN).
+
+``python tasks/shared/tokens.py FILE [--model M]`` reports a file's size and cost.
+"""
+
+import argparse
+import os
+from functools import lru_cache
+
+import tiktoken
+
+DEFAULT_MODEL = os.getenv("GROQ_MODEL", "llama-3.3-70b-versatile")
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "65536"))
+CONTEXT_MARGIN = 0.05  # share of the window kept free for tokenizer mismatch
+
+# Model name prefix -> tiktoken encoding (first match wins; the same encodings task2 compares)
+ENCODINGS = [
+    ("gpt-4o", "o200k_base"),
+    ("openai/gpt-oss", "o200k_base"),
+    ("meta-llama/llama-4", "o200k_base"),
+    ("gpt-4", "cl100k_base"),
+    ("llama", "cl100k_base"),
+    ("hf.co/bartowski/Llama-3", "cl100k_base"),
+]
+FALLBACK_ENCODING = "cl100k_base"
+
+# Context window in tokens
+MODEL_LIMITS = {
+    "llama-3.3-70b-versatile": 131_072,
+    "llama-3.1-8b-instant": 131_072,
+    "meta-llama/llama-4-scout-17b-16e-instruct": 131_072,
+    "meta-llama/llama-4-maverick-17b-128e-instruct": 131_072,
+    "openai/gpt-oss-120b": 131_072,
+    "openai/gpt-oss-20b": 131_072,
+    "hf.co/bartowski/Llama-3.2-1B-Instruct-GGUF": 8_192,  # the num_ctx the week-1 Ollama scripts request
+}
+
+# USD per million (input, output) tokens, from Groq's pricing page; local models are free
+PRICES = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+    "meta-llama/llama-4-scout-17b-16e-instruct": (0.11, 0.34),
+    "meta-llama/llama-4-maverick-17b-128e-instruct": (0.20, 0.60),
+    "openai/gpt-oss-120b": (0.15, 0.75),
+    "openai/gpt-oss-20b": (0.10, 0.50),
+    "hf.co/bartowski/Llama-3.2-1B-Instruct-GGUF": (0.0, 0.0),
+}
+
+# Chat formatting overhead: role and delimiter tokens per message, plus the assistant reply header
+TOKENS_PER_MESSAGE = 4
+TOKENS_PER_REPLY = 3
+
+
+class ContextOverflowError(ValueError):
+    """A prompt (plus its reserved completion) does not fit the model's context window."""
+
+
+def encoding_name(model: str = DEFAULT_MODEL) -> str:
+    for prefix, name in ENCODINGS:
+        if model.startswith(prefix):
+            return name
+    return FALLBACK_ENCODING
+
+
+@lru_cache(maxsize=None)
+def _encoding(name: str) -> tiktoken.Encoding:
+    return tiktoken.get_encoding(name)
+
+
+def encoding_for(model: str = DEFAULT_MODEL) -> tiktoken.Encoding:
+    """The tiktoken encoding used to count ``model``'s tokens (loaded once)."""
+    return _encoding(encoding_name(model))
+
+
+_counts: dict[tuple[str, str], int] = {}
+
+
+def _remember(name: str, text: str, n: int) -> int:
+    if len(_counts) >= TOKEN_CACHE_SIZE:
+        _counts.clear()  # cheap bound; a full rebuild costs one encode per text
+    _counts[name, text] = n
+    return n
+
+
+def count(text: str, model: str = DEFAULT_MODEL) -> int:
+    """Tokens in ``text`` for ``model`` (special-token markup is counted as plain text)."""
+    if not text:
+        return 0
+    name = encoding_name(model)
+    n = _counts.get((name, text))
+    if n is None:
+        n = _remember(name, text, len(_encoding(name).encode_ordinary(text)))
+    return n
+
+
+def count_many(texts: list[str], model: str = DEFAULT_MODEL, threads: int = 4) -> list[int]:
+    """``count`` for many texts, batch-encoding the uncached ones across ``threads``."""
+    name = encoding_name(model)
+    missing = list(dict.fromkeys(t for t in texts if t and (name, t) not in _counts))
+    for text, ids in zip(missing, _encoding(name).encode_ordinary_batch(missing, num_threads=threads)):
+        _remember(name, text, len(ids))
+    return [count(t, model) for t in texts]
+
+
+def count_messages(messages: list[dict], model: str = DEFAULT_MODEL) -> int:
+    """Prompt tokens of a chat request: every message's content plus formatting overhead."""
+    total = TOKENS_PER_REPLY
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + count(message.get("content") or "", model)
+        if message.get("name"):
+            total += count(message["name"], model)
+    return total
+
+
+def context_limit(model: str = DEFAULT_MODEL) -> int:
+    """Usable prompt + completion tokens for ``model``, minus CONTEXT_MARGIN."""
+    if model not in MODEL_LIMITS:
+        raise KeyError(f"no context limit known for {model!r}; add it to MODEL_LIMITS")
+    return int(MODEL_LIMITS[model] * (1 - CONTEXT_MARGIN))
+
+
+def check_context(messages: list[dict], model: str = DEFAULT_MODEL, max_tokens: int = 0) -> int:
+    """Tokens left after the prompt and ``max_tokens`` of completion; raises ContextOverflowError if negative."""
+    used = count_messages(messages, model)
+    remaining = context_limit(model) - used - max_tokens
+    if remaining < 0:
+        raise ContextOverflowError(
+            f"{used:,} prompt + {max_tokens:,} completion tokens exceed {model}'s "
+            f"{context_limit(model):,}-token budget by {-remaining:,}"
+        )
+    return remaining
+
+
+def estimate_cost(prompt_tokens: int, completion_tokens: int = 0, model: str = DEFAULT_MODEL) -> float | None:
+    """USD cost of a call, or None for a model without a known price."""
+    if model not in PRICES:
+        return None
+    input_price, output_price = PRICES[model]
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+def truncate(text: str, max_tokens: int, model: str = DEFAULT_MODEL) -> str:
+    """The longest prefix of ``text`` within ``max_tokens`` (cut on a token boundary)."""
+    if count(text, model) <= max_tokens:
+        return text
+    encoding = encoding_for(model)
+    return encoding.decode(encoding.encode_ordinary(text)[:max(max_tokens, 0)])
+
+
+def fit(texts: list[str], budget: int, model: str = DEFAULT_MODEL, separator: str = "\n\n") -> list[str]:
+    """The leading ``texts`` (e.g. ranked chunks) whose join with ``separator`` fits ``budget`` tokens.
+
+    Whole texts are kept in order; the first one that would overflow and everything
+    after it are dropped. Per-text counts are summed, which can differ from the
+    joined text's count by a token at each seam (CONTEXT_MARGIN absorbs this).
+    """
+    kept, used = [], 0
+    step = count(separator, model)
+    for text, n in zip(texts, count_many(texts, model)):
+        n += step if kept else 0
+        if used + n > budget:
+            break
+        kept.append(text)
+        used += n
+    return kept
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Count a file's tokens and estimate what sending it costs.")
+    parser.add_argument("file")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--completion-tokens", type=int, default=0, help="expected reply length, for the cost estimate")
+    args = parser.parse_args()
+
+    with open(args.file, encoding="utf-8") as f:
+        text = f.read()
+    tokens = count(text, args.model)
+    print(f"{args.file}: {len(text):,} chars, {tokens:,} tokens ({encoding_name(args.model)}), "
+          f"{len(text) / tokens if tokens else 0:.2f} chars/token (len // 4 guesses {len(text) // 4:,})")
+    if args.model in MODEL_LIMITS:
+        limit = context_limit(args.model)
+        print(f"  {args.model}: {tokens / limit:.1%} of the {limit:,}-token budget")
+    cost = estimate_cost(tokens, args.completion_tokens, args.model)
+    if cost is not None:
+        print(f"  estimated cost: ${cost:.6f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""A small in-memory vector store for the example RAG scripts.
+
+The cat-facts examples kept ``VECTOR_DB`` as a list of ``(chunk, embedding)``
+tuples. Every query computed a pure-Python cosine similarity against every entry
+and then sorted them all. ``VectorStore`` keeps the embeddings differently:
+
+- as one contiguous float32 matrix whose rows are normalised when added, so a
+  cosine similarity is a dot product;
+- a query is scored against every row with a single matrix-vector product, and
+  ``np.argpartition`` picks the top ``k`` without sorting the rest;
+- ``save`` / ``load`` persist the matrix with ``np.save``. It is loaded back
+  memory-mapped, so opening a store costs nothing until it is searched.
+
+``cached_store`` builds a store with one embedding request per batch of texts.
+It saves the store in ``tasks/.cache/vectors/`` (``VECTOR_CACHE_DIR``), keyed by
+a hash of the texts and the model, so a relaunch loads it instead of embedding.
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+VECTOR_CACHE_DIR = Path(os.getenv("VECTOR_CACHE_DIR", str(Path(__file__).resolve().parent.parent / ".cache" / "vectors")))
+EMBED_BATCH_SIZE = 64
+
+
+def _normalized(vectors) -> np.ndarray:
+    matrix = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0  # an all-zero vector stays zero (similarity 0 to everything)
+    return matrix / norms
+
+
+class VectorStore:
+    """Texts and their embeddings; ``search`` returns ``(text, cosine similarity)`` pairs, best first."""
+
+    def __init__(self, texts: list[str] = (), vectors=None):
+        self.texts: list[str] = []
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._size = 0
+        if len(texts):
+            self.add(texts, vectors)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The normalised embeddings, one row per text."""
+        return self._matrix[:self._size]
+
+    def add(self, texts, vectors) -> None:
+        """Add one text and its vector, or a list of texts and a matrix of vectors."""
+        if isinstance(texts, str):
+            texts, vectors = [texts], [vectors]
+        rows = _normalized(vectors)
+        if len(rows) != len(texts):
+            raise ValueError(f"{len(texts)} texts but {len(rows)} vectors")
+        if self._size and rows.shape[1] != self._matrix.shape[1]:
+            raise ValueError(f"vectors have {rows.shape[1]} dimensions, the store has {self._matrix.shape[1]}")
+
+        needed = self._size + len(rows)
+        if needed > len(self._matrix) or not self._matrix.flags.writeable:
+            # Grow geometrically, so adding one text at a time stays linear overall
+            grown = np.empty((max(needed, 2 * len(self._matrix)), rows.shape[1]), dtype=np.float32)
+            if self._size:
+                grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        self._matrix[self._size:needed] = rows
+        self._size = needed
+        self.texts.extend(texts)
+
+    def search(self, query_vector, top_n: int = 3) -> list[tuple[str, float]]:
+        if not self._size or top_n <= 0:
+            return []
+        scores = self.vectors @ _normalized(query_vector)[0]
+        k = min(top_n, self._size)
+        top = np.argpartition(-scores, k - 1)[:k] if k < self._size else np.arange(self._size)
+        top = top[np.argsort(-scores[top])]
+        return [(self.texts[i], float(scores[i])) for i in top]
+
+    def save(self, path: str | Path) -> None:
+        """Write ``vectors.npy`` and ``texts.json`` into the directory ``path``."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "vectors.npy", self.vectors)
+        (path / "texts.json").write_text(json.dumps(self.texts, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "VectorStore":
+        path = Path(path)
+        store = cls()
+        store._matrix = np.load(path / "vectors.npy", mmap_mode="r" if mmap else None)
+        store._size = len(store._matrix)
+        store.texts = json.loads((path / "texts.json").read_text(encoding="utf-8"))
+        return store
+
+    @classmethod
+    def exists(cls, path: str | Path) -> bool:
+        return (Path(path) / "vectors.npy").exists() and (Path(path) / "texts.json").exists()
+
+
+def cached_store(
+    texts: list[str],
+    model: str,
+    embed: Callable[[list[str]], list],
+    batch_size: int = EMBED_BATCH_SIZE,
+    cache_dir: str | Path = VECTOR_CACHE_DIR,
+    progress: Callable[[int, int], None] | None = None,
+) -> VectorStore:
+    """A store of ``texts``, reusing the one saved for the same texts and model.
+
+    Otherwise ``embed`` is called once per batch of ``batch_size`` texts (it gets a
+    list and returns one vector per text), and the result is saved for next time.
+    ``progress(embedded, total)`` is called after each batch.
+    """
+    digest = hashlib.sha256(json.dumps(texts, ensure_ascii=False).encode("utf-8")).hexdigest()[:16]
+    path = Path(cache_dir) / (re.sub(r"\W", "_", model) + f"_{digest}")
+    if VectorStore.exists(path):
+        return VectorStore.load(path)
+
+    store = VectorStore()
+    for start in range(0, len(texts), batch_size):
+        batch = texts[start:start + batch_size]
+        store.add(batch, embed(batch))
+        if progress:
+            progress(len(store), len(texts))
+
+    # Written next to the final directory and renamed, so an interrupted save is never loaded
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    store.save(tmp)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp, path)
+    return store
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The scripts import the shared package after adding tasks/ to sys.path; so do the tests
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,144 @@
+"""llm.chat and the completion cache against a local stand-in for the Groq API."""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from groq import AsyncGroq
+
+from shared import cache, llm
+
+
+class StubGroq:
+    """An OpenAI-compatible /chat/completions endpoint that answers with a counter and the request."""
+
+    def __init__(self):
+        self.requests: list[dict] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                stub.requests.append(body)
+                content = f"answer {len(stub.requests)} to {body['messages'][-1]['content']}"
+                data = json.dumps({
+                    "id": f"chatcmpl-{len(stub.requests)}",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": 5, "completion_tokens": 4, "total_tokens": 9},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+
+@pytest.fixture
+def stub(tmp_path, monkeypatch):
+    """Point llm at the stand-in, with an empty in-memory cache and a fresh disk cache."""
+    server = StubGroq()
+    monkeypatch.setattr(llm, "_client", AsyncGroq(api_key="test", base_url=server.url, max_retries=0))
+    monkeypatch.setattr(llm, "_semaphore", asyncio.Semaphore(4))
+    monkeypatch.setattr(llm, "_disk", cache.CompletionCache(tmp_path / "llm_cache.sqlite3"))
+    monkeypatch.setattr(llm, "_cache", {})
+    monkeypatch.setattr(llm, "LLM_CACHE_MODE", "auto")
+    yield server
+    server.server.shutdown()
+
+
+def ask(question: str, **params) -> str:
+    return llm.run(llm.ask([{"role": "user", "content": question}], model="stub-model", **params))
+
+
+def forget_memory(monkeypatch) -> None:
+    """Simulate a fresh process: only the disk cache survives."""
+    monkeypatch.setattr(llm, "_cache", {})
+
+
+def test_auto_caches_deterministic_calls_on_disk(stub, monkeypatch):
+    first = ask("q1", temperature=0)
+    forget_memory(monkeypatch)
+    assert ask("q1", temperature=0) == first
+    assert len(stub.requests) == 1
+    assert llm._disk.counts() == {"stub-model": 1}
+
+
+def test_auto_does_not_cache_sampled_calls(stub):
+    assert ask("q1", temperature=0.7) != ask("q1", temperature=0.7)
+    assert len(stub.requests) == 2
+    assert llm._disk.counts() == {}
+
+
+def test_key_covers_model_messages_and_params(stub):
+    ask("q1", temperature=0)
+    ask("q1", temperature=0, max_tokens=10)
+    ask("q2", temperature=0)
+    llm.run(llm.ask([{"role": "user", "content": "q1"}], model="other-model", temperature=0))
+    assert len(stub.requests) == 4
+    base = {"model": "m", "messages": [{"role": "user", "content": "q"}], "temperature": 0}
+    assert llm.request_key(base) == llm.request_key(dict(reversed(list(base.items()))))
+    assert llm.request_key(base) != llm.request_key({**base, "temperature": 0.0001})
+
+
+def test_identical_calls_in_flight_share_one_request(stub):
+    answers = llm.gather(llm.ask([{"role": "user", "content": "q"}], model="stub-model", temperature=0)
+                         for _ in range(5))
+    assert len(set(answers)) == 1
+    assert len(stub.requests) == 1
+
+
+def test_record_then_replay_offline(stub, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_CACHE_MODE", "record")
+    recorded = [ask("q1", temperature=0), ask("q2", temperature=0.9)]
+    assert len(stub.requests) == 2
+
+    monkeypatch.setattr(llm, "LLM_CACHE_MODE", "replay")
+    forget_memory(monkeypatch)
+    # No network in replay: a client pointing nowhere proves every answer comes from disk
+    monkeypatch.setattr(llm, "_client", AsyncGroq(api_key="test", base_url="http://127.0.0.1:9", max_retries=0))
+    assert [ask("q1", temperature=0), ask("q2", temperature=0.9)] == recorded
+    with pytest.raises(cache.CacheMissError):
+        ask("never recorded", temperature=0)
+    assert len(stub.requests) == 2
+
+
+def test_record_overwrites_earlier_response(stub, monkeypatch):
+    first = ask("q1", temperature=0)
+    monkeypatch.setattr(llm, "LLM_CACHE_MODE", "record")
+    second = ask("q1", temperature=0)
+    assert second != first
+    monkeypatch.setattr(llm, "LLM_CACHE_MODE", "replay")
+    forget_memory(monkeypatch)
+    assert ask("q1", temperature=0) == second
+
+
+def test_off_skips_the_disk_cache(stub, monkeypatch):
+    monkeypatch.setattr(llm, "LLM_CACHE_MODE", "off")
+    ask("q1", temperature=0)
+    forget_memory(monkeypatch)
+    ask("q1", temperature=0)
+    assert len(stub.requests) == 2
+    assert llm._disk.counts() == {}
+
+
+def test_completion_cache_store(tmp_path):
+    store = cache.CompletionCache(tmp_path / "c.sqlite3")
+    request = {"model": "m", "messages": [{"role": "user", "content": "q"}]}
+    assert store.get("k") is None
+    store.put("k", request, {"answer": 1})
+    assert store.get("k") == {"answer": 1}
+    assert cache.CompletionCache(tmp_path / "c.sqlite3").get("k") == {"answer": 1}
+    assert store.clear() == 1 and store.counts() == {}
@@ -1,11 +1,13 @@
 import os
-import csv
+import argparse
 from datetime import datetime
 
-from dotenv import load_dotenv
-from groq import Groq
+import sys
+from pathlib import Path
 
-load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from shared import llm  # noqa: E402
+from shared.sweep import expand_grid, run_sweep, summarize, write_csv, write_parquet  # noqa: E402
 
 # Configuration
 MODELS = [
@@ -14,11 +16,19 @@ MODELS = [
     # "openai/gpt-oss-120b"
 ]
 TEMPERATURES = [0, 0.7, 1]
+RUNS = 3
+CONCURRENCY = 8
+RPM = 30  # Groq free-tier request limit
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROMPTS_FILE = os.path.join(BASE_DIR, "input", "prompts.txt")
 OUTPUT_FILE = os.path.join(BASE_DIR, "output", f"results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
 SYSTEM_PROMPT = "You are a helpful assistant that gives accurate answers in less than 25 words."
 
+FIELDNAMES = [
+    "prompt", "model", "temperature", "run", "message",
+    "prompt_tokens", "completion_tokens", "total_tokens", "latency_ms", "error"
+]
+
 
 def load_prompts(filepath: str) -> list[str]:
     """Load prompts from a text file (one prompt per line)."""
@@ -27,19 +37,20 @@ def load_prompts(filepath: str) -> list[str]:
     return prompts
 
 
-def run_prompt(client: Groq, model: str, prompt: str, temperature: float) -> dict:
-    """Run a single prompt and return response with metadata."""
+async def run_prompt(task: dict) -> dict:
+    """Run a single prompt x model x temperature task and return the response with metadata."""
     try:
-        response = client.chat.completions.create(
-            messages=[
+        # Never cached: repeated runs at the same temperature are the point of the experiment
+        response = await llm.chat(
+            [
                 {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": prompt}
+                {"role": "user", "content": task["prompt"]}
             ],
-            model=model,
-            temperature=temperature
+            model=task["model"],
+            temperature=task["temperature"],
+            cache=False,
         )
         return {
-            "success": True,
             "message": response.choices[0].message.content,
             "prompt_tokens": response.usage.prompt_tokens,
             "completion_tokens": response.usage.completion_tokens,
@@ -48,7 +59,6 @@ def run_prompt(client: Groq, model: str, prompt: str, temperature: float) -> dic
         }
     except Exception as e:
         return {
-            "success": False,
             "message": "",
             "prompt_tokens": 0,
             "completion_tokens": 0,
@@ -57,65 +67,54 @@ def run_prompt(client: Groq, model: str, prompt: str, temperature: float) -> dic
         }
 
 
-def write_results_to_csv(results: list[dict], filepath: str):
-    """Write results to a CSV file."""
-    fieldnames = [
-        "prompt", "model", "temperature", "message",
-        "prompt_tokens", "completion_tokens", "total_tokens", "error"
-    ]
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(results)
+def print_summary(summary: list[dict]):
+    """Print latency/token distributions per prompt x model x temperature cell."""
+    print(f"\n{'Prompt':<32} {'Temp':>5} {'OK':>4} {'Distinct':>8} {'p50 ms':>7} {'p95 ms':>7} {'Tokens':>12}")
+    for cell in summary:
+        ok = cell["runs"] - cell["errors"]
+        tokens = f"{cell['total_tokens_min']}-{cell['total_tokens_max']}" if ok else "-"
+        print(
+            f"{cell['prompt'][:32]:<32} {cell['temperature']:>5} {ok:>2}/{cell['runs']:<1} {cell['distinct_outputs']:>8} "
+            f"{cell['latency_p50_ms'] or '-':>7} {cell['latency_p95_ms'] or '-':>7} {tokens:>12}"
+        )
 
 
 def main():
-    # Initialize client
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+    parser = argparse.ArgumentParser(description="Prompt x model x temperature sweep")
+    parser.add_argument("--resume", metavar="CSV", help="continue a previous (interrupted) sweep in this results file")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--rpm", type=float, default=RPM, help="max requests started per minute (0 = unlimited)")
+    parser.add_argument("--parquet", action="store_true", help="also write the results as Parquet")
+    args = parser.parse_args()
+    output_file = args.resume or OUTPUT_FILE
 
     # Load prompts from file
     prompts = load_prompts(PROMPTS_FILE)
     print(f"Loaded {len(prompts)} prompts from {PROMPTS_FILE}")
     print(f"Models: {MODELS}")
     print(f"Temperatures: {TEMPERATURES}")
-    print(f"Total API calls: {len(prompts) * len(MODELS) * len(TEMPERATURES)}")
+    print(f"Total API calls: {len(prompts) * len(MODELS) * len(TEMPERATURES) * args.runs}")
     print("-" * 50)
 
-    results = []
-
-    # For each prompt -> for each model -> for each temperature
-    for prompt_idx, prompt in enumerate(prompts, 1):
-        print(f"\nPrompt {prompt_idx}/{len(prompts)}: {prompt[:50]}...")
-
-        for model in MODELS:
-            print(f"  Model: {model}")
-
-            for temp in TEMPERATURES:
-                print(f"    Temperature: {temp}", end=" -> ")
-                for _run in range(3):
-                    print(f"    Run: {_run + 1}", end=" -> ")
-                    response = run_prompt(client, model, prompt, temp)
-
-                    results.append({
-                        "prompt": prompt,
-                        "model": model,
-                        "temperature": temp,
-                        "message": response["message"],
-                        "prompt_tokens": response["prompt_tokens"],
-                        "completion_tokens": response["completion_tokens"],
-                        "total_tokens": response["total_tokens"],
-                        "error": response["error"]
-                    })
-
-                    if response["success"]:
-                        print(f"OK ({response['total_tokens']} tokens)")
-                    else:
-                        print(f"ERROR: {response['error'][:50]}")
-
-    # Write results to CSV
-    write_results_to_csv(results, OUTPUT_FILE)
+    # For each prompt -> for each model -> for each temperature -> each run, all in flight together
+    grid = expand_grid(runs=args.runs, prompt=prompts, model=MODELS, temperature=TEMPERATURES)
+    try:
+        results = run_sweep(grid, run_prompt, output_file, FIELDNAMES, concurrency=args.concurrency, rpm=args.rpm)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted. Completed results are in {output_file}; continue with --resume {output_file}")
+        return
+
+    summary = summarize(results, ["prompt", "model", "temperature"])
+    summary_file = output_file.replace(".csv", "_summary.csv")
+    write_csv(summary, summary_file)
+    print_summary(summary)
+
     print(f"\n{'=' * 50}")
-    print(f"Results saved to: {OUTPUT_FILE}")
+    print(f"Results saved to: {output_file}")
+    print(f"Per-cell summary saved to: {summary_file}")
+    if args.parquet:
+        print(f"Parquet saved to: {write_parquet(output_file)}")
     print(f"Total records: {len(results)}")
 
 
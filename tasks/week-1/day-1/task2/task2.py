@@ -1,6 +1,12 @@
 import os
 import csv
+import json
+import time
+import argparse
+import itertools
+import re
 
+import numpy as np
 import tiktoken
 
 # Configuration
@@ -11,6 +17,18 @@ TOKENIZERS = {
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 STRINGS_FILE = os.path.join(BASE_DIR, "input", "strings2.txt")
 
+# Bulk mode (--bulk CORPUS)
+BATCH_LINES = 10_000  # lines encoded per encode_ordinary_batch call
+THREADS = os.cpu_count() or 4
+CATEGORIES = ["Code", "URL", "JSON", "Emoji", "Urdu/Deutsch Mix", "Other"]
+BULK_FIELDS = [
+    "tokenizer", "category", "lines", "chars", "bytes",
+    "tokens", "chars_per_token", "bytes_per_token", "tokens_per_sec",
+]
+
+ARABIC_SCRIPT = re.compile("[\u0600-\u06FF]")
+EMOJI_PLANE = re.compile("[\U0001F001-\U0010FFFF]")  # any code point above U+1F000
+
 
 def get_output_file(input_file: str) -> str:
     """Derive output filename from input filename. e.g. strings1.txt -> results1.csv"""
@@ -34,9 +52,9 @@ def categorize_string(s: str) -> str:
         return "JSON"
     if s.startswith("<") or "def " in s or "import " in s or "SELECT " in s or "const " in s or "for " in s:
         return "Code"
-    if any("\u0600" <= c <= "\u06FF" for c in s):
+    if ARABIC_SCRIPT.search(s):
         return "Urdu/Deutsch Mix"
-    if any(ord(c) > 0x1F000 for c in s):
+    if EMOJI_PLANE.search(s):
         return "Emoji"
     return "Other"
 
@@ -62,7 +80,141 @@ def write_results_to_csv(results: list[dict], filepath: str):
         writer.writerows(results)
 
 
+def iter_batches(filepath: str, batch_lines: int):
+    """Stream non-empty, stripped lines from a (possibly multi-GB) corpus in batches."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        while True:
+            raw = list(itertools.islice(f, batch_lines))
+            if not raw:
+                return
+            batch = [line for line in (r.strip() for r in raw) if line]
+            if batch:
+                yield batch
+
+
+def load_token_ids(ids_dir: str, tokenizer_name: str) -> tuple[np.ndarray, np.ndarray]:
+    """Memory-map the token ids written by bulk mode: (flat ids, line offsets into them)."""
+    stem = os.path.join(ids_dir, TOKENIZERS[tokenizer_name])
+    if os.path.getsize(f"{stem}.tokens.u32") == 0:
+        # An empty file cannot be memory-mapped (empty corpus, or only empty strings)
+        return np.zeros(0, dtype=np.uint32), np.fromfile(f"{stem}.offsets.u64", dtype=np.uint64)
+    ids = np.memmap(f"{stem}.tokens.u32", dtype=np.uint32, mode="r")
+    offsets = np.memmap(f"{stem}.offsets.u64", dtype=np.uint64, mode="r")
+    return ids, offsets
+
+
+def bulk_tokenize(corpus: str, batch_lines: int, threads: int, store_ids: bool) -> None:
+    """High-throughput mode: batch-encode a corpus line by line and report per-category economics."""
+    stem = os.path.splitext(os.path.basename(corpus))[0]
+    ids_dir = os.path.join(BASE_DIR, "output", f"bulk_{stem}")
+    summary_file = os.path.join(BASE_DIR, "output", f"bulk_{stem}.csv")
+
+    encoders = {name: tiktoken.get_encoding(encoding) for name, encoding in TOKENIZERS.items()}
+    category_index = {c: i for i, c in enumerate(CATEGORIES)}
+    lines = np.zeros(len(CATEGORIES), dtype=np.int64)
+    chars = np.zeros(len(CATEGORIES), dtype=np.int64)
+    nbytes = np.zeros(len(CATEGORIES), dtype=np.int64)
+    tokens = {name: np.zeros(len(CATEGORIES), dtype=np.int64) for name in encoders}
+    encode_s = dict.fromkeys(encoders, 0.0)
+
+    files = {}
+    if store_ids:
+        os.makedirs(ids_dir, exist_ok=True)
+        for name, encoding in TOKENIZERS.items():
+            files[name] = (
+                open(os.path.join(ids_dir, f"{encoding}.tokens.u32"), "wb"),
+                open(os.path.join(ids_dir, f"{encoding}.offsets.u64"), "wb"),
+            )
+            np.zeros(1, dtype=np.uint64).tofile(files[name][1])  # offsets start at 0
+    written = dict.fromkeys(encoders, 0)
+
+    start = time.perf_counter()
+    try:
+        for batch in iter_batches(corpus, batch_lines):
+            cats = np.fromiter((category_index[categorize_string(s)] for s in batch), dtype=np.int64, count=len(batch))
+            lines += np.bincount(cats, minlength=len(CATEGORIES))
+            chars += np.bincount(cats, weights=[len(s) for s in batch], minlength=len(CATEGORIES)).astype(np.int64)
+            nbytes += np.bincount(cats, weights=[len(s.encode("utf-8")) for s in batch], minlength=len(CATEGORIES)).astype(np.int64)
+
+            for name, encoder in encoders.items():
+                t = time.perf_counter()
+                encoded = encoder.encode_ordinary_batch(batch, num_threads=threads)
+                encode_s[name] += time.perf_counter() - t
+                counts = np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded))
+                tokens[name] += np.bincount(cats, weights=counts, minlength=len(CATEGORIES)).astype(np.int64)
+                if store_ids:
+                    ids_file, offsets_file = files[name]
+                    total = int(counts.sum())
+                    np.fromiter(itertools.chain.from_iterable(encoded), dtype=np.uint32, count=total).tofile(ids_file)
+                    (written[name] + np.cumsum(counts, dtype=np.uint64)).tofile(offsets_file)
+                    written[name] += total
+            print(f"  {int(lines.sum()):,} lines, {int(nbytes.sum()) / 1e6:,.1f} MB", end="\r")
+    finally:
+        for ids_file, offsets_file in files.values():
+            ids_file.close()
+            offsets_file.close()
+    wall = time.perf_counter() - start
+
+    rows = []
+    for name in encoders:
+        for c, category in enumerate(CATEGORIES + ["All"]):
+            if category == "All":
+                n_lines, n_chars, n_bytes, n_tokens = lines.sum(), chars.sum(), nbytes.sum(), tokens[name].sum()
+            else:
+                n_lines, n_chars, n_bytes, n_tokens = lines[c], chars[c], nbytes[c], tokens[name][c]
+            if not n_lines:
+                continue
+            rows.append({
+                "tokenizer": name,
+                "category": category,
+                "lines": int(n_lines),
+                "chars": int(n_chars),
+                "bytes": int(n_bytes),
+                "tokens": int(n_tokens),
+                "chars_per_token": round(n_chars / n_tokens, 3) if n_tokens else "",
+                "bytes_per_token": round(n_bytes / n_tokens, 3) if n_tokens else "",
+                # Encoding is timed per batch, not per category, so throughput is only known overall
+                "tokens_per_sec": round(n_tokens / encode_s[name]) if category == "All" and encode_s[name] else "",
+            })
+
+    with open(summary_file, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=BULK_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    if store_ids:
+        with open(os.path.join(ids_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"corpus": corpus, "tokenizers": TOKENIZERS, "ids_dtype": "uint32", "offsets_dtype": "uint64",
+                       "lines": int(lines.sum()), "tokens": {n: int(t.sum()) for n, t in tokens.items()}}, f, indent=2)
+
+    if not rows:
+        print(f"No non-empty lines in {corpus}; wrote a header-only summary to {summary_file}")
+        return
+
+    print(f"\n{'Tokenizer':<22} {'Category':<18} {'Lines':>10} {'Tokens':>12} {'Chars/tok':>9} {'Bytes/tok':>9} {'Tok/s':>11}")
+    for row in rows:
+        tokens_per_sec = f"{row['tokens_per_sec']:,}" if row["tokens_per_sec"] != "" else ""
+        print(
+            f"{row['tokenizer']:<22} {row['category']:<18} {row['lines']:>10,} {row['tokens']:>12,} "
+            f"{row['chars_per_token']:>9} {row['bytes_per_token']:>9} {tokens_per_sec:>11}"
+        )
+    print(f"\n{'=' * 50}")
+    print(f"Tokenized {int(nbytes.sum()) / 1e6:,.1f} MB in {wall:.1f}s with {threads} threads")
+    print(f"Summary saved to: {summary_file}")
+    if store_ids:
+        print(f"Token ids saved to: {ids_dir} (load with load_token_ids)")
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Tokenizer comparison")
+    parser.add_argument("--bulk", metavar="CORPUS", help="high-throughput mode over a large corpus (one string per line)")
+    parser.add_argument("--batch-lines", type=int, default=BATCH_LINES)
+    parser.add_argument("--threads", type=int, default=THREADS)
+    parser.add_argument("--no-ids", action="store_true", help="bulk mode: only count tokens, do not store the ids")
+    args = parser.parse_args()
+    if args.bulk:
+        bulk_tokenize(args.bulk, args.batch_lines, args.threads, store_ids=not args.no_ids)
+        return
+
     # Resolve output file from input file name
     output_file = get_output_file(STRINGS_FILE)
 
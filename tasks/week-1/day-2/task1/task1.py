@@ -1,8 +1,10 @@
 import os
-from dotenv import load_dotenv
-from groq import Groq
+import sys
+from pathlib import Path
 
-load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from shared import llm  # noqa: E402
+from shared.docqa import DocumentSession  # noqa: E402
 
 # Configuration
 MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
@@ -17,70 +19,46 @@ def read_document(file_path: str) -> str:
         return f.read()
 
 
-def run_completion(client: Groq, model: str, document: str, question: str) -> dict:
-    """Send document + question to chat completion."""
-    user_content = f"""Here is the API documentation:
-
-{document}
-
----
-
-Based on the documentation above, please answer the following question:
-{question}"""
-
+def run_completion(session: DocumentSession, question: str) -> dict:
+    """Ask one question in the document session (the document prefix is identical for every question)."""
     try:
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_content}
-            ],
-            model=model,
-            temperature=0.0
-        )
-        return {
-            "success": True,
-            "message": response.choices[0].message.content,
-            "prompt_tokens": response.usage.prompt_tokens,
-            "completion_tokens": response.usage.completion_tokens,
-            "total_tokens": response.usage.total_tokens,
-            "error": ""
-        }
+        return {"success": True, "error": "", **llm.run(session.ask(question))}
     except Exception as e:
-        return {
-            "success": False,
-            "message": "",
-            "prompt_tokens": 0,
-            "completion_tokens": 0,
-            "total_tokens": 0,
-            "error": str(e)
-        }
+        return {"success": False, "error": str(e)}
 
 
 def main():
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
     # Read the entire document
     document = read_document(PROMPT_FILE)
     print(f"Loaded document from {PROMPT_FILE}")
     print(f"Document length: {len(document)} characters")
-    print("-" * 50)
 
-    # Test question - modify as needed
-    question = input("Enter your question about the API: ")
-
-    print(f"\nSending to {MODEL}...")
-    response = run_completion(client, MODEL, document, question)
+    # Full-document mode while it fits the context window; otherwise only the relevant sections are sent
+    session = DocumentSession(document, model=MODEL, instructions=SYSTEM_PROMPT, temperature=0.0)
+    print(f"Document tokens: {session.document_tokens:,} ({session.mode} mode)")
+    print("-" * 50)
 
-    if response["success"]:
-        print(f"\n{'=' * 50}")
-        print("RESPONSE:")
-        print(response["message"])
-        print(f"\n{'=' * 50}")
-        print(f"Prompt tokens: {response['prompt_tokens']}")
-        print(f"Completion tokens: {response['completion_tokens']}")
-        print(f"Total tokens: {response['total_tokens']}")
-    else:
-        print(f"ERROR: {response['error']}")
+    # Ask as many questions as needed; an empty line ends the session
+    while question := input("\nEnter your question about the API (empty to finish): ").strip():
+        print(f"\nSending to {MODEL}...")
+        response = run_completion(session, question)
+
+        if response["success"]:
+            print(f"\n{'=' * 50}")
+            print("RESPONSE:")
+            print(response["answer"])
+            print(f"\n{'=' * 50}")
+            print(f"Prompt tokens: {response['prompt_tokens']} ({response['cached_tokens']} served from the prompt cache)")
+            print(f"Completion tokens: {response['completion_tokens']}")
+            print(f"Full-document mode would send: {response['full_document_tokens']} prompt tokens "
+                  f"(saved {response['saved_tokens']})")
+        else:
+            print(f"ERROR: {response['error']}")
+
+    totals = session.totals()
+    if totals["questions"]:
+        print(f"\nSession: {totals['questions']} questions, {totals['prompt_tokens']} prompt tokens "
+              f"({totals['cached_tokens']} cached), {totals['saved_tokens']} saved vs full-document mode")
 
 
 if __name__ == "__main__":
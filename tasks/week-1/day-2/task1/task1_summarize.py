@@ -1,8 +1,10 @@
 import os
-from dotenv import load_dotenv
-from groq import Groq
+import sys
+from pathlib import Path
 
-load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from shared import llm  # noqa: E402
+from shared.summarize import summarize  # noqa: E402
 
 # Configuration
 MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
@@ -24,42 +26,21 @@ def save_summary(file_path: str, summary: str) -> None:
         f.write(summary)
 
 
-def load_summary(file_path: str) -> str:
-    """Load the summary from a file."""
-    with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
-
-
-def summarize_document(client: Groq, model: str, document: str) -> dict:
-    """First pass: create a condensed summary of the API docs."""
-    summary_prompt = """Please create a comprehensive but condensed summary of this API documentation.
-Focus on:
+SUMMARY_INSTRUCTIONS = """Focus on:
 1. List of all event types and their purpose
 2. Common fields across all events
 3. Key structure patterns (e.g., headerValue fields for each event type)
 4. Important field types and their possible values
 
 Keep the summary structured and reference-friendly for answering future questions.
-
-Documentation:
 """
+
+
+def summarize_document(model: str, document: str) -> dict:
+    """First pass: map-reduce summary of the API docs (reused while the document is unchanged)."""
     try:
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": "You are a technical documentation summarizer. Create concise but complete summaries that preserve all important details."},
-                {"role": "user", "content": summary_prompt + document}
-            ],
-            model=model,
-            temperature=0.0
-        )
-        return {
-            "success": True,
-            "summary": response.choices[0].message.content,
-            "prompt_tokens": response.usage.prompt_tokens,
-            "completion_tokens": response.usage.completion_tokens,
-            "total_tokens": response.usage.total_tokens,
-            "error": ""
-        }
+        result = llm.run(summarize(document, SUMMARY_INSTRUCTIONS, model=model))
+        return {"success": True, "error": "", **result}
     except Exception as e:
         return {
             "success": False,
@@ -71,7 +52,7 @@ Documentation:
         }
 
 
-def run_completion(client: Groq, model: str, summary: str, question: str) -> dict:
+def run_completion(model: str, summary: str, question: str) -> dict:
     """Send summary + question to chat completion."""
     user_content = f"""Here is a summary of the API documentation:
 
@@ -83,14 +64,14 @@ Based on the documentation summary above, please answer the following question:
 {question}"""
 
     try:
-        response = client.chat.completions.create(
-            messages=[
+        response = llm.run(llm.chat(
+            [
                 {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_content}
             ],
             model=model,
             temperature=0.0
-        )
+        ))
         return {
             "success": True,
             "message": response.choices[0].message.content,
@@ -111,47 +92,43 @@ Based on the documentation summary above, please answer the following question:
 
 
 def main():
-    client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
     # Token tracking
     summarization_tokens = {"prompt": 0, "completion": 0, "total": 0}
     qa_tokens = {"prompt": 0, "completion": 0, "total": 0}
 
-    # Check if summary exists
-    if os.path.exists(SUMMARY_FILE):
-        print(f"Loading cached summary from {SUMMARY_FILE}")
-        summary = load_summary(SUMMARY_FILE)
-        print(f"Summary length: {len(summary)} characters")
-        print("(No summarization tokens used - loaded from cache)")
-    else:
-        # Read the full document and generate summary
-        print(f"Reading document from {PROMPT_FILE}")
-        document = read_document(PROMPT_FILE)
-        print(f"Document length: {len(document)} characters")
-        print("-" * 50)
-
-        print(f"\nGenerating summary using {MODEL}...")
-        summary_result = summarize_document(client, MODEL, document)
-
-        if not summary_result["success"]:
-            print(f"ERROR generating summary: {summary_result['error']}")
-            return
-
-        summary = summary_result["summary"]
-        summarization_tokens = {
-            "prompt": summary_result["prompt_tokens"],
-            "completion": summary_result["completion_tokens"],
-            "total": summary_result["total_tokens"]
-        }
+    # Summarize the document; unchanged documents and sections come from the summary cache
+    print(f"Reading document from {PROMPT_FILE}")
+    document = read_document(PROMPT_FILE)
+    print(f"Document length: {len(document)} characters")
+    print("-" * 50)
 
-        # Save summary to file
-        save_summary(SUMMARY_FILE, summary)
-        print(f"Summary saved to {SUMMARY_FILE}")
-        print(f"Summary length: {len(summary)} characters")
-        print(f"\nSummarization tokens:")
-        print(f"  Prompt tokens: {summarization_tokens['prompt']}")
-        print(f"  Completion tokens: {summarization_tokens['completion']}")
-        print(f"  Total tokens: {summarization_tokens['total']}")
+    print(f"\nSummarizing using {MODEL}...")
+    summary_result = summarize_document(MODEL, document)
+
+    if not summary_result["success"]:
+        print(f"ERROR generating summary: {summary_result['error']}")
+        return
+
+    summary = summary_result["summary"]
+    summarization_tokens = {
+        "prompt": summary_result["prompt_tokens"],
+        "completion": summary_result["completion_tokens"],
+        "total": summary_result["total_tokens"]
+    }
+    if summary_result["cached"]:
+        print("Document unchanged: summary loaded from cache (no summarization tokens used)")
+    else:
+        print(f"Sections: {summary_result['sections']} ({summary_result['reused_sections']} unchanged, reused)")
+        print(f"API calls: {summary_result['calls']}")
+
+    # Save summary to file
+    save_summary(SUMMARY_FILE, summary)
+    print(f"Summary saved to {SUMMARY_FILE}")
+    print(f"Summary length: {len(summary)} characters")
+    print(f"\nSummarization tokens:")
+    print(f"  Prompt tokens: {summarization_tokens['prompt']}")
+    print(f"  Completion tokens: {summarization_tokens['completion']}")
+    print(f"  Total tokens: {summarization_tokens['total']}")
 
     print("-" * 50)
 
@@ -159,7 +136,7 @@ def main():
     question = input("\nEnter your question about the API: ")
 
     print(f"\nAnswering using {MODEL}...")
-    response = run_completion(client, MODEL, summary, question)
+    response = run_completion(MODEL, summary, question)
 
     if response["success"]:
         qa_tokens = {
@@ -6,21 +6,17 @@ Tracks success/failure cases and analyzes LLM behavior under different constrain
 
 import json
 import csv
-import os
 import re
 from datetime import datetime
+import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from groq import Groq
 
-load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from shared import llm  # noqa: E402
 
 # Configuration
 MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
 
-# Initialize the Groq client
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
 # Define known entities in the sample text for validation
 KNOWN_ENTITIES = {
     "people": [
@@ -83,14 +79,14 @@ def call_llm(system_prompt: str, user_prompt: str) -> dict:
     Returns response text and token usage.
     """
     try:
-        response = client.chat.completions.create(
-            model=MODEL,
-            temperature=0,  # Consistency for testing
-            messages=[
+        response = llm.run(llm.chat(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
-            ]
-        )
+            ],
+            model=MODEL,
+            temperature=0,  # Consistency for testing
+        ))
 
         return {
             "response": response.choices[0].message.content,
@@ -1,20 +1,36 @@
-import fitz  
-from dotenv import load_dotenv
-from groq import Groq
 import os
+import sys
+from pathlib import Path
 
-load_dotenv()
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared import llm, pdf  # noqa: E402
+from shared.docqa import DocumentSession  # noqa: E402
 
-text = ""
-for page in fitz.open("D:\\Work\\gen-ai\\tasks\\week-1\\day-3\\input\\constitution_pak.pdf"):
-    text += page.get_text()
+MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+# Above this the document is answered from its relevant sections; default: the model's context window.
+# The whole constitution (~180k tokens) is over it, so use END_PAGE for full-document mode, or lower this
+# to keep requests under the free-tier TPM.
+MAX_DOCUMENT_TOKENS = int(os.environ["MAX_DOCUMENT_TOKENS"]) if os.getenv("MAX_DOCUMENT_TOKENS") else None
+END_PAGE = int(os.environ["END_PAGE"]) if os.getenv("END_PAGE") else None
+QUESTIONS = sys.argv[1:] or ["What is the minimum age to become President of Pakistan?"]
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-response = client.chat.completions.create(
-    model="meta-llama/llama-4-scout-17b-16e-instruct",
-    messages=[
-        {"role": "system", "content": f"Answer based on this document:\n{text}"},
-        {"role": "user", "content": "What is the minimum age to become President of Pakistan?"}
-    ]
+text = pdf.extract_text("D:\\Work\\gen-ai\\tasks\\week-1\\day-3\\input\\constitution_pak.pdf", end_page=END_PAGE)
+
+session = DocumentSession(
+    text,
+    model=MODEL,
+    instructions="Answer based on this document:",
+    max_document_tokens=MAX_DOCUMENT_TOKENS,
 )
-print(response)
\ No newline at end of file
+print(f"Document: {session.document_tokens:,} tokens, {session.mode} mode")
+
+if session.mode == "full":
+    # The first question writes the shared prefix to the provider's cache; the rest run together and read it
+    reports = [llm.run(session.ask(QUESTIONS[0]))] + llm.gather(session.ask(q) for q in QUESTIONS[1:])
+else:
+    reports = llm.gather(session.ask(q) for q in QUESTIONS)
+
+for report in reports:
+    print(f"\nQ: {report['question']}\nA: {report['answer']}")
+    print(f"   prompt tokens {report['prompt_tokens']:,} ({report['cached_tokens']:,} cached), "
+          f"full-document mode {report['full_document_tokens']:,}, saved {report['saved_tokens']:,}")
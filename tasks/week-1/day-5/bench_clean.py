@@ -0,0 +1,96 @@
+"""Benchmark the single-pass Cleaner against the original regex-chain cleaner.
+
+Checks that both produce identical text on both constitution PDFs, then times
+them. Usage: python bench_clean.py [--runs 5] [--workers 4]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared import pdf  # noqa: E402
+from shared.clean import constitution_cleaner, light_cleaner  # noqa: E402
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PDF_DIR = os.path.join(BASE_DIR, "..", "day-3", "input")
+PDFS = {"constitution_pak.pdf": 22, "constitution_india.pdf": 31}
+
+
+def legacy_clean_text(text, source):
+    """task.py's clean_text before the Cleaner (the reference output)."""
+    if "india" in source.lower():
+        text = re.sub(r"^THE CONSTITUTION OF\s+INDIA\s*$", "", text, flags=re.MULTILINE)
+        text = re.sub(r"^\(Part\s+[IVXLC]+[A-Z]?\..*?\)\s*$", "", text, flags=re.MULTILINE)
+    elif "pak" in source.lower():
+        text = re.sub(r"^\s*CONSTITUTION OF PAKISTAN\s*\d*\s*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^[_]{10,}\s*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^[–\-]{10,}\s*$", "", text, flags=re.MULTILINE)
+    text = re.sub(
+        r"^\d{1,2}\.\s+(Ins\.|Added|Subs\.|Omitted|See |The word|Ins |Added |Subs |Rep\.).*$",
+        "", text, flags=re.MULTILINE,
+    )
+    text = re.sub(r"^\s*\(\w+\)\s*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^\s*\d{1,3}\s*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def legacy_light_clean(text):
+    """evaluate.py's light_clean before the Cleaner."""
+    text = re.sub(r"^[_]{10,}\s*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"^[–\-]{10,}\s*$", "", text, flags=re.MULTILINE)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def first_difference(a: str, b: str) -> str:
+    i = next((i for i, (x, y) in enumerate(zip(a, b)) if x != y), min(len(a), len(b)))
+    return f"at char {i}:\n  legacy: {a[max(0, i - 80):i + 80]!r}\n  cleaner: {b[max(0, i - 80):i + 80]!r}"
+
+
+def best_of(runs: int, fn, *args) -> float:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cleaner equivalence and speed benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    args = parser.parse_args()
+
+    ok = True
+    print(f"{'PDF':<26} {'Cleaner':<8} {'Chars':>10} {'Legacy ms':>10} {'Single ms':>10} {'Pages ms':>10} {'Same':>5}")
+    for filename, start_page in PDFS.items():
+        pages = pdf.extract_pages(os.path.join(PDF_DIR, filename), start_page)
+        text = "".join(page + "\n" for page in pages)
+        cleaner = constitution_cleaner(filename)
+        cases = [
+            ("full", lambda t, f=filename: legacy_clean_text(t, f), cleaner),
+            ("light", legacy_light_clean, light_cleaner),
+        ]
+        for name, legacy, new in cases:
+            expected = legacy(text)
+            same = new.clean(text) == expected and new.clean_pages(pages, args.workers) == expected
+            if not same:
+                ok = False
+                print(f"MISMATCH {filename} ({name}) {first_difference(expected, new.clean(text))}")
+            print(
+                f"{filename:<26} {name:<8} {len(text):>10,} "
+                f"{best_of(args.runs, legacy, text) * 1000:>10.1f} "
+                f"{best_of(args.runs, new.clean, text) * 1000:>10.1f} "
+                f"{best_of(args.runs, new.clean_pages, pages, args.workers) * 1000:>10.1f} {'yes' if same else 'NO':>5}"
+            )
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Benchmark the concurrent embedding pipeline against the old per-batch upsert loop.
+
+Starts a stub Ollama server on a local port that answers ``/api/embed`` and
+``/api/embeddings`` with fixed vectors after a simulated delay. The stub serves
+``--parallel`` requests at a time, like OLLAMA_NUM_PARALLEL. A stub collection
+sleeps ``--upsert-ms`` per write, like a Chroma upsert.
+
+Usage: python bench_embed.py [--texts 2000] [--parallel 4] [--concurrency 4]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared import embed  # noqa: E402
+
+DIMENSIONS = 768
+
+
+def stub_server(parallel: int, request_seconds: float, item_seconds: float) -> ThreadingHTTPServer:
+    slots = threading.BoundedSemaphore(parallel)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            texts = body["input"] if self.path == "/api/embed" else [body["prompt"]]
+            with slots:
+                time.sleep(request_seconds + item_seconds * len(texts))
+            vectors = [[hashlib.sha256(t.encode()).digest()[0] / 255] * DIMENSIONS for t in texts]
+            payload = {"embeddings": vectors} if self.path == "/api/embed" else {"embedding": vectors[0]}
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class StubCollection:
+    def __init__(self, upsert_seconds: float):
+        self.upsert_seconds = upsert_seconds
+        self.stored = {}
+
+    def upsert(self, ids, documents, metadatas=None, embeddings=None):
+        time.sleep(self.upsert_seconds)
+        self.stored.update(zip(ids, embeddings))
+
+
+def legacy_upsert(collection, url, ids, documents, batch_size=50):
+    """The old loop: OllamaEmbeddingFunction embeds each batch one text at a time, then the batch is written."""
+    with httpx.Client(base_url=url, timeout=60) as client:
+        for i in range(0, len(documents), batch_size):
+            batch = documents[i:i + batch_size]
+            vectors = [
+                client.post("/api/embeddings", json={"model": embed.EMBEDDING_MODEL, "prompt": text}).json()["embedding"]
+                for text in batch
+            ]
+            collection.upsert(ids=ids[i:i + batch_size], documents=batch, embeddings=vectors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding pipeline throughput against a stub Ollama server")
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--parallel", type=int, default=4, help="requests the stub server runs at once")
+    parser.add_argument("--concurrency", type=int, default=embed.EMBED_CONCURRENCY)
+    parser.add_argument("--request-ms", type=float, default=20.0, help="stub latency per request")
+    parser.add_argument("--item-ms", type=float, default=2.0, help="stub latency per text")
+    parser.add_argument("--upsert-ms", type=float, default=30.0, help="stub collection latency per write")
+    args = parser.parse_args()
+
+    server = stub_server(args.parallel, args.request_ms / 1000, args.item_ms / 1000)
+    url = f"http://127.0.0.1:{server.server_port}"
+    documents = [f"Article {i}. Text of chunk number {i}." for i in range(args.texts)]
+    ids = [f"chunk{i}" for i in range(args.texts)]
+
+    runs = [
+        ("legacy (batches of 50, serial)", lambda c: legacy_upsert(c, url, ids, documents)),
+        ("pipeline, 1 in flight", lambda c: embed.upsert(c, ids, documents, url=url, concurrency=1)),
+        (f"pipeline, {args.concurrency} in flight",
+         lambda c: embed.upsert(c, ids, documents, url=url, concurrency=args.concurrency)),
+    ]
+    reference = None
+    print(f"{'Run':<34} {'Seconds':>8} {'Texts/s':>9} {'Same':>5}")
+    for name, run in runs:
+        collection = StubCollection(args.upsert_ms / 1000)
+        start = time.perf_counter()
+        run(collection)
+        seconds = time.perf_counter() - start
+        reference = reference or collection.stored
+        same = collection.stored == reference and len(collection.stored) == args.texts
+        print(f"{name:<34} {seconds:>8.2f} {args.texts / seconds:>9.0f} {'yes' if same else 'NO':>5}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
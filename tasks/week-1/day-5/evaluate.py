@@ -1,11 +1,14 @@
-import fitz
-import re
 import os
-import ollama
 import chromadb
 from chromadb.utils.embedding_functions import OllamaEmbeddingFunction
 import json
+import sys
 from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared import evaluation, pdf, tokens  # noqa: E402
+from shared.clean import light_cleaner  # noqa: E402
 
 # --- Configuration ---
 EMBEDDING_MODEL = "hf.co/CompendiumLabs/bge-base-en-v1.5-gguf"
@@ -13,12 +16,16 @@ LANGUAGE_MODEL = "hf.co/bartowski/Llama-3.2-1B-Instruct-GGUF"
 CHROMA_PATH = r"D:\Work\gen-ai\tasks\week-1\day-5\storage"
 COLLECTION_NAME = "constitutions"
 OUTPUT_FILE = r"D:\Work\gen-ai\tasks\week-1\day-5\rag_comparison.json"
+# One line per answer, appended as it completes; a rerun only answers what is missing
+CHECKPOINT_FILE = r"D:\Work\gen-ai\tasks\week-1\day-5\rag_answers.jsonl"
 PDF_DIR = r"D:\Work\gen-ai\tasks\week-1\day-3\input"
 
-# Max chars per PDF for direct context (~4K tokens each, ~8K total)
-MAX_CONTEXT_CHARS_PER_PDF = 15000
-# Ollama context window to request
+# Ollama context window to request (for both arms: a different num_ctx makes Ollama reload the model)
 NUM_CTX = 8192
+# Requests in flight at once (both arms together); match the server's OLLAMA_NUM_PARALLEL
+PARALLELISM = evaluation.EVAL_PARALLELISM
+# Tokens kept free for the question and the answer
+ANSWER_RESERVE_TOKENS = 768
 
 QUESTIONS = [
     {
@@ -85,12 +92,8 @@ Context:
 
 
 # ============================
-# Part 1: RAG-based responses
+# Part 1: RAG arm
 # ============================
-print("=" * 60)
-print("PART 1: RAG-based responses")
-print("=" * 60)
-
 ollama_ef = OllamaEmbeddingFunction(
     url="http://localhost:11434/api/embeddings",
     model_name=EMBEDDING_MODEL,
@@ -116,29 +119,18 @@ def retrieve(query, top_n=5):
     ))
 
 
-def generate_rag(query, context_chunks):
+def rag_request(q):
+    retrieved = retrieve(q["question"])
     context = "\n\n".join(
         f"[{meta['source']}, Article {meta['article_id']}]\n{doc}"
-        for doc, meta, _ in context_chunks
+        for doc, meta, _ in retrieved
     )
-    response = ollama.chat(
-        model=LANGUAGE_MODEL,
-        messages=[
+    return {
+        "messages": [
             {"role": "system", "content": SYSTEM_PROMPT_TEMPLATE.format(context=context)},
-            {"role": "user", "content": query},
+            {"role": "user", "content": q["question"]},
         ],
-    )
-    return response["message"]["content"]
-
-
-rag_results = {}
-for q in QUESTIONS:
-    print(f"  Q{q['id']}: {q['question']}")
-    retrieved = retrieve(q["question"])
-    answer = generate_rag(q["question"], retrieved)
-    print(f"  A{q['id']}: {answer[:150]}...\n")
-    rag_results[q["id"]] = {
-        "response": answer,
+        "options": {"num_ctx": NUM_CTX},
         "retrieved_chunks": [
             {"source": meta["source"], "article_id": meta["article_id"], "distance": round(dist, 4)}
             for _, meta, dist in retrieved
@@ -147,12 +139,8 @@ for q in QUESTIONS:
 
 
 # ==========================================
-# Part 2: Direct LLM responses (no RAG)
+# Part 2: Direct arm (no RAG)
 # ==========================================
-print("=" * 60)
-print("PART 2: Direct LLM responses (full PDF text as context)")
-print("=" * 60)
-
 PDFS = [
     ("Constitution of Pakistan", os.path.join(PDF_DIR, "constitution_pak.pdf"), 22),
     ("Constitution of India", os.path.join(PDF_DIR, "constitution_india.pdf"), 31),
@@ -160,77 +148,100 @@ PDFS = [
 
 
 def extract_and_clean(pdf_path, start_page):
-    doc = fitz.open(pdf_path)
-    text = ""
-    for p in range(start_page, len(doc)):
-        text += doc[p].get_text() + "\n"
-    doc.close()
-    # Light cleaning
-    text = re.sub(r"^[_]{10,}\s*$", "", text, flags=re.MULTILINE)
-    text = re.sub(r"^[–\-]{10,}\s*$", "", text, flags=re.MULTILINE)
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    return text.strip()
-
-
-# Build the direct context (truncated to fit model context window)
+    # Extracted and cleaned once; later runs read the cached text
+    return pdf.extract_text(pdf_path, start_page, clean=light_cleaner.clean)  # separator lines and blank runs only
+
+
+# Build the direct context: split the context window evenly between the PDFs, in real tokens
+print("Direct context (full PDF text):")
+prompt_overhead = tokens.count_messages([{"role": "system", "content": SYSTEM_PROMPT_TEMPLATE.format(context="")}], LANGUAGE_MODEL)
+tokens_per_pdf = (tokens.context_limit(LANGUAGE_MODEL) - prompt_overhead - ANSWER_RESERVE_TOKENS) // len(PDFS)
 direct_context_parts = []
 for label, path, start in PDFS:
     full_text = extract_and_clean(path, start)
-    truncated = full_text[:MAX_CONTEXT_CHARS_PER_PDF]
+    truncated = tokens.truncate(full_text, tokens_per_pdf, LANGUAGE_MODEL)
     direct_context_parts.append(f"--- {label} ---\n{truncated}")
-    print(f"  {label}: {len(full_text):,} chars total, using first {len(truncated):,} chars")
+    print(f"  {label}: {tokens.count(full_text, LANGUAGE_MODEL):,} tokens total, using first {tokens.count(truncated, LANGUAGE_MODEL):,}")
 
 direct_context = "\n\n".join(direct_context_parts)
-print(f"  Combined context: {len(direct_context):,} chars (~{len(direct_context) // 4:,} tokens)\n")
+print(f"  Combined context: {len(direct_context):,} chars, {tokens.count(direct_context, LANGUAGE_MODEL):,} tokens\n")
 
 
-def generate_direct(query, context):
-    response = ollama.chat(
-        model=LANGUAGE_MODEL,
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT_TEMPLATE.format(context=context)},
-            {"role": "user", "content": query},
-        ],
-        options={"num_ctx": NUM_CTX},
-    )
-    return response["message"]["content"]
+def direct_request(q):
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT_TEMPLATE.format(context=direct_context)},
+        {"role": "user", "content": q["question"]},
+    ]
+    # Ollama silently drops the start of an over-long prompt, so fail loudly instead
+    tokens.check_context(messages, LANGUAGE_MODEL)
+    return {"messages": messages, "options": {"num_ctx": NUM_CTX}}
 
 
-direct_results = {}
-for q in QUESTIONS:
-    print(f"  Q{q['id']}: {q['question']}")
-    answer = generate_direct(q["question"], direct_context)
-    print(f"  A{q['id']}: {answer[:150]}...\n")
-    direct_results[q["id"]] = {"response": answer}
+# ==========================================
+# Part 3: Answer with both arms concurrently
+# ==========================================
+print("=" * 60)
+print("Answering with RAG and direct generation")
+print("=" * 60)
+records = evaluation.run(
+    QUESTIONS,
+    {"rag": rag_request, "direct": direct_request},
+    LANGUAGE_MODEL,
+    CHECKPOINT_FILE,
+    parallelism=PARALLELISM,
+    settings={"num_ctx": NUM_CTX},
+)
+answers = {(r["id"], r["arm"]): r for r in records}
+performance = evaluation.summarize(records)
 
 
 # ==========================================
-# Part 3: Build comparison output
+# Part 4: Build comparison output
 # ==========================================
+METRICS = ["latency_ms", "load_ms", "prompt_tokens", "prompt_eval_tps", "completion_tokens", "eval_tps"]
+
+
+def response_of(q, arm):
+    record = answers.get((q["id"], arm), {})
+    return record.get("answer", f"ERROR: {record.get('error', 'not answered')}")
+
+
 comparison = {
     "model": LANGUAGE_MODEL,
     "embedding_model": EMBEDDING_MODEL,
     "timestamp": datetime.now().isoformat(),
     "notes": {
         "rag": "Top 5 chunks retrieved from ChromaDB using bge-base-en-v1.5 embeddings",
-        "direct": f"First {MAX_CONTEXT_CHARS_PER_PDF:,} chars per PDF passed as context with num_ctx={NUM_CTX}",
+        "direct": f"First {tokens_per_pdf:,} tokens per PDF passed as context with num_ctx={NUM_CTX}",
+        "performance": f"Both arms run concurrently, {PARALLELISM} requests at a time; tokens/s as reported by Ollama",
     },
+    "performance": performance,
     "results": [],
 }
 
 for q in QUESTIONS:
+    rag, direct = answers.get((q["id"], "rag"), {}), answers.get((q["id"], "direct"), {})
+    print(f"  Q{q['id']}: {q['question']}")
+    print(f"    RAG:    {response_of(q, 'rag')[:150]}...")
+    print(f"    Direct: {response_of(q, 'direct')[:150]}...\n")
     comparison["results"].append({
         "id": q["id"],
         "question": q["question"],
         "ground_truth": q["ground_truth"],
-        "rag_response": rag_results[q["id"]]["response"],
-        "direct_response": direct_results[q["id"]]["response"],
-        "retrieved_chunks": rag_results[q["id"]]["retrieved_chunks"],
+        "rag_response": response_of(q, "rag"),
+        "direct_response": response_of(q, "direct"),
+        "retrieved_chunks": rag.get("retrieved_chunks", []),
+        "rag_metrics": {m: rag.get(m) for m in METRICS},
+        "direct_metrics": {m: direct.get(m) for m in METRICS},
     })
 
 with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
     json.dump(comparison, f, indent=2, ensure_ascii=False)
 
+print("=" * 60)
+print("Performance")
+print("=" * 60)
+evaluation.print_summary(performance)
 print("=" * 60)
 print(f"Done. Comparison saved to {OUTPUT_FILE}")
 print("=" * 60)
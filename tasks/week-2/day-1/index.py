@@ -1,7 +1,13 @@
 import re
+import sys
+from pathlib import Path
+
 import chromadb
 from chromadb.utils.embedding_functions import OllamaEmbeddingFunction
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared import sync  # noqa: E402
+
 # --- Configuration ---
 CAT_FACTS_PATH = r"D:\Work\gen-ai\tasks\week-2\day-1\cat-facts.txt"
 CHROMA_PATH = r"D:\Work\gen-ai\tasks\week-2\day-1\storage"
@@ -144,27 +150,25 @@ for name, info in STRATEGIES.items():
     col_name = info["collection"]
     chunks = info["chunks"]
 
-    # Clean slate
-    try:
-        client.delete_collection(col_name)
-    except Exception:
-        pass
-
     collection = client.get_or_create_collection(
         name=col_name,
         embedding_function=ollama_ef,
     )
 
-    print(f"Embedding [{name}] -> {col_name} ({len(chunks)} chunks)...")
-
-    BATCH_SIZE = 50
-    for i in range(0, len(chunks), BATCH_SIZE):
-        batch = chunks[i : i + BATCH_SIZE]
-        ids = [f"{name}_{i + j}" for j in range(len(batch))]
-        metadatas = [{"strategy": name, "chunk_index": i + j, "chunk_size": len(c)} for j, c in enumerate(batch)]
-        collection.upsert(documents=batch, metadatas=metadatas, ids=ids)
-        print(f"  Batch {i // BATCH_SIZE + 1}/{(len(chunks) - 1) // BATCH_SIZE + 1}")
-
+    print(f"Syncing [{name}] -> {col_name} ({len(chunks)} chunks)...")
+
+    # Content-hash IDs: only chunks that are new since the last run are embedded
+    # (concurrently through Ollama), and chunks that disappeared are deleted
+    changes = sync.sync(
+        collection,
+        ids=sync.content_ids(chunks, name, model=EMBEDDING_MODEL),
+        documents=chunks,
+        metadatas=[{"strategy": name, "chunk_index": i, "chunk_size": len(c)} for i, c in enumerate(chunks)],
+        model=EMBEDDING_MODEL,
+        progress=lambda done, total: print(f"  Embedded {done}/{total} new chunks"),
+    )
+    print(f"  {changes['added']} added, {changes['deleted']} deleted, {changes['updated']} updated, "
+          f"{changes['unchanged']} unchanged.")
     print(f"  Stored {collection.count()} embeddings.\n")
 
 print("All three indexes built successfully.")
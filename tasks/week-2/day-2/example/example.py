@@ -1,5 +1,11 @@
+import sys
+from pathlib import Path
+
 import ollama
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+from shared import vectors  # noqa: E402
+
 
 dataset = []
 with open('D:\\Work\\gen-ai\\tasks\\week-2\\day-2\\example\\resources\\cat-facts.txt', 'r', encoding='utf-8') as file:
@@ -10,36 +16,20 @@ with open('D:\\Work\\gen-ai\\tasks\\week-2\\day-2\\example\\resources\\cat-facts
 EMBEDDING_MODEL = 'hf.co/CompendiumLabs/bge-base-en-v1.5-gguf'
 LANGUAGE_MODEL = 'hf.co/bartowski/Llama-3.2-1B-Instruct-GGUF'
 
-# Each element in the VECTOR_DB will be a tuple (chunk, embedding)
-# The embedding is a list of floats, for example: [0.1, 0.04, -0.34, 0.21, ...]
-VECTOR_DB = []
-
-def add_chunk_to_database(chunk):
-  embedding = ollama.embed(model=EMBEDDING_MODEL, input=chunk)['embeddings'][0]
-  VECTOR_DB.append((chunk, embedding))
+def embed_chunks(chunks):
+  return ollama.embed(model=EMBEDDING_MODEL, input=chunks)['embeddings']
 
 
-for i, chunk in enumerate(dataset):
-  add_chunk_to_database(chunk)
-  print(f'Added chunk {i+1}/{len(dataset)} to the database')
-
-
-def cosine_similarity(a, b):
-  dot_product = sum([x * y for x, y in zip(a, b)])
-  norm_a = sum([x ** 2 for x in a]) ** 0.5
-  norm_b = sum([x ** 2 for x in b]) ** 0.5
-  return dot_product / (norm_a * norm_b)
+# Embedded in batches on the first launch, loaded from tasks/.cache/vectors/ after that
+VECTOR_DB = vectors.cached_store(
+  dataset, EMBEDDING_MODEL, embed_chunks,
+  progress=lambda done, total: print(f'Added {done}/{total} chunks to the database'),
+)
 
 
 def retrieve(query, top_n=3):
    query_embedding = ollama.embed(model=EMBEDDING_MODEL, input=query)['embeddings'][0]
-   similarities = []
-   for chunk, embedding in VECTOR_DB:
-      similarity = cosine_similarity(query_embedding, embedding)
-      similarities.append((chunk, similarity))
-
-   similarities.sort(key=lambda x: x[1], reverse=True)
-   return similarities[:top_n]
+   return VECTOR_DB.search(query_embedding, top_n)
 
 def ask():
    input_query = input('Go ahead and ask\n')
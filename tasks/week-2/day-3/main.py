@@ -3,17 +3,17 @@ Week 2 Day 3 (DAY 8) — Retrieval Strategies & Reranking
 Compares vector-only, hybrid (vector + BM25), and hybrid + reranking retrieval.
 """
 
-import os
+import asyncio
 import json
 import math
+import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from groq import Groq
 import chromadb
 from chromadb.utils.embedding_functions import OllamaEmbeddingFunction
 from rank_bm25 import BM25Okapi
 
-load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared import llm  # noqa: E402
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 CAT_FACTS_PATH = SCRIPT_DIR / "cat-facts.txt"
@@ -38,9 +38,6 @@ GROUND_TRUTH = [
     "muscle in the larynx opens and closes the air passage",
 ]
 
-client = Groq(api_key=os.environ["GROQ_API_KEY"])
-
-
 def load_facts():
     with open(CAT_FACTS_PATH, "r", encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip()]
@@ -90,43 +87,50 @@ def hybrid_retrieve(collection, bm25, corpus, query, top_n=TOP_N, vector_weight=
     return [doc for doc, _ in ranked], [s for _, s in ranked]
 
 
-def generate_answer(query, context_chunks):
+async def generate_answer(query, context_chunks):
     context = "\n".join(f"- {c}" for c in context_chunks)
-    resp = client.chat.completions.create(
-        model=GROQ_MODEL,
-        messages=[
+    return await llm.ask(
+        [
             {"role": "system", "content": f"Answer the question using ONLY the context below.\n\nContext:\n{context}"},
             {"role": "user", "content": query},
         ],
+        model=GROQ_MODEL,
         temperature=0,
         max_tokens=300,
     )
-    return resp.choices[0].message.content.strip()
-
-
-def rerank_with_llm(query, docs, top_n=TOP_N):
-    scored = []
-    for doc in docs:
-        prompt = (
-            f"Rate the relevance of the following passage to the query on a scale of 0-10.\n"
-            f"Query: {query}\nPassage: {doc}\n"
-            f"Respond with ONLY a number between 0 and 10."
-        )
-        resp = client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0,
-            max_tokens=5,
-        )
-        try:
-            score = float(resp.choices[0].message.content.strip())
-        except ValueError:
-            score = 0
-        scored.append((doc, score))
-    scored.sort(key=lambda x: x[1], reverse=True)
+
+
+async def score_relevance(query, doc):
+    prompt = (
+        f"Rate the relevance of the following passage to the query on a scale of 0-10.\n"
+        f"Query: {query}\nPassage: {doc}\n"
+        f"Respond with ONLY a number between 0 and 10."
+    )
+    reply = await llm.ask([{"role": "user", "content": prompt}], model=GROQ_MODEL, temperature=0, max_tokens=5)
+    try:
+        return float(reply)
+    except ValueError:
+        return 0
+
+
+async def rerank_with_llm(query, docs, top_n=TOP_N):
+    # All passages are scored concurrently
+    scores = await asyncio.gather(*(score_relevance(query, doc) for doc in docs))
+    scored = sorted(zip(docs, scores), key=lambda x: x[1], reverse=True)
     return [d for d, _ in scored[:top_n]], [s for _, s in scored[:top_n]]
 
 
+async def answer_with_strategies(query, vec_docs, hyb_docs, hyb_docs_wide):
+    """Vector, hybrid and hybrid+rerank answers for one question, with independent calls in parallel."""
+    vec_answer, hyb_answer, (reranked_docs, _) = await asyncio.gather(
+        generate_answer(query, vec_docs),
+        generate_answer(query, hyb_docs),
+        rerank_with_llm(query, hyb_docs_wide),
+    )
+    rerank_answer = await generate_answer(query, reranked_docs)
+    return vec_answer, hyb_answer, reranked_docs, rerank_answer
+
+
 def check_hit(retrieved_docs, ground_truth):
     gt_lower = ground_truth.lower()
     return any(gt_lower in doc.lower() for doc in retrieved_docs)
@@ -159,27 +163,31 @@ def main():
     vec_hits, hyb_hits, rerank_hits = 0, 0, 0
     vec_correct, hyb_correct, rerank_correct = 0, 0, 0
 
+    # Retrieval is local; every LLM call for every question and strategy then runs concurrently
+    retrievals = []
+    for q in QUESTIONS:
+        vec_docs, _ = vector_retrieve(collection, q)
+        hyb_docs, _ = hybrid_retrieve(collection, bm25, facts, q)
+        hyb_docs_wide, _ = hybrid_retrieve(collection, bm25, facts, q, top_n=10)
+        retrievals.append((vec_docs, hyb_docs, hyb_docs_wide))
+    answers = llm.gather(answer_with_strategies(q, *docs) for q, docs in zip(QUESTIONS, retrievals))
+
     for i, (q, gt) in enumerate(zip(QUESTIONS, GROUND_TRUTH)):
         print(f"\n{'─' * 60}")
         print(f"Q{i+1}: {q}")
+        vec_docs, hyb_docs, _ = retrievals[i]
+        vec_answer, hyb_answer, reranked_docs, rerank_answer = answers[i]
 
         # Vector-only
-        vec_docs, _ = vector_retrieve(collection, q)
         vec_hit = check_hit(vec_docs, gt)
-        vec_answer = generate_answer(q, vec_docs)
         vec_ans_correct = check_answer_correctness(vec_answer, gt)
 
         # Hybrid
-        hyb_docs, _ = hybrid_retrieve(collection, bm25, facts, q)
         hyb_hit = check_hit(hyb_docs, gt)
-        hyb_answer = generate_answer(q, hyb_docs)
         hyb_ans_correct = check_answer_correctness(hyb_answer, gt)
 
         # Hybrid + Reranking
-        hyb_docs_wide, _ = hybrid_retrieve(collection, bm25, facts, q, top_n=10)
-        reranked_docs, rerank_scores = rerank_with_llm(q, hyb_docs_wide)
         rerank_hit = check_hit(reranked_docs, gt)
-        rerank_answer = generate_answer(q, reranked_docs)
         rerank_ans_correct = check_answer_correctness(rerank_answer, gt)
 
         vec_hits += int(vec_hit)
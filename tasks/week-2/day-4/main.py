@@ -3,16 +3,16 @@ Week 2 Day 4 (DAY 9) — Answer Generation & Structured Output
 Compares free-form vs citation-enforced answer prompts with structured JSON validation.
 """
 
-import os
+import asyncio
 import json
 import re
+import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from groq import Groq
 import chromadb
 from chromadb.utils.embedding_functions import OllamaEmbeddingFunction
 
-load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared import llm  # noqa: E402
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 CAT_FACTS_PATH = SCRIPT_DIR / "cat-facts.txt"
@@ -37,9 +37,6 @@ GROUND_TRUTH = [
     "muscle in the larynx opens and closes the air passage",
 ]
 
-client = Groq(api_key=os.environ["GROQ_API_KEY"])
-
-
 def load_facts():
     with open(CAT_FACTS_PATH, "r", encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip()]
@@ -84,26 +81,28 @@ Context:
 Question: {question}"""
 
 
-def generate_free_form(query, context_chunks):
+async def generate_free_form(query, context_chunks):
     context = "\n".join(f"- {c}" for c in context_chunks)
-    resp = client.chat.completions.create(
+    return await llm.ask(
+        [{"role": "user", "content": FREE_FORM_PROMPT.format(context=context, question=query)}],
         model=GROQ_MODEL,
-        messages=[{"role": "user", "content": FREE_FORM_PROMPT.format(context=context, question=query)}],
         temperature=0,
         max_tokens=400,
     )
-    return resp.choices[0].message.content.strip()
 
 
-def generate_citation_enforced(query, context_chunks):
+async def generate_citation_enforced(query, context_chunks):
     context = "\n".join(f"- {c}" for c in context_chunks)
-    resp = client.chat.completions.create(
+    return await llm.ask(
+        [{"role": "user", "content": CITATION_PROMPT.format(context=context, question=query)}],
         model=GROQ_MODEL,
-        messages=[{"role": "user", "content": CITATION_PROMPT.format(context=context, question=query)}],
         temperature=0,
         max_tokens=600,
     )
-    return resp.choices[0].message.content.strip()
+
+
+async def generate_both(query, context_chunks):
+    return await asyncio.gather(generate_free_form(query, context_chunks), generate_citation_enforced(query, context_chunks))
 
 
 def parse_json_output(raw_text):
@@ -152,20 +151,22 @@ def main():
     ff_correct, ce_correct = 0, 0
     citation_present, json_valid, json_total = 0, 0, 0
 
+    # Both prompt styles for every question are generated concurrently
+    all_chunks = [retrieve(collection, q) for q in QUESTIONS]
+    answers = llm.gather(generate_both(q, chunks) for q, chunks in zip(QUESTIONS, all_chunks))
+
     for i, (q, gt) in enumerate(zip(QUESTIONS, GROUND_TRUTH)):
         print(f"\n{'─' * 60}")
         print(f"Q{i+1}: {q}")
 
-        chunks = retrieve(collection, q)
         json_total += 1
+        ff_answer, ce_raw = answers[i]
 
         # Free-form answer
-        ff_answer = generate_free_form(q, chunks)
         ff_is_correct = check_correctness(ff_answer, gt)
         ff_correct += int(ff_is_correct)
 
         # Citation-enforced answer
-        ce_raw = generate_citation_enforced(q, chunks)
         parsed, error = parse_json_output(ce_raw)
 
         if parsed:
@@ -3,16 +3,15 @@ Week 3 Day 1 (DAY 11) — Tool Calling & Controlled Execution
 LLM dynamically decides when to call tools (calculator, search_by_category) vs answer directly.
 """
 
-import os
 import json
 import re
+import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from groq import Groq
 import chromadb
 from chromadb.utils.embedding_functions import OllamaEmbeddingFunction
 
-load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared import llm  # noqa: E402
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 CAT_FACTS_PATH = SCRIPT_DIR / "cat-facts.txt"
@@ -20,8 +19,6 @@ EMBEDDING_MODEL = "hf.co/CompendiumLabs/bge-base-en-v1.5-gguf"
 GROQ_MODEL = "llama-3.3-70b-versatile"
 TOP_N = 5
 
-client = Groq(api_key=os.environ["GROQ_API_KEY"])
-
 # Tool schemas for validation
 TOOL_SCHEMAS = {
     "calculator": {
@@ -124,12 +121,13 @@ def validate_tool_call(tool_call):
     return True, "Valid"
 
 
-def ask_llm_with_tools(query, facts, collection):
-    """Send query to LLM with tool descriptions, handle tool calls."""
-    # First, retrieve relevant context
+def retrieve_context(query, collection):
     retrieval_results = collection.query(query_texts=[query], n_results=TOP_N)
-    context = "\n".join(f"- {d}" for d in retrieval_results["documents"][0])
+    return "\n".join(f"- {d}" for d in retrieval_results["documents"][0])
+
 
+async def ask_llm_with_tools(query, facts, context):
+    """Send query to LLM with tool descriptions and the retrieved context, handle tool calls."""
     system_prompt = f"""{TOOL_DESCRIPTIONS}
 
 You also have the following context about cats:
@@ -137,16 +135,15 @@ You also have the following context about cats:
 
 If you can answer from context alone, do so directly. Only use tools when the question requires computation or category-specific searching."""
 
-    resp = client.chat.completions.create(
-        model=GROQ_MODEL,
-        messages=[
+    raw = await llm.ask(
+        [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": query},
         ],
+        model=GROQ_MODEL,
         temperature=0,
         max_tokens=400,
     )
-    raw = resp.choices[0].message.content.strip()
 
     # Try to parse as tool call
     tool_call = None
@@ -176,18 +173,17 @@ If you can answer from context alone, do so directly. Only use tools when the qu
             tool_result = {"error": "Unknown tool"}
 
         # Send tool result back to LLM for final answer
-        follow_up = client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=[
+        final_answer = await llm.ask(
+            [
                 {"role": "system", "content": "Use the tool result to answer the user's question concisely."},
                 {"role": "user", "content": query},
                 {"role": "assistant", "content": raw},
                 {"role": "user", "content": f"Tool result: {json.dumps(tool_result)}"},
             ],
+            model=GROQ_MODEL,
             temperature=0,
             max_tokens=300,
         )
-        final_answer = follow_up.choices[0].message.content.strip()
         return {"type": "tool_call", "tool": tool_name, "args": args, "tool_result": tool_result, "answer": final_answer}
 
     return {"type": "direct_answer", "answer": raw}
@@ -210,13 +206,15 @@ def main():
         "detailed_results": [],
     }
 
-    for tq in TEST_QUESTIONS:
+    # Every question (and its tool follow-up, if any) runs concurrently
+    contexts = [retrieve_context(tq["query"], collection) for tq in TEST_QUESTIONS]
+    all_results = llm.gather(ask_llm_with_tools(tq["query"], facts, ctx) for tq, ctx in zip(TEST_QUESTIONS, contexts))
+
+    for tq, result in zip(TEST_QUESTIONS, all_results):
         q = tq["query"]
         print(f"\n{'─' * 60}")
         print(f"[{tq['category'].upper()}] Q: {q}")
 
-        result = ask_llm_with_tools(q, facts, collection)
-
         detail = {
             "query": q,
             "category": tq["category"],
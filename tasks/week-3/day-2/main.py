@@ -3,16 +3,16 @@ Week 3 Day 2 (DAY 12) — Agent Design Patterns
 Implements a ReAct-style agent loop with memory for multi-turn cat-facts Q&A.
 """
 
-import os
+import asyncio
 import json
 import re
+import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from groq import Groq
 import chromadb
 from chromadb.utils.embedding_functions import OllamaEmbeddingFunction
 
-load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared import llm  # noqa: E402
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 CAT_FACTS_PATH = SCRIPT_DIR / "cat-facts.txt"
@@ -21,9 +21,6 @@ GROQ_MODEL = "llama-3.3-70b-versatile"
 TOP_N = 5
 MAX_AGENT_STEPS = 5
 
-client = Groq(api_key=os.environ["GROQ_API_KEY"])
-
-
 def load_facts():
     with open(CAT_FACTS_PATH, "r", encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip()]
@@ -89,19 +86,18 @@ Retrieved context (if any):
 {context}"""
 
 
-def agent_decide(query, memory, context=""):
+async def agent_decide(query, memory, context=""):
     """One step of the agent loop: decide action."""
     system = AGENT_SYSTEM_PROMPT.format(memory=memory.get_context(), context=context or "None yet")
-    resp = client.chat.completions.create(
-        model=GROQ_MODEL,
-        messages=[
+    raw = await llm.ask(
+        [
             {"role": "system", "content": system},
             {"role": "user", "content": query},
         ],
+        model=GROQ_MODEL,
         temperature=0,
         max_tokens=500,
     )
-    raw = resp.choices[0].message.content.strip()
 
     # Parse JSON response
     try:
@@ -113,13 +109,13 @@ def agent_decide(query, memory, context=""):
         return {"action": "ANSWER", "reasoning": "Could not parse agent decision", "content": raw}
 
 
-def agent_loop(query, memory, collection):
+async def agent_loop(query, memory, collection):
     """Run the full agent loop: decide -> execute -> repeat until ANSWER or REFUSE."""
     context = ""
     steps = []
 
     for step_num in range(MAX_AGENT_STEPS):
-        decision = agent_decide(query, memory, context)
+        decision = await agent_decide(query, memory, context)
         action = decision.get("action", "ANSWER").upper()
         content = decision.get("content", "")
         reasoning = decision.get("reasoning", "")
@@ -132,7 +128,7 @@ def agent_loop(query, memory, collection):
         })
 
         if action == "RETRIEVE":
-            results = collection.query(query_texts=[content or query], n_results=TOP_N)
+            results = await asyncio.to_thread(collection.query, query_texts=[content or query], n_results=TOP_N)
             retrieved = results["documents"][0]
             context = "\n".join(f"- {d}" for d in retrieved)
 
@@ -152,6 +148,22 @@ def agent_loop(query, memory, collection):
     return {"answer": "Max agent steps reached.", "steps": steps, "action": "TIMEOUT"}
 
 
+async def run_conversation(conv, collection):
+    """Play one conversation turn by turn; conversations are independent and run concurrently."""
+    memory = AgentMemory()
+    conv_results = []
+    for turn_idx, query in enumerate(conv["turns"]):
+        result = await agent_loop(query, memory, collection)
+        conv_results.append({
+            "turn": turn_idx + 1,
+            "query": query,
+            "action": result["action"],
+            "answer": result["answer"][:300],
+            "steps": result["steps"],
+        })
+    return conv_results
+
+
 # Multi-turn test conversations
 MULTI_TURN_CONVERSATIONS = [
     {
@@ -240,25 +252,15 @@ def main():
         "detailed_results": [],
     }
 
-    for conv in MULTI_TURN_CONVERSATIONS:
+    all_conv_results = llm.gather(run_conversation(conv, collection) for conv in MULTI_TURN_CONVERSATIONS)
+
+    for conv, conv_results in zip(MULTI_TURN_CONVERSATIONS, all_conv_results):
         print(f"\n{'─' * 60}")
         print(f"Conversation: {conv['name']}")
-        memory = AgentMemory()
-        conv_results = []
-
-        for turn_idx, query in enumerate(conv["turns"]):
-            print(f"  Turn {turn_idx + 1}: {query}")
-            result = agent_loop(query, memory, collection)
-            print(f"    Action: {result['action']} | Steps: {len(result['steps'])}")
-            print(f"    Answer: {result['answer'][:100]}...")
-
-            conv_results.append({
-                "turn": turn_idx + 1,
-                "query": query,
-                "action": result["action"],
-                "answer": result["answer"][:300],
-                "steps": result["steps"],
-            })
+        for turn in conv_results:
+            print(f"  Turn {turn['turn']}: {turn['query']}")
+            print(f"    Action: {turn['action']} | Steps: {len(turn['steps'])}")
+            print(f"    Answer: {turn['answer'][:100]}...")
 
         detail = {"conversation": conv["name"], "turns": conv_results}
         results["detailed_results"].append(detail)
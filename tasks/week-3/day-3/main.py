@@ -3,17 +3,16 @@ Week 3 Day 3 (DAY 13) — Knowledge Graphs
 Builds a NetworkX knowledge graph from cat facts and compares KG+RAG vs RAG-only.
 """
 
-import os
 import json
 import re
+import sys
 from pathlib import Path
-from dotenv import load_dotenv
-from groq import Groq
 import chromadb
 from chromadb.utils.embedding_functions import OllamaEmbeddingFunction
 import networkx as nx
 
-load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+from shared import llm  # noqa: E402
 
 SCRIPT_DIR = Path(__file__).resolve().parent
 CAT_FACTS_PATH = SCRIPT_DIR / "cat-facts.txt"
@@ -37,9 +36,6 @@ GROUND_TRUTH = [
     "muscle in the larynx opens and closes the air passage",
 ]
 
-client = Groq(api_key=os.environ["GROQ_API_KEY"])
-
-
 def load_facts():
     with open(CAT_FACTS_PATH, "r", encoding="utf-8") as f:
         return [line.strip() for line in f if line.strip()]
@@ -57,18 +53,11 @@ def build_chroma_collection(facts):
     return col
 
 
-def build_knowledge_graph(facts):
-    """Build a knowledge graph from cat facts using LLM-assisted entity/relation extraction."""
-    G = nx.DiGraph()
-
-    # Extract entities and relations using the LLM
-    # Process facts in batches to reduce API calls
-    batch_size = 15
-    for i in range(0, len(facts), batch_size):
-        batch = facts[i:i + batch_size]
-        facts_text = "\n".join(f"{j+1}. {f}" for j, f in enumerate(batch))
+async def extract_triples(batch):
+    """Entity-relation-entity triples for one batch of facts, as parsed from the LLM's JSON."""
+    facts_text = "\n".join(f"{j+1}. {f}" for j, f in enumerate(batch))
 
-        prompt = f"""Extract entity-relation-entity triples from these cat facts.
+    prompt = f"""Extract entity-relation-entity triples from these cat facts.
 Return a JSON array of triples: [{{"subject": "...", "relation": "...", "object": "..."}}]
 
 Use these relation types: has_trait, weighs, lives_for, can_do, has_speed, has_body_part, is_breed, related_to, has_behavior, has_sense
@@ -78,18 +67,27 @@ Facts:
 
 Return ONLY the JSON array, no other text."""
 
-        try:
-            resp = client.chat.completions.create(
-                model=GROQ_MODEL,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0,
-                max_tokens=1500,
-            )
-            raw = resp.choices[0].message.content.strip()
-            match = re.search(r"```(?:json)?\s*([\s\S]*?)```", raw)
-            text = match.group(1).strip() if match else raw
-            triples = json.loads(text)
+    raw = await llm.ask([{"role": "user", "content": prompt}], model=GROQ_MODEL, temperature=0, max_tokens=1500)
+    match = re.search(r"```(?:json)?\s*([\s\S]*?)```", raw)
+    text = match.group(1).strip() if match else raw
+    return json.loads(text)
+
 
+def build_knowledge_graph(facts):
+    """Build a knowledge graph from cat facts using LLM-assisted entity/relation extraction."""
+    G = nx.DiGraph()
+
+    # Extract entities and relations using the LLM
+    # Process facts in batches to reduce API calls; all batches are extracted concurrently
+    batch_size = 15
+    batches = [facts[i:i + batch_size] for i in range(0, len(facts), batch_size)]
+    extracted = llm.gather((extract_triples(batch) for batch in batches), return_exceptions=True)
+
+    for batch_idx, (batch, triples) in enumerate(zip(batches, extracted)):
+        i = batch_idx * batch_size
+        try:
+            if isinstance(triples, Exception):
+                raise triples
             for t in triples:
                 if isinstance(t, dict) and "subject" in t and "relation" in t and "object" in t:
                     subj = t["subject"].lower().strip()
@@ -136,22 +134,21 @@ def query_knowledge_graph(G, query):
     return relevant_triples[:10]
 
 
-def generate_answer(query, context, kg_context=""):
+async def generate_answer(query, context, kg_context=""):
     """Generate answer using context and optional KG triples."""
     full_context = f"Retrieved facts:\n{context}"
     if kg_context:
         full_context += f"\n\nKnowledge graph triples:\n{kg_context}"
 
-    resp = client.chat.completions.create(
-        model=GROQ_MODEL,
-        messages=[
+    return await llm.ask(
+        [
             {"role": "system", "content": f"Answer the question using ONLY the context below. If knowledge graph triples are provided, use them to enrich your answer.\n\n{full_context}"},
             {"role": "user", "content": query},
         ],
+        model=GROQ_MODEL,
         temperature=0,
         max_tokens=300,
     )
-    return resp.choices[0].message.content.strip()
 
 
 def check_correctness(answer, ground_truth):
@@ -219,21 +216,30 @@ def main():
 
     rag_correct_count, kg_correct_count = 0, 0
 
+    # Retrieval and KG lookups are local; both answers for every question are generated concurrently
+    rag_contexts, all_kg_triples, prompts = [], [], []
+    for q in QUESTIONS:
+        retrieval = collection.query(query_texts=[q], n_results=TOP_N)
+        rag_context = "\n".join(f"- {d}" for d in retrieval["documents"][0])
+        kg_triples = query_knowledge_graph(G, q)
+        kg_context = "\n".join(f"- {t['subject']} --[{t['relation']}]--> {t['object']}" for t in kg_triples)
+        rag_contexts.append(rag_context)
+        all_kg_triples.append(kg_triples)
+        prompts += [generate_answer(q, rag_context), generate_answer(q, rag_context, kg_context)]
+    answers = llm.gather(prompts)
+
     for i, (q, gt) in enumerate(zip(QUESTIONS, GROUND_TRUTH)):
         print(f"\n{'─' * 60}")
         print(f"Q{i+1}: {q}")
 
         # RAG-only
-        retrieval = collection.query(query_texts=[q], n_results=TOP_N)
-        rag_context = "\n".join(f"- {d}" for d in retrieval["documents"][0])
-        rag_answer = generate_answer(q, rag_context)
+        rag_answer = answers[2 * i]
         rag_correct = check_correctness(rag_answer, gt)
         rag_correct_count += int(rag_correct)
 
         # KG + RAG
-        kg_triples = query_knowledge_graph(G, q)
-        kg_context = "\n".join(f"- {t['subject']} --[{t['relation']}]--> {t['object']}" for t in kg_triples)
-        kg_answer = generate_answer(q, rag_context, kg_context)
+        kg_triples = all_kg_triples[i]
+        kg_answer = answers[2 * i + 1]
         kg_correct = check_correctness(kg_answer, gt)
         kg_correct_count += int(kg_correct)
 